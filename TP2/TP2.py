@@ -1,8 +1,46 @@
+import ast
 import tkinter as tk
 from tkinter import ttk, messagebox
 from TP2.b_arbre_star import BStarTree
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.collections import LineCollection
+from TP2.dessin_arbre import COLLAPSED, FOCUS, INTERNAL, LEAF, TreeLayout, build_scene
+
+SEUIL_DETAIL = 150    # au-delà de ce nombre de nœuds : sous-arbres repliés (niveau de détail)
+COULEURS = {LEAF: "#b3e5fc", INTERNAL: "#ffe0b2", COLLAPSED: "#e0e0e0", FOCUS: "#c8e6c9"}
+TAUX_BLOOM = 0.01     # faux positifs tolérés par le filtre de Bloom du B-Arbre
+CLE_INVALIDE = "La clé doit être un entier, une chaîne ou un tuple du même type que les autres clés."
+
+
+def cle_valide(valeur):
+    # entier, chaîne, ou tuple non vide de telles clés (les booléens ne sont pas des entiers ici)
+    if isinstance(valeur, tuple):
+        return bool(valeur) and all(cle_valide(x) for x in valeur)
+    return isinstance(valeur, (int, str)) and not isinstance(valeur, bool)
+
+
+def lire_cle(texte):
+    # 12, "abc", abc (mot nu), ("acme", 3) ; refuse flottants, booléens, None, listes...
+    try:
+        valeur = ast.literal_eval(texte)
+    except (ValueError, SyntaxError):
+        return texte
+    if not cle_valide(valeur):
+        raise ValueError(texte)
+    return valeur
+
+
+def lire_liste(texte):
+    # 1, 2, 3 | "a", "b" | (1, 2), (1, 3) ; à défaut, mots nus séparés par des virgules
+    try:
+        valeurs = ast.literal_eval("[" + texte + "]")
+    except (ValueError, SyntaxError):
+        return [lire_cle(x.strip()) for x in texte.split(",") if x.strip() != ""]
+    if not all(cle_valide(valeur) for valeur in valeurs):
+        raise ValueError(texte)
+    sorted(valeurs)     # TypeError si les clés ne sont pas comparables entre elles
+    return valeurs
 
 
 class BTreeApp:
@@ -34,6 +72,10 @@ class BTreeApp:
                                               variable=self.type_arbre)
         radio_barbre_etoile.grid(row=0, column=2, padx=10)
 
+        radio_barbre_plus = ttk.Radiobutton(frame_top, text="B+-Arbre", value="B+-Arbre",
+                                            variable=self.type_arbre)
+        radio_barbre_plus.grid(row=0, column=3, padx=10)
+
         # =============================== order ===============================
 
         frame_order = tk.Frame(self.frame, bg="#1e1e1e")
@@ -89,6 +131,24 @@ class BTreeApp:
         self.canvas_widget = self.canvas.get_tk_widget()
         self.canvas_widget.pack(pady=20, fill="both", expand=True)
 
+        # artistes créés une fois puis mis à jour (blitting)
+        self.layout = TreeLayout()
+        self.focus = None
+        self._artists = {}
+        self._styles = {}
+        self._collapsed = {}
+        self._background = None
+        self.ax.axis('off')
+        self._edges = LineCollection([], colors="k", linewidths=1, animated=True)
+        self._chain = LineCollection([], colors="#00796b", linestyles="--", linewidths=1, animated=True)
+        self.ax.add_collection(self._edges)
+        self.ax.add_collection(self._chain)
+        self._placeholder = self.ax.text(0.5, 0.5, "Ici apparaîtra le dessin de l'arbre", color="white",
+                                         ha="center", va="center", transform=self.ax.transAxes,
+                                         animated=True)
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+        self.canvas.mpl_connect("pick_event", self._on_pick)
+
         self.update_plot()
 
     # =============================== Vérifier order ===============================
@@ -108,12 +168,29 @@ class BTreeApp:
             messagebox.showerror("Erreur", "L'ordre minimal doit être 3.")
             return False
 
-        if self.type_arbre.get() == "B-Arbre" and order % 2 == 0:
-            messagebox.showerror("Erreur", "Pour un B-Arbre, l'ordre doit être impair.")
+        if self.type_arbre.get() in ("B-Arbre", "B+-Arbre") and order % 2 == 0:
+            messagebox.showerror("Erreur", f"Pour un {self.type_arbre.get()}, l'ordre doit être impair.")
             return False
 
         return True
 
+    def classe_arbre(self):
+        if self.type_arbre.get() == "B-Arbre*":
+            return BStarTree
+        if self.type_arbre.get() == "B+-Arbre":
+            from TP2.b_plus_arbre import BPlusTree
+            return BPlusTree
+        from TP2.b_arbre import bTree
+        return bTree
+
+    def nouvel_arbre(self, order, cles=None):
+        classe = self.classe_arbre()
+        arbre = classe(order) if cles is None else classe.bulk_load(cles, order)
+        if hasattr(arbre, "enable_bloom"):
+            # B-Arbre : une clé absente est écartée par le filtre sans descendre l'arbre
+            arbre.enable_bloom(TAUX_BLOOM)
+        return arbre
+
     # =============================== Créer arbre ===============================
 
     def creer_arbre(self):
@@ -123,32 +200,27 @@ class BTreeApp:
         order = int(self.entry_order.get())
         liste = self.entry_list.get().strip()
 
-        if self.type_arbre.get() == "B-Arbre*":
-            self.arbre = BStarTree(order)
-        else:
-            from TP2.b_arbre import bTree
-            self.arbre = bTree(order)
+        self.arbre = self.nouvel_arbre(order)
 
         if liste:
             try:
-                cles = [int(x) for x in liste.split(",") if x.strip() != ""]
-                for cle in cles:
-
-                    if self.type_arbre.get() == "B-Arbre*":
-                        node, idx = self.arbre.search(cle)
-                    else:
-                        node_idx = self.arbre.search(cle)
-                        node = node_idx[0] if node_idx else None
-
-                    if not node:
-                        self.arbre.insert(cle)
-                    else:
-                        messagebox.showwarning("Attention",
-                                               f"La clé {cle} existe déjà et n'a pas été ajoutée.")
-            except ValueError:
-                messagebox.showerror("Erreur", "Liste doit contenir des nombres séparés par des virgules")
+                cles = lire_liste(liste)
+            except (ValueError, TypeError):
+                messagebox.showerror("Erreur", "La liste doit contenir des clés de même type "
+                                               "(entiers, chaînes ou tuples) séparées par des virgules")
                 return
 
+            vues = set()
+            for cle in cles:
+                if cle in vues:
+                    messagebox.showwarning("Attention",
+                                           f"La clé {cle} existe déjà et n'a pas été ajoutée.")
+                vues.add(cle)
+
+            # chargement en masse : un seul tri puis construction bottom-up
+            self.arbre = self.nouvel_arbre(order, cles)
+
+        self.focus = None
         self.update_plot()
         self.entry_cle.focus_set()
         self.entry_cle.select_range(0, tk.END)
@@ -166,15 +238,11 @@ class BTreeApp:
             return
 
         try:
-            cle = int(cle)
+            cle = lire_cle(cle)
 
             if self.arbre is None:
                 order = int(self.entry_order.get())
-                if self.type_arbre.get() == "B-Arbre*":
-                    self.arbre = BStarTree(order)
-                else:
-                    from TP2.b_arbre import bTree
-                    self.arbre = bTree(order)
+                self.arbre = self.nouvel_arbre(order)
 
             if self.type_arbre.get() == "B-Arbre*":
                 node, idx = self.arbre.search(cle)
@@ -186,13 +254,13 @@ class BTreeApp:
                 messagebox.showwarning("Attention", f"La clé {cle} existe déjà.")
             else:
                 self.arbre.insert(cle)
-                self.update_plot()
+                self.update_plot(focus=cle)
 
             self.entry_cle.focus_set()
             self.entry_cle.select_range(0, tk.END)
 
-        except ValueError:
-            messagebox.showerror("Erreur", "La clé doit être un entier.")
+        except (ValueError, TypeError):
+            messagebox.showerror("Erreur", CLE_INVALIDE)
             self.entry_cle.focus_set()
 
     # =============================== Suppression ===============================
@@ -210,7 +278,7 @@ class BTreeApp:
             return
 
         try:
-            cle = int(cle)
+            cle = lire_cle(cle)
 
             if self.type_arbre.get() == "B-Arbre*":
                 node, idx = self.arbre.search(cle)
@@ -220,15 +288,15 @@ class BTreeApp:
 
             if node:
                 self.arbre.delete(cle)
-                self.update_plot()
+                self.update_plot(focus=cle)
             else:
                 messagebox.showwarning("Attention", f"La clé {cle} n'existe pas dans l'arbre.")
 
             self.entry_cle.focus_set()
             self.entry_cle.select_range(0, tk.END)
 
-        except ValueError:
-            messagebox.showerror("Erreur", "La clé doit être un entier.")
+        except (ValueError, TypeError):
+            messagebox.showerror("Erreur", CLE_INVALIDE)
             self.entry_cle.focus_set()
 
     # =============================== Recherche ===============================
@@ -246,7 +314,7 @@ class BTreeApp:
             return
 
         try:
-            cle = int(cle)
+            cle = lire_cle(cle)
 
             if self.type_arbre.get() == "B-Arbre*":
                 node, idx = self.arbre.search(cle)
@@ -254,16 +322,18 @@ class BTreeApp:
                 node_idx = self.arbre.search(cle)
                 node = node_idx[0] if node_idx else None
 
+            # le chemin de la clé est déplié et le nœud trouvé mis en évidence
+            self.update_plot(focus=cle)
             if node:
-                messagebox.showinfo("Recherche", f"Clé {cle} trouvée dans le noeud {node.keys}.")
+                messagebox.showinfo("Recherche", f"Clé {cle!r} trouvée dans le noeud {list(node.keys)}.")
             else:
                 messagebox.showinfo("Recherche", f"Clé {cle} non trouvée.")
 
             self.entry_cle.focus_set()
             self.entry_cle.select_range(0, tk.END)
 
-        except ValueError:
-            messagebox.showerror("Erreur", "La clé doit être un entier.")
+        except (ValueError, TypeError):
+            messagebox.showerror("Erreur", CLE_INVALIDE)
             self.entry_cle.focus_set()
 
     # =============================== Réinitialisation ===============================
@@ -273,100 +343,78 @@ class BTreeApp:
         self.entry_order.delete(0, tk.END)
         self.entry_list.delete(0, tk.END)
         self.entry_cle.delete(0, tk.END)
+        self.focus = None
         self.update_plot()
         messagebox.showinfo("Réinitialisé", "Arbre réinitialisé.")
         self.entry_cle.focus_set()
 
     # =============================== رسم الشجرة ===============================
 
-    def _compute_positions(self, node, positions, depth=0, next_x=[0]):
-        y = -depth * 3.0
-        if node is None or (not node.keys and not node.children):
-            return positions
-        if node.leaf:
-            key_xs = []
-            for _ in node.keys:
-                x = next_x[0]
-                key_xs.append(x)
-                next_x[0] += 1
-            center = sum(key_xs) / len(key_xs) if key_xs else next_x[0]
-            positions[node] = {'center': center, 'y': y, 'key_x': key_xs}
-            return positions
-
-        children_ranges = []
-        for child in node.children:
-            if child and (child.keys or child.children):
-                self._compute_positions(child, positions, depth + 1, next_x)
-                child_xs = positions[child]['key_x']
-                if child_xs:
-                    children_ranges.append((min(child_xs), max(child_xs)))
-
-        if not children_ranges:
-            return positions
-
-        key_xs = []
-        for i in range(len(node.keys)):
-            if i < len(children_ranges) - 1:
-                l_range = children_ranges[i]
-                r_range = children_ranges[i + 1]
-                mid = (l_range[1] + r_range[0]) / 2.0
-                key_xs.append(mid)
-
-        if not key_xs:
-            key_xs = [sum(r for l, r in children_ranges) / len(children_ranges)]
-
-        center = sum(key_xs) / len(key_xs)
-        positions[node] = {'center': center, 'y': y, 'key_x': key_xs}
-        return positions
-
-    def update_plot(self):
-        self.ax.clear()
-        self.ax.axis('off')
-
-        if self.arbre is None:
-            self.ax.text(0.5, 0.5, "Ici apparaîtra le dessin de l'arbre", color="white",
-                         ha="center", va="center", transform=self.ax.transAxes)
+    def update_plot(self, focus=None):
+        # mise à jour en place : disposition incrémentale (cache par nœud), seuls
+        # les artistes modifiés changent, puis blit sur le fond mémorisé
+        if focus is not None:
+            self.focus = focus
+        box = self.layout.update(self.arbre) if self.arbre is not None else None
+        self._placeholder.set_visible(self.arbre is None)
+        if box is None:
+            self._sync_artists([], [], [], {})
+        else:
+            scene = build_scene(box, SEUIL_DETAIL, self.focus)
+            self._sync_artists(scene.items, scene.edges, scene.chain, scene.collapsed)
+            self.ax.set_xlim(*scene.xlim)
+            self.ax.set_ylim(*scene.ylim)
+        self._blit()
+
+    def _sync_artists(self, items, edges, chain, collapsed):
+        vus = set()
+        for key, label, x, y, style in items:
+            art = self._artists.get(key)
+            if art is None:
+                art = self.ax.text(x, y, label, ha='center', va='center', animated=True,
+                                   picker=style == COLLAPSED,
+                                   bbox=dict(boxstyle="round,pad=0.3",
+                                             facecolor=COULEURS[style], edgecolor="#00796b"))
+                self._artists[key] = art
+                self._styles[key] = style
+            else:
+                if art.get_text() != label:
+                    art.set_text(label)
+                if art.get_position() != (x, y):
+                    art.set_position((x, y))
+                if self._styles[key] != style:
+                    art.get_bbox_patch().set_facecolor(COULEURS[style])
+                    self._styles[key] = style
+            vus.add(key)
+        for key in [k for k in self._artists if k not in vus]:
+            self._artists.pop(key).remove()
+            del self._styles[key]
+        self._collapsed = collapsed
+        self._edges.set_segments(edges)
+        self._chain.set_segments(chain)
+
+    def _draw_animated(self):
+        for art in (self._edges, self._chain, self._placeholder, *self._artists.values()):
+            if art.get_visible():
+                self.fig.draw_artist(art)
+
+    def _blit(self):
+        if self._background is None:
+            # premier affichage : draw_event mémorise le fond
             self.canvas.draw()
             return
-
-        positions = {}
-        self._compute_positions(self.arbre.root, positions, 0, [0])
-
-        centers = [info['center'] for info in positions.values()]
-        avg_center = (max(centers) + min(centers)) / 2 if centers else 0
-        offset = -avg_center
-
-        total_keys = sum(len(n.keys) for n in positions.keys())
-        if total_keys < 10:
-            scale = 1.5
-        elif total_keys < 25:
-            scale = 1.2
-        elif total_keys < 50:
-            scale = 1.0
-        else:
-            scale = 0.8
-
-        for node, info in positions.items():
-            if not node.leaf:
-                for child in node.children:
-                    if child in positions:
-                        cx = (positions[child]['center'] + offset) * scale
-                        cy = positions[child]['y']
-                        px = (info['center'] + offset) * scale
-                        py = info['y']
-                        self.ax.plot([px, cx], [py, cy], 'k-', lw=1)
-
-        for node, info in positions.items():
-            label = "|".join(str(k) for k in node.keys)
-            color = "#b3e5fc" if node.leaf else "#ffe0b2"
-            self.ax.text((info['center'] + offset) * scale, info['y'], f"[{label}]",
-                         ha='center', va='center',
-                         bbox=dict(boxstyle="round,pad=0.3",
-                                   facecolor=color, edgecolor="#00796b"))
-
-        min_x = min(info['center'] for info in positions.values()) + offset
-        max_x = max(info['center'] for info in positions.values()) + offset
-        self.ax.set_xlim(min_x * scale - 3, max_x * scale + 3)
-        self.ax.set_ylim(-len(positions) - 1, 2)
-
-        self.canvas.draw()
+        self.canvas.restore_region(self._background)
+        self._draw_animated()
+        self.canvas.blit(self.fig.bbox)
+
+    def _on_draw(self, event):
+        # redessin complet (premier affichage, redimensionnement) : nouveau fond
+        self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_animated()
+
+    def _on_pick(self, event):
+        # clic sur un sous-arbre replié : le déplier (chemin vers sa plus petite clé)
+        for key, art in self._artists.items():
+            if art is event.artist and key in self._collapsed:
+                self.update_plot(focus=self._collapsed[key].lo)
+                return
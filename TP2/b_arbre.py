@@ -1,102 +1,255 @@
-from typing import List, Optional, Tuple
-import uuid
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import bisect
+
+from TP2.bloom_arbre import ScalableBloomFilter, bloom_stats
+from TP2.outils_arbre import (MISSING, Cursor, Key, KeyFunc, build_bottom_up, check_invariants,
+                              fill_target, iter_range, iter_reversed, memory_report, merge_run,
+                              new_keys, next_node_id, pack_sizes, partition_run, rank, select,
+                              sorted_unique, split_run, subtree_size)
 
 
 class BTreeNode:
-    def __init__(self, leaf: bool = True):
+    __slots__ = ("leaf", "keys", "values", "children", "parent", "size", "epoch", "_id")
+
+    def __init__(self, leaf: bool = True, keys: Optional[Sequence[Key]] = None):
         self.leaf: bool = leaf
-        self.keys: List[int] = []
+        self.keys: Sequence[Key] = [] if keys is None else keys
+        self.values: Optional[List[Any]] = None     # valeurs parallèles à keys (BTreeMap)
         self.children: List['BTreeNode'] = []
         self.parent: Optional['BTreeNode'] = None  # nécessaire pour la montée
-        self._id = str(uuid.uuid4())[:8]
+        self.size: int = len(self.keys)            # clés du sous-arbre (mode counted)
+        self.epoch: int = 0                        # époque de création (copie sur écriture)
+        self._id: Optional[str] = None
+
+    @property
+    def node_id(self) -> str:
+        if self._id is None:
+            self._id = next_node_id()
+        return self._id
 
     def __repr__(self):
-        return f"Node(keys={self.keys}, leaf={self.leaf})"
+        return f"Node(keys={list(self.keys)}, leaf={self.leaf})"
 
 
 class bTree:
-    def __init__(self, order: int = 7):
+    def __init__(self, order: int = 7, int_keys: bool = False, counted: bool = False,
+                 key: Optional[KeyFunc] = None, bloom_error: Optional[float] = None,
+                 bloom_capacity: int = 1024):
         if order < 3:
             raise ValueError("Order must be >= 3")
         self.order = order
         self.d = (order - 1) // 2       # d = 1 pour ordre 3
         self.max_keys = 2 * self.d      # nombre max de clés par nœud
         self.min_keys = self.d
-        self.root = BTreeNode(leaf=True)
+        self.int_keys = int_keys        # clés stockées dans un array('q')
+        self.counted = counted          # tailles de sous-arbres pour rank/select
+        self.key = key                  # appliquée à chaque clé reçue ; l'arbre stocke key(x)
+        self._epoch = 0                 # les nœuds d'une époque antérieure sont partagés
+        self.version = 0                # incrémenté à chaque modification (détection de changement)
+        self.root = self._new_node(leaf=True)
+        # doigt : dernière feuille touchée et ses clés-bornes (lo, hi) exclusives,
+        # None = non bornée ; effacé à chaque restructuration
+        self._finger: Optional[Tuple[BTreeNode, Optional[Key], Optional[Key]]] = None
+        self._loose = False             # bord droit sous min_keys après des ajouts en fin
+        self.bloom: Optional[ScalableBloomFilter] = None
+        if bloom_error is not None:
+            self.enable_bloom(bloom_error, bloom_capacity)
+
+    def _new_node(self, leaf: bool, keys: Iterable[Key] = ()) -> BTreeNode:
+        node = BTreeNode(leaf=leaf, keys=new_keys(self.int_keys, keys))
+        node.epoch = self._epoch
+        return node
+
+    def _key(self, x: Any) -> Key:
+        return x if self.key is None else self.key(x)
+
+    def _keys(self, xs: Iterable[Any]) -> Iterable[Key]:
+        return xs if self.key is None else map(self.key, xs)
+
+    def _refresh(self, *nodes: BTreeNode):
+        # recalcule la taille de nœuds dont les fils sont à jour
+        if self.counted:
+            for node in nodes:
+                node.size = subtree_size(node)
+
+    def _bump(self, node: BTreeNode, delta: int):
+        # propage un ajout/retrait de clés de node jusqu'à la racine
+        if self.counted and delta:
+            while node is not None:
+                node.size += delta
+                node = node.parent
+
+    # ============================================================
+    # CHARGEMENT EN MASSE (bottom-up)
+    # ============================================================
+    @classmethod
+    def bulk_load(cls, iterable: Iterable[Any], order: int = 7, fill_factor: float = 1.0,
+                  int_keys: bool = False, counted: bool = False,
+                  key: Optional[KeyFunc] = None) -> 'bTree':
+        tree = cls(order, int_keys, counted, key=key)
+        target = fill_target(fill_factor, tree.min_keys, tree.max_keys)
+
+        def new_node(leaf: bool, keys: List[Key], children: List[BTreeNode]) -> BTreeNode:
+            node = tree._new_node(leaf, keys)
+            node.children = children
+            for c in children:
+                c.parent = node
+            tree._refresh(node)
+            return node
+
+        root = build_bottom_up(sorted_unique(tree._keys(iterable)), target, tree.min_keys, tree.max_keys, new_node)
+        if root is not None:
+            tree.root = root
+        return tree
 
     # ============================================================
     # RECHERCHE
     # ============================================================
-    def search(self, k: int, node: Optional[BTreeNode] = None) -> Optional[Tuple[BTreeNode, int]]:
+    def search(self, k: Any, node: Optional[BTreeNode] = None) -> Optional[Tuple[BTreeNode, int]]:
+        k = self._key(k)
         if node is None:
+            if self.bloom is not None and not self.may_contain(k):
+                return None
+            finger = self._finger
+            if finger is not None and self._in_finger(finger, k):
+                leaf = finger[0]
+                i = bisect.bisect_left(leaf.keys, k)
+                return (leaf, i) if i < len(leaf.keys) and leaf.keys[i] == k else None
             node = self.root
-        i = 0
-        while i < len(node.keys) and k > node.keys[i]:
-            i += 1
-        if i < len(node.keys) and node.keys[i] == k:
-            return node, i
-        if node.leaf:
-            return None
-        return self.search(k, node.children[i])
+        while node is not None:
+            i = self._find_key_index(node, k)
+            if i < len(node.keys) and node.keys[i] == k:
+                return node, i
+            if node.leaf:
+                return None
+            node = node.children[i]
+        return None
 
     # ============================================================
     # INSERTION (post-insert split)
     # ============================================================
-    def insert(self, key: int):
-        node = self.root
-        self._insert_non_full(node, key)
+    def insert(self, key: Any):
+        self._put(self._key(key))
 
-        # si la racine déborde
-        if len(self.root.keys) > self.max_keys:
-            new_root = BTreeNode(leaf=False)
-            new_root.children.append(self.root)
-            self.root.parent = new_root
-            self.root = new_root
-            self._split_child(new_root, 0)
+    def _put(self, key: Key, value: Any = None) -> Optional[Tuple[BTreeNode, int]]:
+        # insère key (et sa valeur) ; si elle existe, renvoie sa position dans un nœud modifiable
+        self.version += 1
+        finger = self._finger
+        if finger is not None and self._in_finger(finger, key):
+            # même feuille que l'opération précédente : pas de descente
+            return self._put_leaf(*finger, key, value)
+        self._own_root()
+        return self._insert_non_full(self.root, key, value)
 
-    def _insert_non_full(self, node: BTreeNode, key: int):
-        if node.leaf:
-            i = 0
-            while i < len(node.keys) and key > node.keys[i]:
-                i += 1
-            node.keys.insert(i, key)
+    def _insert_non_full(self, node: BTreeNode, key: Key, value: Any = None) -> Optional[Tuple[BTreeNode, int]]:
+        # descente itérative jusqu'à la feuille ; une clé déjà présente est ignorée
+        lo = hi = None
+        while not node.leaf:
+            keys = node.keys
+            i = bisect.bisect_left(keys, key)
+            if i < len(keys):
+                if keys[i] == key:
+                    return node, i
+                hi = keys[i]
+            if i:
+                lo = keys[i - 1]
+            child = node.children[i]
+            node = child if child.epoch == self._epoch else self._writable(node, i)
+        return self._put_leaf(node, lo, hi, key, value)
 
-            if len(node.keys) > self.max_keys:
-                self._handle_split_up(node)
-            return
+    def _put_leaf(self, leaf: BTreeNode, lo: Optional[Key], hi: Optional[Key], key: Key,
+                  value: Any = None) -> Optional[Tuple[BTreeNode, int]]:
+        i = self._find_key_index(leaf, key)
+        if i < len(leaf.keys) and leaf.keys[i] == key:
+            self._finger = (leaf, lo, hi)
+            return leaf, i
+        leaf.keys.insert(i, key)
+        if leaf.values is not None:
+            leaf.values.insert(i, value)
+        self._bump(leaf, 1)
+        if self.bloom is not None:
+            self.bloom.add(key)
+        if len(leaf.keys) <= self.max_keys:
+            self._finger = (leaf, lo, hi)
+        elif hi is None and i == len(leaf.keys) - 1:
+            # ajout en fin d'arbre : la feuille garde 2d - 1 clés, la nouvelle
+            # feuille de droite reçoit la clé et devient le doigt
+            self._handle_split_up(leaf, append=True)
+            parent = leaf.parent
+            self._finger = (parent.children[-1], parent.keys[-1], None)
+        else:
+            self._handle_split_up(leaf)
+        return None
 
-        i = 0
-        while i < len(node.keys) and key > node.keys[i]:
-            i += 1
-        child = node.children[i]
-        self._insert_non_full(child, key)
-
-    def _handle_split_up(self, node: BTreeNode):
-        if node == self.root:
-            new_root = BTreeNode(leaf=False)
-            new_root.children.append(node)
-            node.parent = new_root
-            self.root = new_root
-            self._split_child(new_root, 0)
-            return
+    @staticmethod
+    def _in_finger(finger: Tuple[BTreeNode, Optional[Key], Optional[Key]], k: Key) -> bool:
+        _, lo, hi = finger
+        return (lo is None or lo < k) and (hi is None or k < hi)
 
-        parent = node.parent
-        index = parent.children.index(node)
-        self._split_child(parent, index)
+    def _handle_split_up(self, node: BTreeNode, append: bool = False):
+        # remontée itérative tant que le nœud déborde ; en mode ajout (bord
+        # droit), le nœud garde 2d - 1 clés et son nouveau frère droit une seule
+        while len(node.keys) > self.max_keys:
+            mid = len(node.keys) - 2 if append else None
+            if append:
+                self._loose = True
+            if node.parent is None:
+                # racine de l'arbre, ou d'un morceau détaché (split_at / join)
+                new_root = self._new_node(leaf=False)
+                new_root.children.append(node)
+                node.parent = new_root
+                if node is self.root:
+                    self.root = new_root
+                self._refresh(new_root)
+                self._split_child(new_root, 0, mid)
+                return
 
-        if len(parent.keys) > self.max_keys:
-            self._handle_split_up(parent)
+            parent = node.parent
+            index = self._find_key_index(parent, node.keys[0])
+            self._split_child(parent, index, mid)
+            node = parent
 
-    def _split_child(self, parent: BTreeNode, i: int):
+    def _settle_spine(self):
+        # ramène le bord droit laissé par les ajouts en fin à min_keys : emprunts
+        # au frère gauche (2d - 1 clés), sinon fusion, de la feuille vers la racine
+        if not self._loose:
+            return
+        self._loose = False
+        spine = []
+        self._own_root()
+        node = self.root
+        while not node.leaf:
+            node = self._writable(node, len(node.children) - 1)
+            spine.append(node)
+        for node in reversed(spine):
+            parent = node.parent
+            idx = len(parent.children) - 1
+            self._writable(parent, idx - 1)
+            while len(node.keys) < self.min_keys:
+                if len(parent.children[idx - 1].keys) <= self.min_keys:
+                    self._merge(parent, idx - 1)
+                    break
+                self._borrow_from_prev(parent, idx)
+        if not self.root.leaf and len(self.root.keys) == 0:
+            self.root = self.root.children[0]
+            self.root.parent = None
+
+    def _split_child(self, parent: BTreeNode, i: int, mid: Optional[int] = None):
+        self._finger = None
         full = parent.children[i]
-        mid = len(full.keys) // 2
+        if mid is None:
+            mid = len(full.keys) // 2
         median = full.keys[mid]
 
-        new_node = BTreeNode(leaf=full.leaf)
+        new_node = self._new_node(leaf=full.leaf)
         new_node.parent = parent
 
         new_node.keys = full.keys[mid + 1:]
         full.keys = full.keys[:mid]
+        if full.values is not None:
+            parent.values.insert(i, full.values[mid])
+            new_node.values = full.values[mid + 1:]
+            full.values = full.values[:mid]
 
         if not full.leaf:
             new_node.children = full.children[mid + 1:]
@@ -106,97 +259,119 @@ class bTree:
 
         parent.keys.insert(i, median)
         parent.children.insert(i + 1, new_node)
+        self._refresh(full, new_node)
 
     # ============================================================
     # SUPPRESSION (améliorée)
     # ============================================================
-    def delete(self, k: int):
+    def delete(self, k: Any):
+        self._delete_key(self._key(k))
+
+    def _delete_key(self, k: Key) -> Any:
+        # renvoie la valeur retirée (None hors BTreeMap), MISSING si k est absente
+        self.version += 1
         if not self.root:
-            return
+            return MISSING
 
-        self._delete_internal(self.root, k)
+        self._settle_spine()
+        finger = self._finger
+        if finger is not None and self._in_finger(finger, k):
+            leaf = finger[0]
+            i = self._find_key_index(leaf, k)
+            if i == len(leaf.keys) or leaf.keys[i] != k:
+                return MISSING
+            if len(leaf.keys) > self.min_keys or leaf is self.root:
+                # retrait sans sous-remplissage : bornes et structure inchangées
+                leaf.keys.pop(i)
+                removed = None if leaf.values is None else leaf.values.pop(i)
+                self._bump(leaf, -1)
+                if self.bloom is not None:
+                    self._bloom_deletes += 1
+                return removed
 
-        if self.root and len(self.root.keys) == 0:
-            if self.root.leaf:
-                self.root = None
-            else:
-                self.root = self.root.children[0]
-                self.root.parent = None
+        self._own_root()
+        removed = self._delete_internal(self.root, k)
 
-    def _delete_internal(self, node: BTreeNode, k: int):
-        idx = self._find_key_index(node, k)
+        # une racine feuille vide reste en place : l'arbre vide reste utilisable
+        if not self.root.leaf and len(self.root.keys) == 0:
+            self.root = self.root.children[0]
+            self.root.parent = None
+        if removed is not MISSING and self.bloom is not None:
+            self._bloom_deletes += 1
+        return removed
 
-        # === CAS 1 : clé trouvée dans ce nœud ===
-        if idx < len(node.keys) and node.keys[idx] == k:
+    def _delete_internal(self, node: BTreeNode, k: Key) -> Any:
+        # descente jusqu'à la clé ; une clé interne est remplacée par son
+        # prédécesseur, puis la feuille touchée est réparée de bas en haut
+        # (une fusion préventive en descendant donnerait 2d + 1 clés)
+        while True:
+            idx = self._find_key_index(node, k)
+            if idx < len(node.keys) and node.keys[idx] == k:
+                break
             if node.leaf:
-                node.keys.pop(idx)
-                return
+                return MISSING
+            node = self._writable(node, idx)
 
-            left_child = node.children[idx]
-            right_child = node.children[idx + 1]
+        removed = None if node.values is None else node.values[idx]
+        if node.leaf:
+            node.keys.pop(idx)
+            if node.values is not None:
+                node.values.pop(idx)
+            leaf = node
+        else:
+            # la séparatrice change : les bornes du doigt ne valent plus
+            self._finger = None
+            leaf = self._writable(node, idx)
+            while not leaf.leaf:
+                leaf = self._writable(leaf, len(leaf.children) - 1)
+            node.keys[idx] = leaf.keys.pop()
+            if node.values is not None:
+                node.values[idx] = leaf.values.pop()
+        self._bump(leaf, -1)
+        self._fix_underflow(leaf)
+        return removed
 
-            if len(left_child.keys) > self.min_keys:
-                pred = self._get_predecessor(left_child)
-                node.keys[idx] = pred
-                self._delete_internal(left_child, pred)
+    def _fix_underflow(self, node: BTreeNode):
+        # emprunt à un frère riche, sinon fusion (d - 1 + 1 + d = 2d clés) et remontée
+        while node.parent is not None and len(node.keys) < self.min_keys:
+            parent = node.parent
+            idx = parent.children.index(node)
+            if idx > 0 and len(parent.children[idx - 1].keys) > self.min_keys:
+                self._writable(parent, idx - 1)
+                self._borrow_from_prev(parent, idx)
                 return
-
-            if len(right_child.keys) > self.min_keys:
-                succ = self._get_successor(right_child)
-                node.keys[idx] = succ
-                self._delete_internal(right_child, succ)
+            if idx < len(parent.children) - 1 and len(parent.children[idx + 1].keys) > self.min_keys:
+                self._writable(parent, idx + 1)
+                self._borrow_from_next(parent, idx)
                 return
-
-            self._merge(node, idx)
-            self._delete_internal(node.children[idx], k)
-            return
-
-        # === CAS 2 : clé non trouvée ===
-        if node.leaf:
-            return
-
-        if idx >= len(node.children):
-            idx = len(node.children) - 1
-
-        child = node.children[idx]
-
-        if len(child.keys) <= self.min_keys:
-            if idx > 0 and len(node.children[idx - 1].keys) > self.min_keys:
-                self._borrow_from_prev(node, idx)
-            elif idx < len(node.children) - 1 and len(node.children[idx + 1].keys) > self.min_keys:
-                self._borrow_from_next(node, idx)
+            if idx > 0:
+                self._writable(parent, idx - 1)
+                self._merge(parent, idx - 1)
             else:
-                if idx < len(node.children) - 1:
-                    self._merge(node, idx)
-                else:
-                    self._merge(node, idx - 1)
-                    idx -= 1
-                child = node.children[idx]
-
-        self._delete_internal(child, k)
+                self._merge(parent, idx)
+            node = parent
 
     # ============================================================
     # OUTILS DE SUPPRESSION
     # ============================================================
-    def _find_key_index(self, node: BTreeNode, k: int) -> int:
-        idx = 0
-        while idx < len(node.keys) and node.keys[idx] < k:
-            idx += 1
-        return idx
+    def _find_key_index(self, node: BTreeNode, k: Key) -> int:
+        # position d'insertion par dichotomie : O(log order) par nœud
+        return bisect.bisect_left(node.keys, k)
 
-    def _get_predecessor(self, node: BTreeNode) -> int:
+    def _get_predecessor(self, node: BTreeNode) -> Key:
         cur = node
         while not cur.leaf:
             cur = cur.children[-1]
         return cur.keys[-1]
 
-    def _get_successor(self, node: BTreeNode) -> int:
+    def _get_successor(self, node: BTreeNode) -> Key:
         cur = node
         while not cur.leaf:
             cur = cur.children[0]
         return cur.keys[0]
 
     def _borrow_from_prev(self, parent: BTreeNode, idx: int):
+        self._finger = None
         child = parent.children[idx]
         sibling = parent.children[idx - 1]
         child.keys.insert(0, parent.keys[idx - 1])
@@ -205,8 +380,13 @@ class bTree:
             moved.parent = child
             child.children.insert(0, moved)
         parent.keys[idx - 1] = sibling.keys.pop()
+        if child.values is not None:
+            child.values.insert(0, parent.values[idx - 1])
+            parent.values[idx - 1] = sibling.values.pop()
+        self._refresh(child, sibling)
 
     def _borrow_from_next(self, parent: BTreeNode, idx: int):
+        self._finger = None
         child = parent.children[idx]
         sibling = parent.children[idx + 1]
         child.keys.append(parent.keys[idx])
@@ -215,34 +395,624 @@ class bTree:
             moved.parent = child
             child.children.append(moved)
         parent.keys[idx] = sibling.keys.pop(0)
+        if child.values is not None:
+            child.values.append(parent.values[idx])
+            parent.values[idx] = sibling.values.pop(0)
+        self._refresh(child, sibling)
 
     def _merge(self, parent: BTreeNode, idx: int):
+        self._finger = None
         child = parent.children[idx]
         sibling = parent.children[idx + 1]
         child.keys.append(parent.keys[idx])
         child.keys.extend(sibling.keys)
+        if child.values is not None:
+            child.values.append(parent.values.pop(idx))
+            child.values.extend(sibling.values)
         if not child.leaf:
             for c in sibling.children:
                 c.parent = child
             child.children.extend(sibling.children)
         parent.keys.pop(idx)
         parent.children.pop(idx + 1)
+        self._refresh(child)
+
+    # ============================================================
+    # OPÉRATIONS PAR LOTS (chaque nœud visité une fois par lot)
+    # ============================================================
+    def insert_many(self, keys: Iterable[Any]) -> List[Key]:
+        # renvoie les clés ignorées car déjà présentes (ou répétées dans le lot)
+        self.version += 1
+        batch = sorted(self._keys(keys))
+        duplicates: List[Key] = []
+        if self.root is None:
+            self.root = self._new_node(leaf=True)
+        self._settle_spine()
+        self._own_root()
+
+        overfull: List[BTreeNode] = []
+        stack = [(self.root, 0, len(batch))]
+        while stack:
+            node, i, j = stack.pop()
+            if node.leaf:
+                found = merge_run(node.keys, batch[i:j])
+                duplicates.extend(found)
+                self._bump(node, j - i - len(found))
+                if len(node.keys) > self.max_keys:
+                    overfull.append(node)
+                continue
+            groups, found = partition_run(node.keys, batch, i, j)
+            duplicates.extend(found)
+            for c, a, b in groups:
+                stack.append((self._writable(node, c), a, b))
+
+        # éclatements niveau par niveau, de droite à gauche : les parents ne
+        # sont découpés qu'au niveau suivant, donc les indices restent valides
+        while overfull:
+            overfull.sort(key=lambda n: n.keys[0], reverse=True)
+            parents = {}
+            for node in overfull:
+                parent = self._split_many(node)
+                if len(parent.keys) > self.max_keys:
+                    parents[id(parent)] = parent
+            overfull = list(parents.values())
+
+        if self.bloom is not None:
+            # batch moins les doublons (multiensemble trié) : les clés réellement ajoutées
+            dup = sorted(duplicates)
+            j = 0
+            for k in batch:
+                if j < len(dup) and dup[j] == k:
+                    j += 1
+                else:
+                    self.bloom.add(k)
+        return duplicates
+
+    def delete_many(self, keys: Iterable[Any]) -> List[Key]:
+        # renvoie les clés absentes (ou répétées dans le lot)
+        self.version += 1
+        batch = sorted(self._keys(keys))
+        missing: List[Key] = []
+        if self.root is None:
+            return batch
+        self._settle_spine()
+        self._own_root()
+
+        slow: List[Key] = []
+        stack = [(self.root, 0, len(batch))]
+        while stack:
+            node, i, j = stack.pop()
+            if node.leaf:
+                present, absent = split_run(node.keys, batch[i:j])
+                missing.extend(absent)
+                if node is self.root or len(node.keys) - len(present) >= self.min_keys:
+                    gone = set(present)
+                    node.keys = new_keys(self.int_keys, [k for k in node.keys if k not in gone])
+                    self._bump(node, -len(present))
+                    if self.bloom is not None:
+                        self._bloom_deletes += len(present)
+                else:
+                    # la feuille passerait sous min_keys : réparation clé par clé
+                    slow.extend(present)
+                continue
+            groups, found = partition_run(node.keys, batch, i, j)
+            for k in found:
+                if slow and slow[-1] == k:
+                    missing.append(k)
+                else:
+                    slow.append(k)
+            for c, a, b in groups:
+                stack.append((self._writable(node, c), a, b))
+
+        for k in slow:
+            self._delete_key(k)
+        return missing
+
+    def _split_many(self, node: BTreeNode) -> BTreeNode:
+        # découpe un nœud trop plein en autant de morceaux que nécessaire ; renvoie le parent
+        self._finger = None
+        parent = node.parent
+        if parent is None:
+            parent = self._new_node(leaf=False)
+            parent.children.append(node)
+            node.parent = parent
+            self.root = parent
+            self._refresh(parent)
+            idx = 0
+        else:
+            idx = self._find_key_index(parent, node.keys[0])
+
+        target = (self.min_keys + self.max_keys + 1) // 2
+        keys, children = node.keys, node.children
+        pieces, seps = [], []
+        pos = 0
+        for j, size in enumerate(pack_sizes(len(keys), target, self.min_keys, self.max_keys)):
+            piece = node if j == 0 else self._new_node(leaf=node.leaf)
+            piece.parent = parent
+            piece.keys = keys[pos:pos + size]
+            if not node.leaf:
+                piece.children = children[pos:pos + size + 1]
+                for c in piece.children:
+                    c.parent = piece
+            pieces.append(piece)
+            pos += size
+            if pos < len(keys):
+                seps.append(keys[pos])
+                pos += 1
+
+        parent.keys[idx:idx] = new_keys(self.int_keys, seps)
+        parent.children[idx + 1:idx + 1] = pieces[1:]
+        self._refresh(*pieces)
+        return parent
+
+    # ============================================================
+    # COUPE ET RECOLLAGE (split_at, join, delete_range)
+    # ============================================================
+    # Un morceau est un couple (racine détachée | None, hauteur) : sa racine
+    # peut avoir moins de min_keys clés, tous ses autres nœuds sont valides.
+    def split_at(self, key: Any) -> Tuple['bTree', 'bTree']:
+        """Coupe l'arbre en (clés < key, clés >= key) en O(log N) restructurations.
+
+        Les nœuds du chemin de key sont découpés et les morceaux recollés de
+        bas en haut ; les sous-arbres hors du chemin passent tels quels dans
+        les deux résultats. L'arbre courant est vidé.
+        """
+        k = self._key(key)
+        left, value, right = self._split(self._detach(), k)
+        if value is not MISSING:
+            right = self._join3((None, 0), k, value, right)
+        results = self._adopt(left), self._adopt(right)
+        self._clear()
+        return results
+
+    def join(self, other: 'bTree'):
+        """Ajoute à l'arbre toutes les clés de other, qui doivent dépasser les siennes.
+
+        La plus petite clé de other sert de séparatrice : le moins haut des
+        deux arbres est accroché au bord du plus haut, au niveau de même
+        hauteur, en O(log N) restructurations. other est vidé.
+        """
+        if other is self or type(other) is not type(self) or \
+                (other.order, other.int_keys, other.counted, other.key) != \
+                (self.order, self.int_keys, self.counted, self.key):
+            raise ValueError("join needs two distinct trees of the same kind and order")
+        right = other._detach()
+        if right[0] is None:
+            return
+        if self.root.keys and self._get_predecessor(self.root) >= self._get_successor(right[0]):
+            raise ValueError("join needs every key of other above every key of self")
+        # les nœuds repris de other sont traités comme partagés (copie sur écriture)
+        self._epoch = max(self._epoch, other._epoch) + 1
+        k, value, right = self._pop_min(right)
+        self.root = self._join3(self._detach(), k, value, right)[0] or self._new_node(leaf=True)
+        if self.bloom is not None:
+            # pas d'union d'étages : le taux d'erreur cumulé dépasserait la borne
+            self._bloom_stale()
+        other._clear()
+
+    def delete_range(self, lo: Any, hi: Any):
+        """Supprime toutes les clés de [lo, hi] (bornes incluses) en O(log N) restructurations.
+
+        Deux coupes isolent la plage, abandonnée d'un bloc, puis les deux
+        restes sont recollés : le coût ne dépend pas du nombre de clés retirées.
+        """
+        lo, hi = self._key(lo), self._key(hi)
+        if lo > hi:
+            return
+        left, _, rest = self._split(self._detach(), lo)
+        _, _, right = self._split(rest, hi)
+        if right[0] is not None:
+            k, value, right = self._pop_min(right)
+            left = self._join3(left, k, value, right)
+        self.root = left[0] or self._new_node(leaf=True)
+        if self.bloom is not None:
+            self._bloom_stale()
+
+    def _detach(self) -> Tuple[Optional[BTreeNode], int]:
+        # racine courante comme morceau ; l'arbre reste à réaffecter par l'appelant
+        self.version += 1
+        self._settle_spine()
+        self._finger = None
+        root = self.root
+        if root.leaf and not root.keys:
+            return None, 0
+        h, node = 1, root
+        while not node.leaf:
+            node = node.children[0]
+            h += 1
+        return root, h
+
+    def _clear(self):
+        self.root = self._new_node(leaf=True)
+        self._finger = None
+        if self.bloom is not None:
+            self._rebuild_bloom()
+
+    def _adopt(self, piece: Tuple[Optional[BTreeNode], int]) -> 'bTree':
+        # nouvel arbre de même configuration autour d'un morceau
+        tree = type(self)(self.order, self.int_keys, self.counted, key=self.key)
+        tree._epoch = self._epoch
+        if piece[0] is not None:
+            tree.root = piece[0]
+        if self.bloom is not None:
+            tree._bloom_error, tree._bloom_capacity = self._bloom_error, self._bloom_capacity
+            tree.bloom = self.bloom
+            tree._bloom_stale()
+        return tree
+
+    def _bloom_stale(self):
+        # filtre reconstruit au prochain may_contain (partagé ou périmé d'ici là :
+        # il ne peut qu'avoir des clés en trop, jamais en moins)
+        self._bloom_deletes = self.bloom.count + 1
+
+    def _piece(self, leaf: bool, keys: Sequence[Key], values: Optional[List[Any]],
+               children: List[BTreeNode], h: int) -> Tuple[Optional[BTreeNode], int]:
+        # nœud détaché neuf ; sans clé, il se réduit à son unique fils (ou à rien)
+        if not keys:
+            if leaf:
+                return None, 0
+            child = children[0]
+            child.parent = None
+            return child, h - 1
+        node = self._new_node(leaf, keys)
+        if values is not None:
+            node.values = list(values)
+        node.children = list(children)
+        for c in node.children:
+            c.parent = node
+        self._refresh(node)
+        return node, h
+
+    def _split(self, piece: Tuple[Optional[BTreeNode], int], k: Key) -> tuple:
+        # (clés < k, valeur de k ou MISSING, clés > k) : chaque niveau du chemin
+        # est coupé en deux nœuds neufs, recollés aux morceaux du niveau inférieur
+        node, h = piece
+        if node is None:
+            return (None, 0), MISSING, (None, 0)
+        keys, values, children = node.keys, node.values, node.children
+        i = bisect.bisect_left(keys, k)
+        found = i < len(keys) and keys[i] == k
+        value = (None if values is None else values[i]) if found else MISSING
+        if node.leaf:
+            j = i + found
+            return (self._piece(True, keys[:i], values and values[:i], [], 1), value,
+                    self._piece(True, keys[j:], values and values[j:], [], 1))
+        if found:
+            # k sépare deux fils : aucun recollage à ce niveau
+            return (self._piece(False, keys[:i], values and values[:i], children[:i + 1], h), value,
+                    self._piece(False, keys[i + 1:], values and values[i + 1:], children[i + 1:], h))
+        child = children[i]
+        child.parent = None
+        left, value, right = self._split((child, h - 1), k)
+        if i > 0:
+            rest = self._piece(False, keys[:i - 1], values and values[:i - 1], children[:i], h)
+            left = self._join3(rest, keys[i - 1], None if values is None else values[i - 1], left)
+        if i < len(keys):
+            rest = self._piece(False, keys[i + 1:], values and values[i + 1:], children[i + 1:], h)
+            right = self._join3(right, keys[i], None if values is None else values[i], rest)
+        return left, value, right
+
+    def _own(self, node: BTreeNode) -> BTreeNode:
+        # racine de morceau modifiable (recopiée si partagée avec un instantané)
+        return node if node.epoch == self._epoch else self._copy(node, None)
+
+    def _top(self, node: BTreeNode) -> BTreeNode:
+        while node.parent is not None:
+            node = node.parent
+        return node
+
+    def _refresh_up(self, node: BTreeNode):
+        if self.counted:
+            while node is not None:
+                node.size = subtree_size(node)
+                node = node.parent
+
+    def _pop_min(self, piece: Tuple[BTreeNode, int]) -> tuple:
+        # retire la plus petite clé d'un morceau non vide : (clé, valeur, morceau)
+        root, h = piece
+        node = root = self._own(root)
+        while not node.leaf:
+            node = self._writable(node, 0)
+        k = node.keys.pop(0)
+        value = None if node.values is None else node.values.pop(0)
+        self._bump(node, -1)
+        self._fix_underflow(node)
+        if not root.keys:
+            if root.leaf:
+                return k, value, (None, 0)
+            root = root.children[0]
+            root.parent = None
+            h -= 1
+        return k, value, (root, h)
+
+    def _join3(self, left: Tuple[Optional[BTreeNode], int], k: Key, value: Any,
+               right: Tuple[Optional[BTreeNode], int]) -> Tuple[BTreeNode, int]:
+        # recolle left < k < right ; le moins haut est accroché au bord du plus
+        # haut, au niveau de même hauteur, puis réparé par emprunt ou fusion
+        (l, lh), (r, rh) = left, right
+        if l is None and r is None:
+            node = self._new_node(leaf=True, keys=[k])
+            if node.values is not None:
+                node.values[0] = value
+            return node, 1
+        if l is not None and (r is None or lh >= rh):
+            top = self._own(l)
+            node = top
+            for _ in range(lh - rh - 1 if r is not None else lh - 1):
+                node = self._writable(node, len(node.children) - 1)
+            if r is None:
+                node.keys.append(k)
+                if node.values is not None:
+                    node.values.append(value)
+            elif lh == rh:
+                r = self._own(r)
+                if len(l.keys) + 1 + len(r.keys) <= self.max_keys:
+                    self._concat(top, k, value, r)
+                    return top, lh
+                root = self._new_node(leaf=False, keys=[k])
+                if root.values is not None:
+                    root.values[0] = value
+                root.children = [top, r]
+                top.parent = r.parent = root
+                self._refresh(root)
+                self._balance_root(root)
+                return root, lh + 1
+            else:
+                node.keys.append(k)
+                if node.values is not None:
+                    node.values.append(value)
+                node.children.append(r)
+                r.parent = node
+                self._balance_pair(node)
+        else:
+            top = self._own(r)
+            node = top
+            for _ in range(rh - lh - 1 if l is not None else rh - 1):
+                node = self._writable(node, 0)
+            node.keys.insert(0, k)
+            if node.values is not None:
+                node.values.insert(0, value)
+            if l is not None:
+                node.children.insert(0, l)
+                l.parent = node
+                self._balance_pair(node, first=True)
+        self._refresh_up(node)
+        height = max(lh, rh)
+        if len(node.keys) > self.max_keys:
+            self._handle_split_up(node)
+            if top.parent is not None:
+                top, height = self._top(top), height + 1
+        return top, height
+
+    def _concat(self, left: BTreeNode, k: Key, value: Any, right: BTreeNode):
+        # left + k + right dans left (au plus max_keys clés)
+        left.keys.append(k)
+        left.keys.extend(right.keys)
+        if left.values is not None:
+            left.values.append(value)
+            left.values.extend(right.values)
+        for c in right.children:
+            c.parent = left
+        left.children.extend(right.children)
+        self._refresh(left)
+
+    def _balance_pair(self, parent: BTreeNode, first: bool = False):
+        # fils accroché (dernier, ou premier si first) éventuellement sous
+        # min_keys : fusion avec son voisin si elle tient, sinon emprunts
+        idx = 0 if first else len(parent.children) - 1
+        other = 1 if first else idx - 1
+        node = self._writable(parent, idx)
+        sibling = self._writable(parent, other)
+        if len(node.keys) >= self.min_keys:
+            return
+        if len(node.keys) + 1 + len(sibling.keys) <= self.max_keys:
+            self._merge(parent, min(idx, other))
+            return
+        while len(node.keys) < self.min_keys:
+            if first:
+                self._borrow_from_next(parent, idx)
+            else:
+                self._borrow_from_prev(parent, idx)
+
+    def _balance_root(self, root: BTreeNode):
+        # racine neuve [k] entre deux racines de morceaux de même hauteur, qui
+        # totalisent au moins 2d clés : emprunts jusqu'à min_keys de chaque côté
+        left, right = root.children
+        while len(left.keys) < self.min_keys:
+            self._borrow_from_next(root, 0)
+        while len(right.keys) < self.min_keys:
+            self._borrow_from_prev(root, 1)
+
+    # ============================================================
+    # FILTRE DE BLOOM (échecs de recherche sans descente)
+    # ============================================================
+    def enable_bloom(self, error_rate: float = 0.01, capacity: int = 1024):
+        """Active un filtre de Bloom extensible devant search().
+
+        error_rate borne le taux de faux positifs ; capacity est la taille du
+        premier étage (mémoire ≈ -capacity·ln(error_rate)/ln(2)² bits, le
+        filtre grandit par étages). Une clé absente du filtre est absente de
+        l'arbre : search répond en O(1). Les suppressions ne retirent rien du
+        filtre ; il est reconstruit paresseusement, au premier search qui
+        suit, quand les clés supprimées dépassent la moitié des clés ajoutées.
+        """
+        self._bloom_error = error_rate
+        self._bloom_capacity = capacity
+        self._rebuild_bloom()
+
+    def disable_bloom(self):
+        self.bloom = None
+
+    def _rebuild_bloom(self):
+        count = self.root.size if self.counted else sum(1 for _ in self)
+        self.bloom = ScalableBloomFilter.from_keys(iter(self), count, self._bloom_capacity,
+                                                   self._bloom_error)
+        self._bloom_deletes = 0
+
+    def may_contain(self, k: Key) -> bool:
+        # k déjà transformée par key ; False garantit l'absence
+        if self._bloom_deletes * 2 > self.bloom.count:
+            self._rebuild_bloom()
+        return k in self.bloom
+
+    def bloom_stats(self) -> Dict[str, float]:
+        return bloom_stats(self.bloom, getattr(self, "_bloom_deletes", 0))
+
+    # ============================================================
+    # INSTANTANÉS (copie de chemin sur écriture)
+    # ============================================================
+    def snapshot(self) -> 'BTreeSnapshot':
+        """Vue en lecture seule de l'état courant, en O(1).
+
+        Tous les nœuds existants deviennent partagés : l'écrivain recopie
+        ensuite chaque nœud avant de le modifier (copie du chemin racine ->
+        feuille), si bien que les nœuds visibles depuis l'instantané ne
+        changent plus. Les lecteurs ne suivent jamais `parent` : ce pointeur
+        reste réservé à l'écrivain et désigne toujours le parent vivant.
+        """
+        self._settle_spine()
+        self._finger = None
+        self._epoch += 1
+        return BTreeSnapshot(self)
+
+    def _copy(self, node: BTreeNode, parent: Optional[BTreeNode]) -> BTreeNode:
+        self._finger = None
+        copy = self._new_node(node.leaf, node.keys)
+        if node.values is not None:
+            copy.values = list(node.values)
+        copy.size = node.size
+        copy.parent = parent
+        if not node.leaf:
+            copy.children = list(node.children)
+            for c in copy.children:
+                c.parent = copy
+        return copy
+
+    def _own_root(self):
+        if self.root is not None and self.root.epoch != self._epoch:
+            self.root = self._copy(self.root, None)
+
+    def _writable(self, parent: BTreeNode, i: int) -> BTreeNode:
+        # fils i de parent (déjà possédé), recopié s'il est partagé avec un instantané
+        child = parent.children[i]
+        if child.epoch != self._epoch:
+            child = parent.children[i] = self._copy(child, parent)
+        return child
 
     # ============================================================
-    # DEBUG
+    # PARCOURS ORDONNÉ
     # ============================================================
+    def cursor(self) -> Cursor:
+        return Cursor(self.root)
+
+    def range(self, lo: Optional[Any] = None, hi: Optional[Any] = None) -> Iterator[Key]:
+        # clés de [lo, hi] (bornes incluses, None = non bornée), générées à la demande
+        return iter_range(self.root, None if lo is None else self._key(lo),
+                          None if hi is None else self._key(hi))
+
+    def __iter__(self) -> Iterator[Key]:
+        return iter_range(self.root)
+
+    def __reversed__(self) -> Iterator[Key]:
+        return iter_reversed(self.root)
+
+    # ============================================================
+    # INVARIANTS
+    # ============================================================
+    def check_invariants(self) -> int:
+        # renvoie le nombre de clés ; lève InvariantError au premier défaut
+        # (le bord droit laissé par les ajouts en fin est d'abord rééquilibré)
+        self._settle_spine()
+        return check_invariants(self.root, self.min_keys, self.max_keys,
+                                parents=True, counted=self.counted)
+
+    # ============================================================
+    # STATISTIQUES D'ORDRE (mode counted)
+    # ============================================================
+    def _require_counted(self):
+        if not self.counted:
+            raise ValueError("rank/select need a tree built with counted=True")
+
+    def rank(self, key: Any) -> int:
+        # nombre de clés strictement inférieures à key
+        self._require_counted()
+        return rank(self.root, self._key(key))
+
+    def select(self, k: int) -> Key:
+        # k-ième plus petite clé (k à partir de 0), IndexError hors bornes
+        self._require_counted()
+        return select(self.root, k)
+
+    def count_range(self, lo: Any, hi: Any) -> int:
+        # nombre de clés dans [lo, hi] sans parcourir la plage
+        self._require_counted()
+        lo, hi = self._key(lo), self._key(hi)
+        if lo > hi:
+            return 0
+        return rank(self.root, hi, inclusive=True) - rank(self.root, lo)
+
+    # ============================================================
+    # MÉMOIRE / DEBUG
+    # ============================================================
+    def memory_report(self) -> Dict[str, float]:
+        return memory_report(self.root)
+
     def print_tree(self, node: Optional[BTreeNode] = None, lvl: int = 0):
         if node is None:
             node = self.root
         if node is None:
             print("(arbre vide)")
             return
-        print("  " * lvl + str(node.keys))
+        print("  " * lvl + str(list(node.keys)))
         if not node.leaf:
             for c in node.children:
                 self.print_tree(c, lvl + 1)
 
 
+class BTreeSnapshot:
+    """Instantané figé d'un bTree : lecture seule, sûr depuis d'autres threads."""
+
+    __slots__ = ("root", "order", "counted", "key")
+
+    def __init__(self, tree: bTree):
+        self.root = tree.root
+        self.order = tree.order
+        self.counted = tree.counted
+        self.key = tree.key
+
+    def search(self, k: Any) -> Optional[Tuple[BTreeNode, int]]:
+        k = self._key(k)
+        node = self.root
+        while node is not None:
+            i = bisect.bisect_left(node.keys, k)
+            if i < len(node.keys) and node.keys[i] == k:
+                return node, i
+            if node.leaf:
+                return None
+            node = node.children[i]
+        return None
+
+    def __contains__(self, k: Any) -> bool:
+        return self.search(k) is not None
+
+    def cursor(self) -> Cursor:
+        return Cursor(self.root)
+
+    def __iter__(self) -> Iterator[Key]:
+        return iter_range(self.root)
+
+    def __reversed__(self) -> Iterator[Key]:
+        return iter_reversed(self.root)
+
+    # range/rank/select/count_range de bTree ne lisent que root, counted et key
+    _key = bTree._key
+    range = bTree.range
+    _require_counted = bTree._require_counted
+    rank = bTree.rank
+    select = bTree.select
+    count_range = bTree.count_range
+
+
 # ============================================================
 # TEST DE VALIDATION
 # ============================================================
@@ -0,0 +1,366 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import bisect
+import random
+import threading
+import time
+
+from TP2.b_arbre import BTreeNode, bTree
+from TP2.generateurs_cles import zipf_keys
+from TP2.outils_arbre import Key, KeyFunc, new_keys
+
+
+class WaitCounter:
+    # compteur partagé des acquisitions de latch qui ont dû attendre
+    __slots__ = ("_lock", "value")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def hit(self):
+        with self._lock:
+            self.value += 1
+
+
+# ============================================================
+# VERROUS LÉGERS LECTEURS / ÉCRIVAIN (latches)
+# ============================================================
+class RWLatch:
+    """Latch lecteurs/écrivain non réentrant, tenu le temps d'une descente."""
+
+    __slots__ = ("_cond", "_readers", "_writer", "_waits")
+
+    def __init__(self, waits: Optional[WaitCounter] = None):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._waits = waits
+
+    def acquire_read(self):
+        with self._cond:
+            if self._writer and self._waits is not None:
+                self._waits.hit()
+            while self._writer:
+                self._cond.wait()
+            self._readers += 1
+
+    def release_read(self):
+        with self._cond:
+            self._readers -= 1
+            if not self._readers:
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        with self._cond:
+            if (self._writer or self._readers) and self._waits is not None:
+                self._waits.hit()
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._writer = True
+
+    def release_write(self):
+        with self._cond:
+            self._writer = False
+            self._cond.notify_all()
+
+
+class LatchedNode(BTreeNode):
+    __slots__ = ("latch",)
+
+    def __init__(self, leaf: bool = True, keys: Optional[Sequence[Key]] = None,
+                 waits: Optional[WaitCounter] = None):
+        super().__init__(leaf, keys)
+        self.latch = RWLatch(waits)
+
+
+# ============================================================
+# ARBRE B MULTI-THREAD (lock coupling / crabbing)
+# ============================================================
+class ConcurrentBTree(bTree):
+    """bTree sûr pour plusieurs threads écrivains et lecteurs.
+
+    Chaque nœud porte un latch lecteurs/écrivain ; un latch d'arbre protège le
+    pointeur de racine. Les descentes prennent le latch du fils avant de lâcher
+    celui du parent. En écriture, tous les ancêtres sont relâchés dès qu'un fils
+    est « sûr » (moins de max_keys clés en insertion, plus de min_keys en
+    suppression) : seuls les nœuds qu'un éclatement ou une fusion peut
+    atteindre restent verrouillés, et les restructurations suivent ce chemin
+    verrouillé plutôt que les pointeurs parent.
+
+    Les clés sont uniques (insert ignore un doublon). insert_many/delete_many
+    prennent les latches clé par clé. Les opérations qui touchent l'arbre
+    entier ne sont pas disponibles dans ce mode et lèvent ValueError : tailles
+    de sous-arbres (counted), instantanés (snapshot), découpe et recollage
+    (split_at, join, delete_range) et filtre de Bloom (enable_bloom). Le latch
+    de racine ne suffirait pas à les isoler : un écrivain qui l'a relâché sous
+    un fils sûr est encore en cours plus bas. cursor/range/iter ne prennent
+    pas de latch et supposent un arbre au repos.
+    """
+
+    def __init__(self, order: int = 7, int_keys: bool = False, counted: bool = False,
+                 key: Optional[KeyFunc] = None):
+        if counted:
+            raise ValueError("counted trees need every ancestor latched; not supported concurrently")
+        self.waits = WaitCounter()          # attentes de latch (mesure de contention)
+        self._root_latch = RWLatch(self.waits)
+        super().__init__(order, int_keys, key=key)
+
+    def _new_node(self, leaf: bool, keys: Iterable[Key] = ()) -> LatchedNode:
+        node = LatchedNode(leaf, new_keys(self.int_keys, keys), self.waits)
+        node.epoch = self._epoch
+        return node
+
+    # opérations sur l'arbre entier : aucun latch ne les isole des descentes en cours
+    def snapshot(self):
+        raise ValueError("snapshots need a quiescent tree; not supported concurrently")
+
+    def split_at(self, key: Any):
+        raise ValueError("split_at restructures the whole tree; not supported concurrently")
+
+    def join(self, other: bTree):
+        raise ValueError("join restructures the whole tree; not supported concurrently")
+
+    def delete_range(self, lo: Any, hi: Any):
+        raise ValueError("delete_range restructures the whole tree; not supported concurrently")
+
+    def enable_bloom(self, error_rate: float = 0.01, capacity: int = 1024):
+        raise ValueError("the Bloom filter is not latched; not supported concurrently")
+
+    def contention(self) -> int:
+        # nombre d'acquisitions de latch qui ont dû attendre depuis la création
+        return self.waits.value
+
+    # ============================================================
+    # LECTURE : couplage en mode partagé
+    # ============================================================
+    def search(self, k: Any, node: Optional[BTreeNode] = None) -> Optional[Tuple[BTreeNode, int]]:
+        k = self._key(k)
+        self._root_latch.acquire_read()
+        node = self.root
+        node.latch.acquire_read()
+        self._root_latch.release_read()
+        while True:
+            i = bisect.bisect_left(node.keys, k)
+            if i < len(node.keys) and node.keys[i] == k:
+                node.latch.release_read()
+                return node, i
+            if node.leaf:
+                node.latch.release_read()
+                return None
+            child = node.children[i]
+            child.latch.acquire_read()
+            node.latch.release_read()
+            node = child
+
+    def __contains__(self, k: Any) -> bool:
+        return self.search(k) is not None
+
+    # ============================================================
+    # ÉCRITURE : descente verrouillée, libération anticipée
+    # ============================================================
+    def _release(self, held: List[LatchedNode], root_held: bool, keep: Optional[LatchedNode] = None):
+        for node in held:
+            if node is not keep:
+                node.latch.release_write()
+        if root_held:
+            self._root_latch.release_write()
+
+    def insert(self, key: Any) -> bool:
+        # renvoie False si la clé était déjà présente
+        return self._insert_key(self._key(key))
+
+    def _insert_key(self, key: Key) -> bool:
+        self.version += 1               # indicatif : il suffit qu'il change
+        self._root_latch.acquire_write()
+        root_held = True
+        node = self.root
+        node.latch.acquire_write()
+        path = [node]
+        if len(node.keys) < self.max_keys:
+            self._root_latch.release_write()
+            root_held = False
+
+        while True:
+            i = bisect.bisect_left(node.keys, key)
+            if i < len(node.keys) and node.keys[i] == key:
+                self._release(path, root_held)
+                return False
+            if node.leaf:
+                break
+            child = node.children[i]
+            child.latch.acquire_write()
+            if len(child.keys) < self.max_keys:
+                # fils sûr : aucun éclatement ne remontera au-dessus de lui
+                self._release(path, root_held)
+                root_held = False
+                path = []
+            path.append(child)
+            node = child
+
+        node.keys.insert(i, key)
+        # éclatements le long du chemin encore verrouillé
+        for depth in range(len(path) - 1, -1, -1):
+            full = path[depth]
+            if len(full.keys) <= self.max_keys:
+                break
+            if depth == 0:
+                # seul un chemin partant de la racine garde le latch d'arbre
+                new_root = self._new_node(leaf=False)
+                new_root.children.append(full)
+                full.parent = new_root
+                self._split_child(new_root, 0)
+                self.root = new_root
+            else:
+                parent = path[depth - 1]
+                self._split_child(parent, self._find_key_index(parent, full.keys[0]))
+        self._release(path, root_held)
+        return True
+
+    def delete(self, k: Any) -> bool:
+        # renvoie False si la clé est absente
+        return self._delete_key(self._key(k))
+
+    def _delete_key(self, k: Key) -> bool:
+        self.version += 1
+        self._root_latch.acquire_write()
+        root_held = True
+        node = self.root
+        node.latch.acquire_write()
+        path = [node]
+        if node.leaf or len(node.keys) > 1:
+            self._root_latch.release_write()
+            root_held = False
+
+        found: Optional[LatchedNode] = None    # nœud interne contenant k, gardé verrouillé
+        found_idx = -1
+        while True:
+            i = bisect.bisect_left(node.keys, k) if found is None else len(node.keys)
+            if found is None and i < len(node.keys) and node.keys[i] == k:
+                if node.leaf:
+                    break
+                found, found_idx = node, i
+            elif node.leaf:
+                if found is None:
+                    self._release(path, root_held)
+                    return False
+                i = len(node.keys) - 1          # prédécesseur : dernière clé de la feuille
+                break
+            child = node.children[i]
+            child.latch.acquire_write()
+            if len(child.keys) > self.min_keys:
+                # fils sûr : une fusion en dessous ne peut pas le vider
+                self._release(path, root_held, keep=found)
+                root_held = False
+                path = []
+            path.append(child)
+            node = child
+
+        removed = node.keys.pop(i)
+        if found is not None:
+            found.keys[found_idx] = removed
+            if found not in path:
+                found.latch.release_write()
+
+        # réparation ascendante des sous-remplissages, frère verrouillé sous le parent
+        for depth in range(len(path) - 1, 0, -1):
+            child = path[depth]
+            if len(child.keys) >= self.min_keys:
+                break
+            parent = path[depth - 1]
+            idx = parent.children.index(child)
+            left = parent.children[idx - 1] if idx > 0 else None
+            right = parent.children[idx + 1] if idx + 1 < len(parent.children) else None
+            sibling = left if left is not None else right
+            sibling.latch.acquire_write()
+            if len(sibling.keys) <= self.min_keys and right is not None and sibling is left:
+                # frère gauche minimal : essayer le droit avant de fusionner
+                right.latch.acquire_write()
+                if len(right.keys) > self.min_keys:
+                    left.latch.release_write()
+                    sibling = right
+                else:
+                    right.latch.release_write()
+            if len(sibling.keys) > self.min_keys:
+                if sibling is left:
+                    self._borrow_from_prev(parent, idx)
+                else:
+                    self._borrow_from_next(parent, idx)
+            elif sibling is left:
+                self._merge(parent, idx - 1)
+            else:
+                self._merge(parent, idx)
+            sibling.latch.release_write()
+
+        root = self.root
+        if root_held and not root.leaf and not root.keys:
+            self.root = root.children[0]
+            self.root.parent = None
+        self._release(path, root_held)
+        return True
+
+    # ============================================================
+    # LOTS : une opération verrouillée par clé
+    # ============================================================
+    def insert_many(self, keys: Iterable[Any]) -> List[Key]:
+        return [k for k in sorted(self._keys(keys)) if not self._insert_key(k)]
+
+    def delete_many(self, keys: Iterable[Any]) -> List[Key]:
+        return [k for k in sorted(self._keys(keys)) if not self._delete_key(k)]
+
+
+# ============================================================
+# BANC D'ESSAI DE CONTENTION
+# ============================================================
+def contention_benchmark(threads: Sequence[int] = (1, 2, 4, 8), skews: Sequence[float] = (0.0, 0.5, 0.99),
+                         preload: int = 50_000, ops_per_thread: int = 20_000, order: int = 33,
+                         write_ratio: float = 0.5, seed: int = 0) -> List[Dict[str, float]]:
+    """Débit d'un mélange insert/delete/search selon le nombre de threads et l'asymétrie des clés.
+
+    Renvoie une ligne par (threads, skew) : ops/s et nombre d'attentes de latch.
+    Sous CPython le GIL sérialise le calcul : le débit mesure surtout le coût du
+    protocole de verrouillage, et les attentes la contention sur les nœuds chauds.
+    """
+    space = preload * 2
+    rows = []
+    for skew in skews:
+        for n in threads:
+            tree = ConcurrentBTree.bulk_load(range(0, space, 2), order)
+            work = []
+            for t in range(n):
+                rnd = random.Random(seed * 1000 + t)
+                keys = zipf_keys(rnd, space, skew, ops_per_thread)
+                kinds = [rnd.random() for _ in keys]
+                work.append((keys, kinds))
+
+            def run(keys: List[int], kinds: List[float]):
+                for k, r in zip(keys, kinds):
+                    if r < write_ratio / 2:
+                        tree.insert(k)
+                    elif r < write_ratio:
+                        tree.delete(k)
+                    else:
+                        tree.search(k)
+
+            workers = [threading.Thread(target=run, args=w) for w in work]
+            before = tree.contention()
+            start = time.perf_counter()
+            for w in workers:
+                w.start()
+            for w in workers:
+                w.join()
+            elapsed = time.perf_counter() - start
+            rows.append({
+                "threads": n,
+                "skew": skew,
+                "ops": n * ops_per_thread,
+                "seconds": elapsed,
+                "ops_per_sec": n * ops_per_thread / elapsed,
+                "latch_waits": tree.contention() - before,
+            })
+    return rows
+
+
+if __name__ == "__main__":
+    print(f"{'threads':>7} {'skew':>5} {'ops/s':>12} {'waits':>8}")
+    for row in contention_benchmark():
+        print(f"{row['threads']:>7} {row['skew']:>5} {row['ops_per_sec']:>12.0f} {row['latch_waits']:>8}")
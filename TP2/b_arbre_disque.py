@@ -0,0 +1,788 @@
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+import bisect
+import itertools
+import mmap
+import os
+import struct
+
+from TP2.bloom_arbre import ScalableBloomFilter, bloom_stats
+from TP2.cles_arbre import common_prefix, compress_prefix, decode_key, encode_key
+from TP2.journal import DELETE, INSERT, WriteAheadLog
+from TP2.outils_arbre import InvariantError, Key, KeyFunc
+
+
+# ============================================================
+# FORMAT DU FICHIER
+# ============================================================
+# page 0 : en-tête ; pages suivantes : un nœud par page
+#   nœud int64         : leaf (B) | nkeys (H) | nkeys clés int64 | nkeys+1 fils uint32
+#   nœud memcomparable : leaf (B) | nkeys (H) | lg préfixe (H) | préfixe commun
+#                        | nkeys × (lg suffixe (H) | suffixe) | nkeys+1 fils uint32
+#   libre : 0xFF (B) | page libre suivante (I)
+# Le format des clés est donné par le magic de l'en-tête. En int64, l'ordre
+# borne le nombre de clés d'un nœud ; en memcomparable, il n'en est qu'un
+# plafond : un nœud éclate dès que sa page encodée (préfixe factorisé) déborde.
+MAGIC = b"BTREEPG1"
+MAGIC_BYTES = b"BTREEPK1"
+KEY_FORMATS = {MAGIC: "int64", MAGIC_BYTES: "memcomparable"}
+HEADER = struct.Struct("<8sIIIIIQ")   # magic, page_size, order, root, page_count, free_head, count
+NODE_HEADER = struct.Struct("<BH")
+KEY_LEN = struct.Struct("<H")
+FREE_PAGE = struct.Struct("<BI")
+FREE_MARK = 0xFF
+NO_PAGE = 0
+INT64_MIN, INT64_MAX = -(1 << 63), (1 << 63) - 1
+
+
+def max_order(page_size: int, byte_keys: bool = False) -> int:
+    # plus grand ordre impair dont un nœud plein tient dans une page ;
+    # memcomparable : plafond atteint quand toutes les clés se réduisent au préfixe commun
+    if byte_keys:
+        max_keys = (page_size - NODE_HEADER.size - KEY_LEN.size - 4) // (KEY_LEN.size + 4)
+    else:
+        max_keys = (page_size - NODE_HEADER.size - 4) // 12
+    max_keys -= max_keys % 2
+    return max_keys + 1
+
+
+def key_budget(page_size: int) -> int:
+    # plus longue clé encodée acceptée : quatre telles clés tiennent dans une page,
+    # si bien qu'un nœud qui déborde a toujours un partage en deux moitiés qui tiennent
+    return (page_size - NODE_HEADER.size - KEY_LEN.size - 4) // 4 - KEY_LEN.size - 4
+
+
+class DiskNode:
+    __slots__ = ("page_id", "leaf", "keys", "children", "dirty")
+
+    def __init__(self, page_id: int, leaf: bool = True):
+        self.page_id = page_id
+        self.leaf = leaf
+        self.keys: List[Key] = []       # int, ou bytes encodés (memcomparable)
+        self.children: List[int] = []   # numéros de pages des fils
+        self.dirty = True
+
+    def __repr__(self):
+        return f"DiskNode(page={self.page_id}, keys={self.keys}, leaf={self.leaf})"
+
+
+# ============================================================
+# PAGER : fichier mmap + pool de pages décodées (LRU)
+# ============================================================
+class Pager:
+    def __init__(self, path: str, page_size: int = 4096, cache_pages: int = 1024,
+                 key_format: str = "int64"):
+        if key_format not in KEY_FORMATS.values():
+            raise ValueError(f"unknown key format {key_format!r}")
+        if cache_pages < 1:
+            raise ValueError("cache_pages must be >= 1")
+        self.path = path
+        self.cache_pages = cache_pages
+        self.cache: "OrderedDict[int, DiskNode]" = OrderedDict()
+        self.pending: Dict[int, bytes] = {}      # pages libérées, écrites au flush
+        self.wal: Optional[WriteAheadLog] = None
+
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, "w+b" if new_file else "r+b")
+        if new_file:
+            self.magic = MAGIC if key_format == "int64" else MAGIC_BYTES
+            self.page_size = page_size
+            self.order = 0
+            self.root = NO_PAGE
+            self.page_count = 1
+            self.free_head = NO_PAGE
+            self.count = 0
+            self._file.truncate(page_size * 8)
+            self._mm = mmap.mmap(self._file.fileno(), 0)
+            self.write_header()
+        else:
+            self._mm = mmap.mmap(self._file.fileno(), 0)
+            (self.magic, self.page_size, self.order, self.root, self.page_count,
+             self.free_head, self.count) = HEADER.unpack_from(self._mm, 0)
+            if self.magic not in KEY_FORMATS:
+                self.close()
+                raise ValueError(f"{path} is not a B-tree page file")
+        self.key_format = KEY_FORMATS[self.magic]
+        self.byte_keys = self.magic == MAGIC_BYTES
+
+    # ---------------- en-tête ----------------
+    def header_bytes(self) -> bytes:
+        return HEADER.pack(self.magic, self.page_size, self.order, self.root,
+                           self.page_count, self.free_head, self.count)
+
+    def write_header(self):
+        self._mm[0:HEADER.size] = self.header_bytes()
+
+    def load_header(self, data: bytes):
+        (_, self.page_size, self.order, self.root, self.page_count,
+         self.free_head, self.count) = HEADER.unpack_from(data, 0)
+
+    # ---------------- pages brutes ----------------
+    def _ensure_size(self, page_id: int):
+        needed = (page_id + 1) * self.page_size
+        if needed > len(self._mm):
+            self._mm.resize(max(needed, 2 * len(self._mm)))
+
+    def read_page(self, page_id: int) -> bytes:
+        off = page_id * self.page_size
+        return self._mm[off:off + self.page_size]
+
+    def write_page(self, page_id: int, data: bytes):
+        self._ensure_size(page_id)
+        off = page_id * self.page_size
+        self._mm[off:off + len(data)] = data
+
+    def encode(self, node: DiskNode) -> bytes:
+        n = len(node.keys)
+        if self.byte_keys:
+            # préfixe commun écrit une fois, puis le suffixe de chaque clé
+            prefix, suffixes = compress_prefix(node.keys)
+            parts = [NODE_HEADER.pack(1 if node.leaf else 0, n), KEY_LEN.pack(len(prefix)), prefix]
+            for suffix in suffixes:
+                parts.append(KEY_LEN.pack(len(suffix)))
+                parts.append(suffix)
+            data = b"".join(parts)
+        else:
+            data = NODE_HEADER.pack(1 if node.leaf else 0, n) + array("q", node.keys).tobytes()
+        if not node.leaf:
+            data += array("I", node.children).tobytes()
+        if len(data) > self.page_size:
+            raise ValueError(f"node of {n} keys does not fit in a {self.page_size}-byte page")
+        return data
+
+    def node_bytes(self, keys: Sequence[Key], leaf: bool) -> int:
+        # taille encodée d'un nœud de ces clés (triées), sans l'encoder
+        n = len(keys)
+        size = NODE_HEADER.size + (0 if leaf else 4 * (n + 1))
+        if not self.byte_keys:
+            return size + 8 * n
+        p = common_prefix(keys)
+        return size + KEY_LEN.size * (n + 1) + p + sum(map(len, keys)) - n * p
+
+    def decode(self, page_id: int, data: bytes) -> DiskNode:
+        leaf, n = NODE_HEADER.unpack_from(data, 0)
+        if leaf == FREE_MARK:
+            raise ValueError(f"page {page_id} is free")
+        node = DiskNode(page_id, leaf=bool(leaf))
+        off = NODE_HEADER.size
+        if self.byte_keys:
+            (length,) = KEY_LEN.unpack_from(data, off)
+            prefix = bytes(data[off + KEY_LEN.size:off + KEY_LEN.size + length])
+            off += KEY_LEN.size + length
+            for _ in range(n):
+                (length,) = KEY_LEN.unpack_from(data, off)
+                node.keys.append(prefix + data[off + KEY_LEN.size:off + KEY_LEN.size + length])
+                off += KEY_LEN.size + length
+        else:
+            keys = array("q")
+            keys.frombytes(data[off:off + 8 * n])
+            node.keys = keys.tolist()
+            off += 8 * n
+        if not node.leaf:
+            children = array("I")
+            children.frombytes(data[off:off + 4 * (n + 1)])
+            node.children = children.tolist()
+        node.dirty = False
+        return node
+
+    # ---------------- pool de pages ----------------
+    def get(self, page_id: int) -> DiskNode:
+        node = self.cache.get(page_id)
+        if node is None:
+            node = self.decode(page_id, self.read_page(page_id))
+            self.cache[page_id] = node
+        else:
+            self.cache.move_to_end(page_id)
+        return node
+
+    def new(self, leaf: bool) -> DiskNode:
+        if self.free_head != NO_PAGE:
+            page_id = self.free_head
+            data = self.pending.pop(page_id, None) or self.read_page(page_id)
+            _, self.free_head = FREE_PAGE.unpack_from(data, 0)
+        else:
+            page_id = self.page_count
+            self.page_count += 1
+            self._ensure_size(page_id)
+        node = DiskNode(page_id, leaf)
+        self.cache[page_id] = node
+        return node
+
+    def free(self, node: DiskNode):
+        self.cache.pop(node.page_id, None)
+        self.pending[node.page_id] = FREE_PAGE.pack(FREE_MARK, self.free_head)
+        self.free_head = node.page_id
+
+    def flush_node(self, node: DiskNode):
+        self.write_page(node.page_id, self.encode(node))
+        node.dirty = False
+
+    def release(self):
+        # appelé entre deux opérations : aucun nœud n'est alors référencé ailleurs
+        excess = len(self.cache) - self.cache_pages
+        if excess <= 0:
+            return
+        if self.wal is None:
+            for _ in range(excess):
+                _, node = self.cache.popitem(last=False)
+                if node.dirty:
+                    self.flush_node(node)
+            return
+
+        # avec journal : pas d'écriture de page sale hors checkpoint (no-steal)
+        victims = []
+        for page_id, node in self.cache.items():
+            if not node.dirty:
+                victims.append(page_id)
+                if len(victims) == excess:
+                    break
+        if len(victims) < excess:
+            self.flush()
+            victims = list(self.cache)[:excess]
+        for page_id in victims:
+            del self.cache[page_id]
+
+    def flush(self):
+        """Écrit les pages modifiées ; avec journal, c'est un checkpoint.
+
+        Les images des pages et l'en-tête sont d'abord journalisés et synchronisés,
+        puis recopiés dans le fichier de données ; le journal n'est vidé qu'une fois
+        le fichier de données synchronisé.
+        """
+        dirty = [node for node in self.cache.values() if node.dirty]
+        if self.wal is not None:
+            for node in dirty:
+                self.wal.log_page(node.page_id, self.encode(node))
+            for page_id, data in self.pending.items():
+                self.wal.log_page(page_id, data)
+            self.wal.log_checkpoint(self.header_bytes())
+        for node in dirty:
+            self.flush_node(node)
+        for page_id, data in self.pending.items():
+            self.write_page(page_id, data)
+        self.pending.clear()
+        self.write_header()
+        self._mm.flush()
+        if self.wal is not None:
+            self.wal.truncate()
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+
+# ============================================================
+# ARBRE B PERSISTANT
+# ============================================================
+class DiskBTree:
+    """Arbre B stocké page par page dans un fichier, même API que bTree.
+
+    Les nœuds vivent dans un fichier mmap ; seules `cache_pages` pages décodées
+    restent en mémoire (LRU) et les pages modifiées sont réécrites à l'éviction
+    ou au flush(). Les doublons sont ignorés à l'insertion.
+
+    Avec wal=True, chaque opération est journalisée dans `path + ".wal"` et le
+    fichier de données n'est modifié qu'aux checkpoints (flush, cache plein de
+    pages sales ou journal au-delà de `checkpoint_bytes`). À l'ouverture après
+    un arrêt brutal, recover() rejoue le journal depuis le dernier checkpoint.
+
+    key_format="int64" (défaut) stocke des entiers 64 bits. Avec
+    "memcomparable", toute clé int/str/bytes/tuple est encodée par
+    cles_arbre.encode_key : les nœuds gardent les octets encodés, comparés
+    tels quels, et chaque page factorise le préfixe commun de ses clés. Un
+    nœud éclate quand sa page encodée déborde (ou qu'il dépasse order - 1
+    clés) : plus le préfixe commun est long, plus il tient de clés, et le
+    partage choisi équilibre le remplissage réel des deux pages. Une clé de
+    plus de `max_key_bytes` octets encodés est refusée : au plus un quart de
+    page (valeur par défaut, seule limite gardée par le fichier), ou moins si
+    l'appelant le demande à l'ouverture. `key` est une fonction de clé
+    appliquée à chaque valeur reçue.
+
+    Avec bloom_error, un filtre de Bloom en mémoire (taux de faux positifs
+    bloom_error, premier étage de bloom_capacity clés) répond aux recherches
+    infructueuses sans lire de page. Il n'est pas persisté : il est construit
+    par un parcours des pages au premier search, puis tenu à jour par les
+    insertions et reconstruit quand les suppressions dépassent la moitié des
+    clés qu'il contient.
+    """
+
+    def __init__(self, path: str, order: Optional[int] = None, page_size: int = 4096,
+                 cache_pages: int = 1024, wal: bool = False, group_size: int = 256,
+                 checkpoint_bytes: int = 64 << 20, key_format: Optional[str] = None,
+                 max_key_bytes: Optional[int] = None, key: Optional[KeyFunc] = None,
+                 bloom_error: Optional[float] = None, bloom_capacity: int = 1024):
+        self.pager = Pager(path, page_size, cache_pages, key_format or "int64")
+        if key_format is not None and key_format != self.pager.key_format:
+            self.pager.close()
+            raise ValueError(f"{path} stores {self.pager.key_format} keys")
+        self.byte_keys = self.pager.byte_keys
+        self.key = key
+        self.bloom_error = bloom_error
+        self.bloom_capacity = bloom_capacity
+        self.bloom: Optional[ScalableBloomFilter] = None    # construit au premier search
+        self._bloom_deletes = 0
+        self.checkpoint_bytes = checkpoint_bytes
+        self._replaying = False
+        if self.pager.order == 0:
+            if order is None:
+                order = max_order(self.pager.page_size, self.byte_keys)
+            if order < 3:
+                self.pager.close()
+                raise ValueError("Order must be >= 3")
+            if order > max_order(self.pager.page_size, self.byte_keys):
+                self.pager.close()
+                raise ValueError(f"Order {order} does not fit in {self.pager.page_size}-byte pages")
+            self.pager.order = order
+            self.pager.root = self.pager.new(leaf=True).page_id
+            self.pager.write_header()
+        elif order is not None and order != self.pager.order:
+            self.pager.close()
+            raise ValueError(f"{path} was created with order {self.pager.order}")
+        self.order = self.pager.order
+        self.d = (self.order - 1) // 2
+        self.max_keys = 2 * self.d
+        self.min_keys = self.d
+        self.max_key_bytes = 8
+        if self.byte_keys:
+            self.max_key_bytes = key_budget(self.pager.page_size)
+            if max_key_bytes is not None:
+                if max_key_bytes > self.max_key_bytes:
+                    self.pager.close()
+                    raise ValueError(f"max_key_bytes {max_key_bytes} exceeds {self.max_key_bytes} "
+                                     f"for {self.pager.page_size}-byte pages")
+                self.max_key_bytes = max_key_bytes
+
+        self.wal: Optional[WriteAheadLog] = None
+        if wal:
+            self.wal = WriteAheadLog(path + ".wal", group_size, byte_keys=self.byte_keys)
+            if self.wal.size:
+                self.recover()
+            self.pager.wal = self.wal
+            self.pager.flush()
+
+    @property
+    def root(self) -> DiskNode:
+        return self.pager.get(self.pager.root)
+
+    def __len__(self) -> int:
+        return self.pager.count
+
+    def _key(self, x: Any) -> Key:
+        # valeur reçue -> clé stockée (entier vérifié, ou octets memcomparable)
+        if self.key is not None:
+            x = self.key(x)
+        if self.byte_keys:
+            data = encode_key(x)
+            if len(data) > self.max_key_bytes:
+                raise ValueError(f"encoded key of {len(data)} bytes exceeds {self.max_key_bytes}")
+            return data
+        if not isinstance(x, int) or not INT64_MIN <= x <= INT64_MAX:
+            raise TypeError(f"int64 pages need 64-bit integer keys, got {x!r}; "
+                            "use key_format='memcomparable'")
+        return x
+
+    # ============================================================
+    # RECHERCHE
+    # ============================================================
+    def search(self, k: Any) -> Optional[Tuple[DiskNode, int]]:
+        k = self._key(k)
+        if self.bloom_error is not None and not self.may_contain(k):
+            return None
+        node = self.root
+        try:
+            while True:
+                i = bisect.bisect_left(node.keys, k)
+                if i < len(node.keys) and node.keys[i] == k:
+                    return node, i
+                if node.leaf:
+                    return None
+                node = self.pager.get(node.children[i])
+        finally:
+            self.pager.release()
+
+    def __iter__(self) -> Iterator[Any]:
+        # parcours infixe page par page (clés décodées en memcomparable) ; arbre au repos
+        pager = self.pager
+        stack = [(pager.root, 0)]       # (page, prochain fils à visiter)
+        while stack:
+            page_id, i = stack.pop()
+            node = pager.get(page_id)
+            keys = node.keys
+            if node.leaf:
+                pager.release()
+                yield from (map(decode_key, keys) if self.byte_keys else keys)
+                continue
+            if i > len(keys):
+                continue
+            if i:
+                yield decode_key(keys[i - 1]) if self.byte_keys else keys[i - 1]
+            stack.append((page_id, i + 1))
+            stack.append((node.children[i], 0))
+
+    # ============================================================
+    # INSERTION
+    # ============================================================
+    def insert(self, key: Any):
+        self._insert_key(self._key(key))
+
+    def _insert_key(self, key: Key):
+        pager = self.pager
+        self._log(INSERT, key)
+        path: List[Tuple[DiskNode, int]] = []
+        node = self.root
+        while True:
+            i = bisect.bisect_left(node.keys, key)
+            if i < len(node.keys) and node.keys[i] == key:
+                self._end_op()
+                return
+            if node.leaf:
+                break
+            path.append((node, i))
+            node = pager.get(node.children[i])
+
+        node.keys.insert(i, key)
+        node.dirty = True
+        pager.count += 1
+        if self.bloom is not None:
+            self.bloom.add(key)
+
+        # éclatements en remontant le chemin
+        while self._overfull(node):
+            if path:
+                parent, i = path.pop()
+                self._split(parent, i, node)
+                node = parent
+            else:
+                self._grow_root(node)
+        self._end_op()
+
+    # ============================================================
+    # REMPLISSAGE : nombre de clés (int64) ou octets encodés (memcomparable)
+    # ============================================================
+    def _overfull(self, node: DiskNode) -> bool:
+        if len(node.keys) > self.max_keys:
+            return True
+        return self.byte_keys and self.pager.node_bytes(node.keys, node.leaf) > self.pager.page_size
+
+    def _underfull(self, node: DiskNode) -> bool:
+        if len(node.keys) >= self.min_keys:
+            return False
+        # memcomparable : un nœud peu nombreux mais au quart plein n'est pas à réparer
+        return not self.byte_keys or self.pager.node_bytes(node.keys, node.leaf) < self.pager.page_size // 4
+
+    def _split_index(self, keys: List[Key], leaf: bool) -> int:
+        # indice de la clé qui remonte ; en memcomparable, le partage qui remplit le
+        # moins la plus pleine des deux moitiés, chacune avec son propre préfixe commun
+        n = len(keys)
+        if not self.byte_keys:
+            return n // 2
+        page_size, max_keys, children = self.pager.page_size, self.max_keys, 0 if leaf else 4
+        lens = list(itertools.accumulate(map(len, keys), initial=0))
+
+        def fill(lo: int, hi: int) -> float:
+            m = hi - lo
+            p = common_prefix((keys[lo], keys[hi - 1]))
+            size = (NODE_HEADER.size + KEY_LEN.size * (m + 1) + p + lens[hi] - lens[lo] - m * p
+                    + children * (m + 1))
+            return max(size / page_size, m / max_keys)
+
+        return min(range(1, n - 1), key=lambda mid: max(fill(0, mid), fill(mid + 1, n)))
+
+    def _split(self, parent: DiskNode, i: int, node: DiskNode):
+        # node (fils i de parent) déborde : sa moitié droite devient le fils i + 1
+        mid = self._split_index(node.keys, node.leaf)
+        right = self.pager.new(leaf=node.leaf)
+        parent.keys.insert(i, node.keys[mid])
+        parent.children.insert(i + 1, right.page_id)
+        right.keys = node.keys[mid + 1:]
+        node.keys = node.keys[:mid]
+        if not node.leaf:
+            right.children = node.children[mid + 1:]
+            node.children = node.children[:mid + 1]
+        node.dirty = parent.dirty = True
+        # une clé au préfixe différent peut réduire le préfixe commun de toute la page :
+        # une moitié peut encore déborder (la droite d'abord, les indices restent valides)
+        if self._overfull(right):
+            self._split(parent, i + 1, right)
+        if self._overfull(node):
+            self._split(parent, i, node)
+
+    def _grow_root(self, node: DiskNode):
+        root = self.pager.new(leaf=False)
+        root.children.append(node.page_id)
+        self.pager.root = root.page_id
+        self._split(root, 0, node)
+
+    # ============================================================
+    # SUPPRESSION (remplacement par le prédécesseur puis réparation)
+    # ============================================================
+    def delete(self, k: Any):
+        self._delete_key(self._key(k))
+
+    def _delete_key(self, k: Key):
+        pager = self.pager
+        self._log(DELETE, k)
+        path: List[Tuple[DiskNode, int]] = []
+        node = self.root
+        while True:
+            i = bisect.bisect_left(node.keys, k)
+            if i < len(node.keys) and node.keys[i] == k:
+                break
+            if node.leaf:
+                self._end_op()
+                return
+            path.append((node, i))
+            node = pager.get(node.children[i])
+
+        if node.leaf:
+            node.keys.pop(i)
+        else:
+            target = node
+            path.append((node, i))
+            node = pager.get(node.children[i])
+            while not node.leaf:
+                path.append((node, len(node.children) - 1))
+                node = pager.get(node.children[-1])
+            target.keys[i] = node.keys.pop()
+            target.dirty = True
+        node.dirty = True
+        pager.count -= 1
+        if self.bloom is not None:
+            self._bloom_deletes += 1
+
+        # réparation ascendante ; en memcomparable, la clé remplaçante (prédécesseur) ou
+        # une séparatrice redistribuée peut aussi faire déborder un ancêtre
+        while path:
+            parent, i = path.pop()
+            if self._overfull(node):
+                self._split(parent, i, node)
+            elif self._underfull(node):
+                self._fix_child(parent, i)
+            elif not self.byte_keys:
+                break
+            node = parent
+        if self._overfull(node):
+            self._grow_root(node)
+
+        root = self.root
+        if not root.leaf and not root.keys:
+            pager.root = root.children[0]
+            pager.free(root)
+        self._end_op()
+
+    def _fix_child(self, parent: DiskNode, i: int):
+        if self.byte_keys:
+            self._rebalance(parent, i)
+            return
+        pager = self.pager
+        child = pager.get(parent.children[i])
+        left = pager.get(parent.children[i - 1]) if i > 0 else None
+        right = pager.get(parent.children[i + 1]) if i + 1 < len(parent.children) else None
+
+        if left is not None and len(left.keys) > self.min_keys:
+            child.keys.insert(0, parent.keys[i - 1])
+            parent.keys[i - 1] = left.keys.pop()
+            if not left.leaf:
+                child.children.insert(0, left.children.pop())
+            left.dirty = True
+        elif right is not None and len(right.keys) > self.min_keys:
+            child.keys.append(parent.keys[i])
+            parent.keys[i] = right.keys.pop(0)
+            if not right.leaf:
+                child.children.append(right.children.pop(0))
+            right.dirty = True
+        else:
+            if left is not None:
+                child, right, i = left, child, i - 1
+            child.keys.append(parent.keys.pop(i))
+            child.keys.extend(right.keys)
+            child.children.extend(right.children)
+            parent.children.pop(i + 1)
+            pager.free(right)
+        child.dirty = True
+        parent.dirty = True
+
+    def _rebalance(self, parent: DiskNode, i: int):
+        # memcomparable : fusion avec un frère si le tout tient dans une page,
+        # sinon nouveau partage des clés des deux frères et de leur séparatrice
+        pager = self.pager
+        if i == 0:
+            i = 1
+        left = pager.get(parent.children[i - 1])
+        right = pager.get(parent.children[i])
+        keys = left.keys + [parent.keys[i - 1]] + right.keys
+        children = left.children + right.children
+        if len(keys) <= self.max_keys and pager.node_bytes(keys, left.leaf) <= pager.page_size:
+            left.keys, left.children = keys, children
+            parent.keys.pop(i - 1)
+            parent.children.pop(i)
+            pager.free(right)
+        else:
+            mid = self._split_index(keys, left.leaf)
+            left.keys, parent.keys[i - 1], right.keys = keys[:mid], keys[mid], keys[mid + 1:]
+            if not left.leaf:
+                left.children, right.children = children[:mid + 1], children[mid + 1:]
+            right.dirty = True
+        left.dirty = parent.dirty = True
+
+    # ============================================================
+    # INVARIANTS
+    # ============================================================
+    def check_invariants(self) -> int:
+        """Vérifie les pages ; renvoie le nombre de clés, lève InvariantError au premier défaut.
+
+        Clés strictement croissantes et entre les séparatrices des ancêtres,
+        feuilles à la même profondeur, len(children) == len(keys) + 1, nœud
+        encodable dans une page, min_keys..max_keys clés hors racine (int64) ou
+        au moins une (memcomparable : le remplissage se mesure en octets), et
+        total égal au compteur de l'en-tête.
+        """
+        pager = self.pager
+        low_keys = 1 if self.byte_keys else self.min_keys
+        leaf_depth = None
+        total = 0
+        stack = [(pager.root, 0, None, None)]
+        while stack:
+            page_id, depth, low, high = stack.pop()
+            node = pager.get(page_id)
+            keys, children, n = node.keys, node.children, len(node.keys)
+            pager.release()
+            total += n
+            where = f"page {page_id} at depth {depth}"
+            if page_id == pager.root:
+                if n > self.max_keys:
+                    raise InvariantError(f"root has {n} keys > {self.max_keys}")
+                if not node.leaf and n == 0:
+                    raise InvariantError("internal root without keys")
+            elif not low_keys <= n <= self.max_keys:
+                raise InvariantError(f"{where}: {n} keys outside [{low_keys}, {self.max_keys}]")
+            if pager.node_bytes(keys, node.leaf) > pager.page_size:
+                raise InvariantError(f"{where}: node does not fit in a {pager.page_size}-byte page")
+            for a, b in zip(keys, keys[1:]):
+                if not a < b:
+                    raise InvariantError(f"{where}: keys not strictly increasing ({a!r}, {b!r})")
+            if n and ((low is not None and not keys[0] > low) or (high is not None and not keys[-1] < high)):
+                raise InvariantError(f"{where}: keys outside separator bounds ({low!r}, {high!r})")
+            if node.leaf:
+                if children:
+                    raise InvariantError(f"{where}: leaf with children")
+                if leaf_depth is None:
+                    leaf_depth = depth
+                elif depth != leaf_depth:
+                    raise InvariantError(f"{where}: leaf depth {depth} != {leaf_depth}")
+                continue
+            if len(children) != n + 1:
+                raise InvariantError(f"{where}: {len(children)} children for {n} keys")
+            for i, c in enumerate(children):
+                stack.append((c, depth + 1, keys[i - 1] if i else low, keys[i] if i < n else high))
+        if total != pager.count:
+            raise InvariantError(f"pages hold {total} keys, header count {pager.count}")
+        return total
+
+    # ============================================================
+    # FILTRE DE BLOOM
+    # ============================================================
+    def _scan_keys(self):
+        # toutes les clés stockées, page par page (ordre quelconque)
+        stack = [self.pager.root]
+        while stack:
+            node = self.pager.get(stack.pop())
+            yield from node.keys
+            stack.extend(node.children)
+            self.pager.release()
+
+    def may_contain(self, k: Key) -> bool:
+        # k déjà encodée ; False garantit l'absence sans lire de page
+        if self.bloom is None or self._bloom_deletes * 2 > self.bloom.count:
+            self.bloom = ScalableBloomFilter.from_keys(self._scan_keys(), self.pager.count,
+                                                       self.bloom_capacity, self.bloom_error)
+            self._bloom_deletes = 0
+        return k in self.bloom
+
+    def bloom_stats(self):
+        return bloom_stats(self.bloom, self._bloom_deletes)
+
+    # ============================================================
+    # JOURNAL ET PERSISTANCE
+    # ============================================================
+    def _log(self, typ: int, key: Key):
+        if self.wal is not None and not self._replaying:
+            self.wal.log_op(typ, key)
+
+    def _end_op(self):
+        if self._replaying:
+            # pendant la reprise, tout reste en cache jusqu'au checkpoint final
+            return
+        self.pager.release()
+        if self.wal is not None and self.wal.size > self.checkpoint_bytes:
+            self.pager.flush()
+
+    def commit(self):
+        # rend durables les opérations journalisées mais pas encore synchronisées
+        if self.wal is not None:
+            self.wal.commit()
+
+    def recover(self):
+        """Rejoue le journal : images du dernier checkpoint complet, puis opérations."""
+        pager = self.pager
+        pages, header, ops = self.wal.recovery_plan()
+        for page_id, image in pages:
+            pager.write_page(page_id, image)
+        if header:
+            pager.load_header(header)
+            pager.write_header()
+        pager.cache.clear()
+        pager.pending.clear()
+
+        self._replaying = True
+        try:
+            for typ, key in ops:
+                if typ == INSERT:
+                    self._insert_key(key)
+                else:
+                    self._delete_key(key)
+        finally:
+            self._replaying = False
+
+    def flush(self):
+        self.pager.flush()
+
+    def close(self):
+        self.pager.flush()
+        self.pager.close()
+        if self.wal is not None:
+            self.wal.close()
+
+    def __enter__(self) -> 'DiskBTree':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def print_tree(self, page_id: Optional[int] = None, lvl: int = 0):
+        node = self.pager.get(self.pager.root if page_id is None else page_id)
+        print("  " * lvl + str([decode_key(k) for k in node.keys] if self.byte_keys else node.keys))
+        for c in node.children:
+            self.print_tree(c, lvl + 1)
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    path = os.path.join(tempfile.mkdtemp(), "arbre.db")
+    with DiskBTree(path, order=5) as b:
+        for x in [10, 20, 5, 6, 12, 30, 7, 17]:
+            b.insert(x)
+    with DiskBTree(path) as b:
+        b.print_tree()
+
+    # clés composites (locataire, horodatage), encodées memcomparable
+    path = os.path.join(os.path.dirname(path), "composite.db")
+    with DiskBTree(path, key_format="memcomparable", max_key_bytes=48) as b:
+        for tenant in ("acme", "globex"):
+            for ts in (3, 1, 2):
+                b.insert((tenant, ts))
+        b.print_tree()
@@ -1,39 +1,110 @@
 from __future__ import annotations
-from typing import List, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 import bisect
 import math
 
+from TP2.outils_arbre import (MISSING, Cursor, Key, KeyFunc, build_bottom_up, check_invariants,
+                              fill_target, iter_range, iter_reversed, memory_report, merge_run,
+                              new_keys, next_node_id, pack_sizes, partition_run, rank, select,
+                              sorted_unique, split_run, subtree_size)
+from TP2.trace_arbre import TraceSink
+
 # ============================================
 # ⚙️ تعريف العقدة (B* Node)
 # ============================================
 class BStarNode:
-    def __init__(self, leaf: bool = True):
+    __slots__ = ("leaf", "keys", "values", "children", "size", "_id")
+
+    def __init__(self, leaf: bool = True, keys: Optional[Sequence[Key]] = None):
         self.leaf: bool = leaf
-        self.keys: List[int] = []
+        self.keys: Sequence[Key] = [] if keys is None else keys
+        self.values: Optional[List[Any]] = None   # قيم موازية للمفاتيح (BStarMap)
         self.children: List[BStarNode] = []
+        self.size: int = len(self.keys)   # عدد مفاتيح الشجرة الفرعية (وضع counted)
+        self._id: Optional[str] = None
+
+    @property
+    def node_id(self) -> str:
+        if self._id is None:
+            self._id = next_node_id()
+        return self._id
 
     def is_full(self, m: int) -> bool:
         return len(self.keys) >= m
 
     def __repr__(self):
-        return f"BStarNode(leaf={self.leaf}, keys={self.keys})"
+        return f"BStarNode(leaf={self.leaf}, keys={list(self.keys)})"
 
 # ============================================
 # 🌳 تعريف شجرة B* (BStarTree)
 # ============================================
 class BStarTree:
-    def __init__(self, order: int = 7):
+    def __init__(self, order: int = 7, int_keys: bool = False, counted: bool = False,
+                 trace: Optional[TraceSink] = None, key: Optional[KeyFunc] = None):
         if order < 3:
             raise ValueError("Order must be >= 3")
         self.m = order
-        self.kmin = round(2 * (self.m - 1) / 3)
+        # حدود Knuth: kmin = ⌊2(m-1)/3⌋ هو أكبر حد أدنى يسمح بالتقسيم 2 -> 3 والدمج 3 -> 2،
+        # والجذر يتسع لـ 2·kmin مفتاح كي ينقسم إلى عقدتين صالحتين
+        self.kmin = (2 * (self.m - 1)) // 3
         self.kmax = self.m - 1
-        self.root = BStarNode(leaf=True)
+        self.root_kmax = 2 * self.kmin
+        self.int_keys = int_keys
+        self.counted = counted
+        self.trace = trace      # None = لا تتبع (بدون أي كلفة)
+        self.key = key          # دالة مفتاح تُطبَّق على كل قيمة واردة؛ الشجرة تخزن key(x)
+        self.version = 0        # يزداد مع كل تعديل (لكشف التغيير عند الرسم)
+        self.root = self._new_node(leaf=True)
+
+    def _new_node(self, leaf: bool, keys: Iterable[Key] = ()) -> BStarNode:
+        return BStarNode(leaf=leaf, keys=new_keys(self.int_keys, keys))
+
+    def _key(self, x: Any) -> Key:
+        return x if self.key is None else self.key(x)
+
+    def _keys(self, xs: Iterable[Any]) -> Iterable[Key]:
+        return xs if self.key is None else map(self.key, xs)
+
+    def _refresh(self, *nodes: BStarNode):
+        # إعادة حساب الحجم انطلاقاً من أبناء محدَّثين
+        if self.counted:
+            for node in nodes:
+                node.size = subtree_size(node)
+
+    def _bump(self, parents: Dict[int, Optional[BStarNode]], node: Optional[BStarNode], delta: int):
+        # لا مؤشر للأب في BStarNode : الصعود عبر قاموس الآباء المسجَّل أثناء النزول
+        if self.counted and delta:
+            while node is not None:
+                node.size += delta
+                node = parents.get(id(node))
+
+    # --------------------------------------------
+    # 📦 تحميل جماعي من الأسفل إلى الأعلى
+    # --------------------------------------------
+    @classmethod
+    def bulk_load(cls, iterable: Iterable[Any], order: int = 7, fill_factor: float = 1.0,
+                  int_keys: bool = False, counted: bool = False,
+                  key: Optional[KeyFunc] = None) -> BStarTree:
+        tree = cls(order, int_keys, counted, key=key)
+        target = fill_target(fill_factor, tree.kmin, tree.kmax)
+
+        def new_node(leaf: bool, keys: List[Key], children: List[BStarNode]) -> BStarNode:
+            node = tree._new_node(leaf, keys)
+            node.children = children
+            tree._refresh(node)
+            return node
+
+        root = build_bottom_up(sorted_unique(tree._keys(iterable)), target, tree.kmin, tree.kmax, new_node,
+                               tree.root_kmax)
+        if root is not None:
+            tree.root = root
+        return tree
 
     # --------------------------------------------
     # 🔍 البحث عن مفتاح
     # --------------------------------------------
-    def search(self, key: int) -> Tuple[Optional[BStarNode], int]:
+    def search(self, key: Any) -> Tuple[Optional[BStarNode], int]:
+        key = self._key(key)
         node = self.root
         while node:
             i = bisect.bisect_left(node.keys, key)
@@ -47,85 +118,65 @@ class BStarTree:
     # --------------------------------------------
     # ➕ إدراج مفتاح جديد
     # --------------------------------------------
-    def insert(self, key: int):
-        print(f"\n=== INSERT {key} ===")
-        root = self.root
-
-        if not root.keys:
-            bisect.insort(root.keys, key)
-            return
-
-        if root.is_full(self.m):
-           if root.leaf:
-              old_root = self.root
-              new_root = BStarNode(leaf=False)
-              new_root.children.append(old_root)
-              self.root = new_root
-              self._split_child(new_root, 0)
-              return
-           else :
-               left = root.children[0]
-               right = root.children[1] if len(root.children) > 1 else None
-               if left and len(left.keys) < self.kmax:
-                 self._redistribute(root, 0)
-               elif right and len(right.keys) < self.kmax:
-                 self._redistribute(root, 0)
-               else:
-                 self._three_way_split_strict(root, 0)
-
-        self._insert_nonfull(self.root, key)
-
-    # --------------------------------------------
-    # 🌿 إدراج في عقدة غير ممتلئة
-    # --------------------------------------------
-    def _insert_nonfull(self, node: BStarNode, key: int, parent: Optional[BStarNode] = None, idx_in_parent: int = -1):
-        if node.leaf:
-            bisect.insort(node.keys, key)
+    def insert(self, key: Any):
+        # مفتاح موجود مسبقاً يُتجاهل
+        self._put(self._key(key))
+
+    def _put(self, key: Key, value: Any = None) -> Optional[Tuple[BStarNode, int]]:
+        # إن وُجد المفتاح يُعاد موضعه (العقدة، الفهرس) دون تعديل، وإلا يُدرج مع قيمته
+        self.version += 1
+        if self.trace is not None:
+            self.trace.event("insert", key=key)
+        path: List[Tuple[BStarNode, int]] = []
+        node = self.root
+        while True:
+            i = bisect.bisect_left(node.keys, key)
+            if i < len(node.keys) and node.keys[i] == key:
+                return node, i
+            if node.leaf:
+                break
+            if self.trace is not None:
+                self.trace.event("descend", node=node.node_id, keys=len(node.keys), child=i)
+            path.append((node, i))
+            node = node.children[i]
 
-            if len(node.keys) > self.kmax:
+        node.keys.insert(i, key)
+        if node.values is not None:
+            node.values.insert(i, value)
+        if self.counted:
+            node.size += 1
+            for p, _ in path:
+                p.size += 1
+        self._fix_overflow(node, path)
+        return None
 
-                if parent is None:
-                    old_root = self.root
-                    new_root = BStarNode(leaf=False)
-                    new_root.children.append(old_root)
-                    self.root = new_root
-                    self._split_child(new_root, 0)
-                else:
-                    left_sib = parent.children[idx_in_parent - 1] if idx_in_parent - 1 >= 0 else None
-                    right_sib = parent.children[idx_in_parent + 1] if idx_in_parent + 1 < len(parent.children) else None
-
-                    if left_sib and len(left_sib.keys) < self.kmin:
-                        self._redistribute(parent, idx_in_parent - 1)
-                    elif right_sib and len(right_sib.keys) < self.kmin:
-                        self._redistribute(parent, idx_in_parent)
-                    elif left_sib and len(left_sib.keys) < self.kmax :
-                        self._redistribute(parent, idx_in_parent - 1)
-                    elif right_sib and len(right_sib.keys) < self.kmax:
-                        self._redistribute(parent, idx_in_parent)
-                    else:
-                        if left_sib:
-                            self._three_way_split_strict(parent, idx_in_parent - 1)
-                        elif right_sib:
-                            self._three_way_split_strict(parent, idx_in_parent)
-            return
-
-        i = bisect.bisect_left(node.keys, key)
-        child = node.children[i]
-
-        if not child.is_full(self.m):
-            self._insert_nonfull(child, key, node, i)
-        else:
-            left_sib = node.children[i - 1] if i - 1 >= 0 else None
-            right_sib = node.children[i + 1] if i + 1 < len(node.children) else None
+    # --------------------------------------------
+    # 🌿 معالجة الامتلاء من الأسفل إلى الأعلى
+    # --------------------------------------------
+    def _fix_overflow(self, node: BStarNode, path: List[Tuple[BStarNode, int]]):
+        # عقدة فيها kmax + 1 مفتاح: إعادة توزيع مع أخ غير ممتلئ، وإلا تقسيم 2 -> 3
+        while path:
+            if len(node.keys) <= self.kmax:
+                return
+            parent, idx = path.pop()
+            left_sib = parent.children[idx - 1] if idx > 0 else None
+            right_sib = parent.children[idx + 1] if idx + 1 < len(parent.children) else None
 
-            if left_sib and len(left_sib.keys) < self.kmax:
-                self._redistribute(node, i - 1)
-            elif right_sib and len(right_sib.keys) < self.kmax:
-                self._redistribute(node, i)
-            else:
-                self._three_way_split_strict(node, i if right_sib else i - 1)
+            if left_sib is not None and len(left_sib.keys) < self.kmax:
+                self._redistribute(parent, idx - 1)
+                return
+            if right_sib is not None and len(right_sib.keys) < self.kmax:
+                self._redistribute(parent, idx)
+                return
+            self._three_way_split_strict(parent, idx if right_sib is not None else idx - 1)
+            node = parent
 
-            self._insert_nonfull(node, key, parent, idx_in_parent)
+        # الجذر يتسع لـ 2·kmin مفتاح، فينقسم إلى عقدتين فيهما kmin مفتاح على الأقل
+        if len(node.keys) > self.root_kmax:
+            new_root = self._new_node(leaf=False)
+            new_root.children.append(node)
+            self.root = new_root
+            self._split_child(new_root, 0)
 
     # --------------------------------------------
     # ✂️ تقسيم عادي لابن
@@ -133,132 +184,156 @@ class BStarTree:
     def _split_child(self, parent: BStarNode, idx: int):
         full_child = parent.children[idx]
         mid = len(full_child.keys) // 2
-        new_node = BStarNode(leaf=full_child.leaf)
+        new_node = self._new_node(leaf=full_child.leaf)
         parent.keys.insert(idx, full_child.keys[mid])
         new_node.keys = full_child.keys[mid + 1:]
         full_child.keys = full_child.keys[:mid]
+        if full_child.values is not None:
+            parent.values.insert(idx, full_child.values[mid])
+            new_node.values = full_child.values[mid + 1:]
+            full_child.values = full_child.values[:mid]
 
         if not full_child.leaf:
             new_node.children = full_child.children[mid + 1:]
             full_child.children = full_child.children[:mid + 1]
 
         parent.children.insert(idx + 1, new_node)
+        self._refresh(full_child, new_node, parent)
+        if self.trace is not None:
+            self.trace.event("split", node=full_child.node_id, keys=len(full_child.keys),
+                             new=new_node.node_id, new_keys=len(new_node.keys))
+
+    # --------------------------------------------
+    # 🧱 إعادة توزيع عامة بين أبناء متجاورين
+    # --------------------------------------------
+    def _spread(self, parent: BStarNode, start: int, count: int, parts: int) -> List[BStarNode]:
+        # يجمع مفاتيح وأبناء count أبناء متجاورين (مع الفواصل) ويوزعها بالتساوي على parts عقد
+        olds = parent.children[start:start + count]
+        keys: List[Key] = []
+        children: List[BStarNode] = []
+        values: Optional[List[Any]] = None if parent.values is None else []
+        for j, node in enumerate(olds):
+            if j:
+                keys.append(parent.keys[start + j - 1])
+                if values is not None:
+                    values.append(parent.values[start + j - 1])
+            keys.extend(node.keys)
+            children.extend(node.children)
+            if values is not None:
+                values.extend(node.values)
+
+        q, r = divmod(len(keys) - (parts - 1), parts)
+        leaf = olds[0].leaf
+        nodes: List[BStarNode] = []
+        seps: List[Key] = []
+        sep_values: List[Any] = []
+        pos = child = 0
+        for j in range(parts):
+            size = q + (1 if j < r else 0)
+            node = olds[j] if j < count else self._new_node(leaf)
+            node.keys = new_keys(self.int_keys, keys[pos:pos + size])
+            if values is not None:
+                node.values = values[pos:pos + size]
+            if not leaf:
+                node.children = children[child:child + size + 1]
+                child += size + 1
+            nodes.append(node)
+            pos += size
+            if j < parts - 1:
+                seps.append(keys[pos])
+                if values is not None:
+                    sep_values.append(values[pos])
+                pos += 1
+
+        parent.keys[start:start + count - 1] = new_keys(self.int_keys, seps)
+        if values is not None:
+            parent.values[start:start + count - 1] = sep_values
+        parent.children[start:start + count] = nodes
+        self._refresh(*nodes)
+        return nodes
 
     # --------------------------------------------
     # 🔄 إعادة توزيع (Redistribution)
     # --------------------------------------------
     def _redistribute(self, parent: BStarNode, idx: int):
-        L = parent.children[idx]
-        R = parent.children[idx + 1]
-
-        if len(L.keys) < self.kmin or len(L.keys) < len(R.keys):
-            sep = parent.keys[idx]
-            moved_up = R.keys.pop(0)
-            L.keys.append(sep)
-            parent.keys[idx] = moved_up
-            if R.children:
-                L.children.append(R.children.pop(0))
-        else:
-            sep = parent.keys[idx]
-            moved_up = L.keys.pop()
-            R.keys.insert(0, sep)
-            parent.keys[idx] = moved_up
-            if L.children:
-                R.children.insert(0, L.children.pop())
+        L, R = self._spread(parent, idx, 2, 2)
+        if self.trace is not None:
+            self.trace.event("redistribute", parent=parent.node_id, left=L.node_id, right=R.node_id,
+                             left_keys=len(L.keys), right_keys=len(R.keys))
 
     # --------------------------------------------
     # 💥 تقسيم صارم بثلاث عقد (3-way split)
     # --------------------------------------------
-    def _three_way_split_strict(self, parent: BStarNode, idx_parent: int, new_key: Optional[int] = None):
-        L = parent.children[idx_parent]
-        R = parent.children[idx_parent + 1]
-        sep = parent.keys[idx_parent]
-
-        merged = L.keys + [sep] + R.keys
-        if new_key is not None:
-            merged.append(new_key)
-        merged.sort()
-
-        n = len(merged)
-        if n < 3:
-            return
-
-        up1_idx = n // 3
-        up2_idx = (2 * n) // 3
-        up1 = merged[up1_idx]
-        up2 = merged[up2_idx]
-
-        P_keys = merged[:up1_idx]
-        Q_keys = merged[up1_idx + 1: up2_idx]
-        R_keys = merged[up2_idx + 1:]
-
-        parent.keys[idx_parent:idx_parent+1] = [up1, up2]
-
-        left_node = BStarNode(leaf=L.leaf)
-        middle_node = BStarNode(leaf=L.leaf)
-        right_node = BStarNode(leaf=R.leaf)
-
-        left_node.keys = P_keys
-        middle_node.keys = Q_keys
-        right_node.keys = R_keys
-
-        parent.children[idx_parent] = left_node
-        parent.children[idx_parent + 1] = middle_node
-        parent.children.insert(idx_parent + 2, right_node)
-
-        if len(parent.keys) > self.kmax:
-            if parent is self.root:
-                old_root = self.root
-                new_root = BStarNode(leaf=False)
-                new_root.children.append(old_root)
-                self.root = new_root
-                self._split_child(new_root, 0)
+    def _three_way_split_strict(self, parent: BStarNode, idx_parent: int):
+        # عقدتان ممتلئتان (2·kmax + 1 مفتاح مع الفاصل) -> ثلاث عقد فيها kmin مفتاح على الأقل
+        nodes = self._spread(parent, idx_parent, 2, 3)
+        if self.trace is not None:
+            self.trace.event("three_way_split", parent=parent.node_id,
+                             nodes=tuple(n.node_id for n in nodes),
+                             keys=tuple(len(n.keys) for n in nodes))
 
     # --------------------------------------------
     # ❌ حذف مفتاح
     # --------------------------------------------
-    def delete(self, key: int):
-        print(f"\n=== DELETE {key} ===")
-        if self.root is None or not self.root.keys:
-            return
-        self._delete_internal(self.root, key)
-
-        if not self.root.keys and not self.root.leaf:
-            self.root = self.root.children[0]
-
-    # --------------------------------------------
-    # 🧩 الحذف الداخلي
-    # --------------------------------------------
-    def _delete_internal(self, node: BStarNode, key: int, parent: Optional[BStarNode] = None, idx_in_parent: int = -1):
-        i = bisect.bisect_left(node.keys, key)
-        child = None
-
-        if node.leaf:
+    def delete(self, key: Any):
+        self._delete_key(self._key(key))
+
+    def _delete_key(self, key: Key) -> Any:
+        # يعيد القيمة المحذوفة (None خارج BStarMap)، أو MISSING إن لم يوجد المفتاح
+        self.version += 1
+        if self.trace is not None:
+            self.trace.event("delete", key=key)
+        path: List[Tuple[BStarNode, int]] = []
+        node = self.root
+        while True:
+            i = bisect.bisect_left(node.keys, key)
             if i < len(node.keys) and node.keys[i] == key:
-                node.keys.pop(i)
-            else:
-                return
+                break
+            if node.leaf:
+                return MISSING
+            if self.trace is not None:
+                self.trace.event("descend", node=node.node_id, keys=len(node.keys), child=i)
+            path.append((node, i))
+            node = node.children[i]
 
-        elif i < len(node.keys) and node.keys[i] == key:
-            pred_node = node.children[i]
-            while not pred_node.leaf:
-                pred_node = pred_node.children[-1]
-            predecessor = pred_node.keys[-1]
-            node.keys[i] = predecessor
-            child = node.children[i]
-            self._delete_internal(child, predecessor, node, i)
+        removed = None if node.values is None else node.values[i]
+        if node.leaf:
+            node.keys.pop(i)
+            if node.values is not None:
+                node.values.pop(i)
         else:
-            child = node.children[i]
-            self._delete_internal(child, key, node, i)
-
-        if len(node.keys) < self.kmin and parent is not None:
-            self._fix_underflow(parent, idx_in_parent)
+            # استبدال المفتاح الداخلي بسابقه (آخر مفتاح في أقصى يمين الشجرة الفرعية اليسرى)
+            target = node
+            path.append((node, i))
+            node = node.children[i]
+            while not node.leaf:
+                path.append((node, len(node.children) - 1))
+                node = node.children[-1]
+            target.keys[i] = node.keys.pop()
+            if node.values is not None:
+                target.values[i] = node.values.pop()
+        if self.counted:
+            node.size -= 1
+            for p, _ in path:
+                p.size -= 1
+
+        while path and len(node.keys) < self.kmin:
+            parent, idx = path.pop()
+            self._fix_underflow(parent, idx)
+            node = parent
+
+        if not self.root.leaf and not self.root.keys:
+            self.root = self.root.children[0]
+        return removed
 
     # --------------------------------------------
     # 🔧 تصحيح بعد الحذف
     # --------------------------------------------
     def _fix_underflow(self, parent: BStarNode, idx: int):
         child = parent.children[idx]
+        if self.trace is not None:
+            self.trace.event("underflow_fix", parent=parent.node_id, child=child.node_id,
+                             keys=len(child.keys))
         left_sib = parent.children[idx - 1] if idx - 1 >= 0 else None
         right_sib = parent.children[idx + 1] if idx + 1 < len(parent.children) else None
 
@@ -266,35 +341,180 @@ class BStarTree:
             self._redistribute(parent, idx - 1)
         elif right_sib and len(right_sib.keys) > self.kmin:
             self._redistribute(parent, idx)
+        elif len(parent.children) >= 3:
+            # دمج 3 -> 2 (3·kmin مفتاح) إلا إذا كان الأخ الثالث غنياً: توزيع 3 -> 3
+            start = min(max(idx - 1, 0), len(parent.children) - 3)
+            total = sum(len(c.keys) for c in parent.children[start:start + 3]) + 1
+            if total <= 2 * self.kmax:
+                self._merge_nodes(parent, start, 3)
+            else:
+                self._spread(parent, start, 3, 3)
         else:
-            if left_sib:
-                self._merge_nodes(parent, idx - 1)
-                merged_node = parent.children[idx - 1]
-            elif right_sib:
-                self._merge_nodes(parent, idx)
-                merged_node = parent.children[idx]
-
-            if len(merged_node.keys) > self.kmax:
-                idx_parent = parent.children.index(merged_node)
-                self._three_way_split_strict(parent, idx_parent)
+            # أبناء الجذر فقط (أو kmin = 1): 2 -> 1، ثم يُستبدل الجذر الفارغ
+            self._merge_nodes(parent, 0)
 
     # --------------------------------------------
     # 🔗 دمج عقدتين
     # --------------------------------------------
-    def _merge_nodes(self, parent: BStarNode, idx: int):
-        left = parent.children[idx]
-        right = parent.children[idx + 1]
-        sep = parent.keys.pop(idx)
+    def _merge_nodes(self, parent: BStarNode, idx: int, count: int = 2):
+        # count عقد متجاورة -> count - 1 عقدة
+        nodes = self._spread(parent, idx, count, count - 1)
+        if self.trace is not None:
+            self.trace.event("merge", parent=parent.node_id, node=nodes[0].node_id,
+                             keys=len(nodes[0].keys))
 
-        left.keys.append(sep)
-        left.keys.extend(right.keys)
+    # --------------------------------------------
+    # 📥 عمليات جماعية (زيارة واحدة لكل عقدة في الدفعة)
+    # --------------------------------------------
+    def insert_many(self, keys: Iterable[Any]) -> List[Key]:
+        # يعيد المفاتيح الموجودة مسبقاً (أو المكررة في الدفعة)
+        self.version += 1
+        batch = sorted(self._keys(keys))
+        if self.trace is not None:
+            self.trace.event("insert_many", count=len(batch))
+        duplicates: List[Key] = []
+
+        parents = {id(self.root): None}
+        overfull: List[BStarNode] = []
+        stack = [(self.root, 0, len(batch))]
+        while stack:
+            node, i, j = stack.pop()
+            if node.leaf:
+                found = merge_run(node.keys, batch[i:j])
+                duplicates.extend(found)
+                self._bump(parents, node, j - i - len(found))
+                if len(node.keys) > self._cap(node):
+                    overfull.append(node)
+                continue
+            groups, found = partition_run(node.keys, batch, i, j)
+            duplicates.extend(found)
+            for c, a, b in groups:
+                child = node.children[c]
+                parents[id(child)] = node
+                stack.append((child, a, b))
+
+        # تقسيم مستوى بمستوى من اليمين إلى اليسار
+        while overfull:
+            overfull.sort(key=lambda n: n.keys[0], reverse=True)
+            nxt = {}
+            for node in overfull:
+                if len(node.keys) <= self._cap(node):
+                    continue        # سبق توزيعه مع أخيه
+                parent = self._split_many(parents.get(id(node)), node)
+                if len(parent.keys) > self._cap(parent):
+                    nxt[id(parent)] = parent
+            overfull = list(nxt.values())
+        return duplicates
+
+    def _cap(self, node: BStarNode) -> int:
+        return self.root_kmax if node is self.root else self.kmax
+
+    def delete_many(self, keys: Iterable[Any]) -> List[Key]:
+        # يعيد المفاتيح غير الموجودة (أو المكررة في الدفعة)
+        self.version += 1
+        batch = sorted(self._keys(keys))
+        if self.trace is not None:
+            self.trace.event("delete_many", count=len(batch))
+        missing: List[Key] = []
+        slow: List[Key] = []
+        parents = {id(self.root): None}
+        stack = [(self.root, 0, len(batch))]
+        while stack:
+            node, i, j = stack.pop()
+            if node.leaf:
+                present, absent = split_run(node.keys, batch[i:j])
+                missing.extend(absent)
+                if node is self.root or len(node.keys) - len(present) >= self.kmin:
+                    gone = set(present)
+                    node.keys = new_keys(self.int_keys, [k for k in node.keys if k not in gone])
+                    self._bump(parents, node, -len(present))
+                else:
+                    slow.extend(present)
+                continue
+            groups, found = partition_run(node.keys, batch, i, j)
+            for k in found:
+                if slow and slow[-1] == k:
+                    missing.append(k)
+                else:
+                    slow.append(k)
+            for c, a, b in groups:
+                child = node.children[c]
+                parents[id(child)] = node
+                stack.append((child, a, b))
+
+        for k in slow:
+            self._delete_key(k)
+        return missing
+
+    def _split_many(self, parent: Optional[BStarNode], node: BStarNode) -> BStarNode:
+        # تقسيم عقدة مكتظة إلى عقد ممتلئة بنحو ثلاثة أرباع؛ يعيد الأب
+        target = (self.kmin + self.kmax + 1) // 2
+        if parent is None:
+            parent = self._new_node(leaf=False)
+            parent.children.append(node)
+            self.root = parent
+            start, count = 0, 1
+        else:
+            # مع أخ مجاور: بين kmax + 1 و 2·kmin مفتاح لا يمكن التقسيم منفرداً
+            idx = bisect.bisect_left(parent.keys, node.keys[0])
+            start, count = (idx - 1, 2) if idx > 0 else (idx, 2)
+        total = sum(len(c.keys) for c in parent.children[start:start + count]) + count - 1
+        parts = len(pack_sizes(total, target, self.kmin, self.kmax))
+        nodes = self._spread(parent, start, count, parts)
+        self._refresh(parent)
+        if self.trace is not None:
+            self.trace.event("split", node=node.node_id, keys=total,
+                             new=tuple(n.node_id for n in nodes), new_keys=tuple(len(n.keys) for n in nodes))
+        return parent
+
+    # --------------------------------------------
+    # 🔢 الاجتياز المرتب (مؤشر ومولدات)
+    # --------------------------------------------
+    def cursor(self) -> Cursor:
+        return Cursor(self.root)
+
+    def range(self, lo: Optional[Any] = None, hi: Optional[Any] = None) -> Iterator[Key]:
+        return iter_range(self.root, None if lo is None else self._key(lo),
+                          None if hi is None else self._key(hi))
+
+    def __iter__(self) -> Iterator[Key]:
+        return iter_range(self.root)
+
+    def __reversed__(self) -> Iterator[Key]:
+        return iter_reversed(self.root)
 
-        if not left.leaf:
-            left.children.extend(right.children)
+    # --------------------------------------------
+    # ✅ التحقق من الثوابت
+    # --------------------------------------------
+    def check_invariants(self) -> int:
+        # يعيد عدد المفاتيح؛ يرفع InvariantError عند أول خلل
+        return check_invariants(self.root, self.kmin, self.kmax, self.root_kmax,
+                                counted=self.counted)
+
+    # --------------------------------------------
+    # 🧮 إحصاءات الترتيب (وضع counted)
+    # --------------------------------------------
+    def _require_counted(self):
+        if not self.counted:
+            raise ValueError("rank/select need a tree built with counted=True")
 
-        parent.children.pop(idx + 1)
+    def rank(self, key: Any) -> int:
+        self._require_counted()
+        return rank(self.root, self._key(key))
 
-        if parent is self.root and not parent.keys:
-            self.root = left
-        elif parent is not self.root and len(parent.keys) < self.kmin:
-            self._fix_underflow(parent, parent.children.index(left))
+    def select(self, k: int) -> Key:
+        self._require_counted()
+        return select(self.root, k)
+
+    def count_range(self, lo: Any, hi: Any) -> int:
+        self._require_counted()
+        lo, hi = self._key(lo), self._key(hi)
+        if lo > hi:
+            return 0
+        return rank(self.root, hi, inclusive=True) - rank(self.root, lo)
+
+    # --------------------------------------------
+    # 📊 تقرير الذاكرة
+    # --------------------------------------------
+    def memory_report(self) -> Dict[str, float]:
+        return memory_report(self.root)
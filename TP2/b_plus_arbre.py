@@ -0,0 +1,364 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import bisect
+
+from TP2.outils_arbre import (InvariantError, fill_target, memory_report, new_keys, next_node_id,
+                              pack_sizes, sorted_unique)
+
+
+class BPlusNode:
+    __slots__ = ("leaf", "keys", "children", "parent", "next", "prev", "_id")
+
+    def __init__(self, leaf: bool = True, keys: Optional[Sequence[int]] = None):
+        self.leaf: bool = leaf
+        self.keys: Sequence[int] = [] if keys is None else keys
+        self.children: List['BPlusNode'] = []
+        self.parent: Optional['BPlusNode'] = None
+        self.next: Optional['BPlusNode'] = None    # feuille suivante (chaînage)
+        self.prev: Optional['BPlusNode'] = None    # feuille précédente
+        self._id: Optional[str] = None
+
+    @property
+    def node_id(self) -> str:
+        if self._id is None:
+            self._id = next_node_id()
+        return self._id
+
+    def __repr__(self):
+        return f"BPlusNode(keys={list(self.keys)}, leaf={self.leaf})"
+
+
+class BPlusTree:
+    """Arbre B+ : toutes les clés dans les feuilles chaînées, séparateurs dans les nœuds internes.
+
+    Même sémantique d'ordre que bTree : d = (order - 1) // 2, au plus 2d clés
+    et au moins d clés par nœud hors racine. Un séparateur vaut la plus petite
+    clé de son sous-arbre droit.
+    """
+
+    def __init__(self, order: int = 7, int_keys: bool = False):
+        if order < 3:
+            raise ValueError("Order must be >= 3")
+        self.order = order
+        self.d = (order - 1) // 2
+        self.max_keys = 2 * self.d
+        self.min_keys = self.d
+        self.int_keys = int_keys
+        self.version = 0                # incrémenté à chaque modification (détection de changement)
+        self.root = self._new_node(leaf=True)
+
+    def _new_node(self, leaf: bool, keys: Iterable[int] = ()) -> BPlusNode:
+        return BPlusNode(leaf=leaf, keys=new_keys(self.int_keys, keys))
+
+    # ============================================================
+    # CHARGEMENT EN MASSE (bottom-up)
+    # ============================================================
+    @classmethod
+    def bulk_load(cls, iterable: Iterable[int], order: int = 7, fill_factor: float = 1.0,
+                  int_keys: bool = False) -> 'BPlusTree':
+        tree = cls(order, int_keys)
+        data = sorted_unique(iterable)
+        if not data:
+            return tree
+        lo, hi = tree.min_keys, tree.max_keys
+        target = fill_target(fill_factor, lo, hi)
+
+        # feuilles : découpage de data sans clé montante
+        n = len(data)
+        k = 1
+        if n > hi:
+            k = min(max(-(-n // target), -(-n // hi)), n // lo)
+        q, r = divmod(n, k)
+        level: List[BPlusNode] = []
+        pos = 0
+        for j in range(k):
+            size = q + (1 if j < r else 0)
+            leaf = tree._new_node(True, data[pos:pos + size])
+            pos += size
+            if level:
+                level[-1].next = leaf
+                leaf.prev = level[-1]
+            level.append(leaf)
+        lows = [leaf.keys[0] for leaf in level]
+
+        # niveaux internes : séparateur = plus petite clé du sous-arbre droit
+        while len(level) > 1:
+            parents, up = [], []
+            child = 0
+            for size in pack_sizes(len(level) - 1, target, lo, hi):
+                node = tree._new_node(False, lows[child + 1:child + size + 1])
+                node.children = level[child:child + size + 1]
+                for c in node.children:
+                    c.parent = node
+                parents.append(node)
+                up.append(lows[child])
+                child += size + 1
+            level, lows = parents, up
+        tree.root = level[0]
+        return tree
+
+    # ============================================================
+    # RECHERCHE
+    # ============================================================
+    def _find_leaf(self, k: int) -> BPlusNode:
+        node = self.root
+        while not node.leaf:
+            node = node.children[bisect.bisect_right(node.keys, k)]
+        return node
+
+    def search(self, k: int) -> Optional[Tuple[BPlusNode, int]]:
+        leaf = self._find_leaf(k)
+        i = bisect.bisect_left(leaf.keys, k)
+        if i < len(leaf.keys) and leaf.keys[i] == k:
+            return leaf, i
+        return None
+
+    # ============================================================
+    # INSERTION
+    # ============================================================
+    def insert(self, key: int):
+        self.version += 1
+        leaf = self._find_leaf(key)
+        i = bisect.bisect_left(leaf.keys, key)
+        if i < len(leaf.keys) and leaf.keys[i] == key:
+            return
+        leaf.keys.insert(i, key)
+        if len(leaf.keys) > self.max_keys:
+            self._split(leaf)
+
+    def _split(self, node: BPlusNode):
+        # remontée itérative tant que le nœud déborde
+        while len(node.keys) > self.max_keys:
+            mid = len(node.keys) // 2
+            new_node = self._new_node(leaf=node.leaf)
+            if node.leaf:
+                # la clé médiane est copiée vers le parent et reste dans la feuille droite
+                new_node.keys = node.keys[mid:]
+                node.keys = node.keys[:mid]
+                sep = new_node.keys[0]
+                new_node.next = node.next
+                if node.next is not None:
+                    node.next.prev = new_node
+                node.next = new_node
+                new_node.prev = node
+            else:
+                # la clé médiane monte et quitte le nœud interne
+                sep = node.keys[mid]
+                new_node.keys = node.keys[mid + 1:]
+                node.keys = node.keys[:mid]
+                new_node.children = node.children[mid + 1:]
+                node.children = node.children[:mid + 1]
+                for c in new_node.children:
+                    c.parent = new_node
+
+            parent = node.parent
+            if parent is None:
+                parent = self._new_node(leaf=False)
+                parent.children.append(node)
+                node.parent = parent
+                self.root = parent
+            idx = bisect.bisect_right(parent.keys, sep)
+            parent.keys.insert(idx, sep)
+            parent.children.insert(idx + 1, new_node)
+            new_node.parent = parent
+            node = parent
+
+    # ============================================================
+    # SUPPRESSION
+    # ============================================================
+    def delete(self, k: int):
+        self.version += 1
+        leaf = self._find_leaf(k)
+        i = bisect.bisect_left(leaf.keys, k)
+        if i >= len(leaf.keys) or leaf.keys[i] != k:
+            return
+        leaf.keys.pop(i)
+        self._fix_underflow(leaf)
+
+    def _fix_underflow(self, node: BPlusNode):
+        while node is not self.root and len(node.keys) < self.min_keys:
+            parent = node.parent
+            idx = self._child_index(parent, node)
+            left = parent.children[idx - 1] if idx > 0 else None
+            right = parent.children[idx + 1] if idx + 1 < len(parent.children) else None
+
+            if left is not None and len(left.keys) > self.min_keys:
+                self._borrow_from_prev(parent, idx)
+                return
+            if right is not None and len(right.keys) > self.min_keys:
+                self._borrow_from_next(parent, idx)
+                return
+            if left is not None:
+                self._merge(parent, idx - 1)
+            else:
+                self._merge(parent, idx)
+            node = parent
+
+        if not self.root.leaf and not self.root.keys:
+            self.root = self.root.children[0]
+            self.root.parent = None
+
+    def _child_index(self, parent: BPlusNode, node: BPlusNode) -> int:
+        if node.keys:
+            return bisect.bisect_right(parent.keys, node.keys[0])
+        return parent.children.index(node)
+
+    def _borrow_from_prev(self, parent: BPlusNode, idx: int):
+        child = parent.children[idx]
+        sibling = parent.children[idx - 1]
+        if child.leaf:
+            child.keys.insert(0, sibling.keys.pop())
+            parent.keys[idx - 1] = child.keys[0]
+        else:
+            child.keys.insert(0, parent.keys[idx - 1])
+            parent.keys[idx - 1] = sibling.keys.pop()
+            moved = sibling.children.pop()
+            moved.parent = child
+            child.children.insert(0, moved)
+
+    def _borrow_from_next(self, parent: BPlusNode, idx: int):
+        child = parent.children[idx]
+        sibling = parent.children[idx + 1]
+        if child.leaf:
+            child.keys.append(sibling.keys.pop(0))
+            parent.keys[idx] = sibling.keys[0]
+        else:
+            child.keys.append(parent.keys[idx])
+            parent.keys[idx] = sibling.keys.pop(0)
+            moved = sibling.children.pop(0)
+            moved.parent = child
+            child.children.append(moved)
+
+    def _merge(self, parent: BPlusNode, idx: int):
+        child = parent.children[idx]
+        sibling = parent.children[idx + 1]
+        sep = parent.keys.pop(idx)
+        parent.children.pop(idx + 1)
+        if child.leaf:
+            child.keys.extend(sibling.keys)
+            child.next = sibling.next
+            if sibling.next is not None:
+                sibling.next.prev = child
+        else:
+            child.keys.append(sep)
+            child.keys.extend(sibling.keys)
+            for c in sibling.children:
+                c.parent = child
+            child.children.extend(sibling.children)
+
+    # ============================================================
+    # PARCOURS PAR LES FEUILLES CHAÎNÉES
+    # ============================================================
+    def _first_leaf(self) -> BPlusNode:
+        node = self.root
+        while not node.leaf:
+            node = node.children[0]
+        return node
+
+    def _last_leaf(self) -> BPlusNode:
+        node = self.root
+        while not node.leaf:
+            node = node.children[-1]
+        return node
+
+    def range(self, lo: Optional[int] = None, hi: Optional[int] = None) -> Iterator[int]:
+        # une descente vers la feuille de lo, puis uniquement des pointeurs next
+        if lo is None:
+            leaf, i = self._first_leaf(), 0
+        else:
+            leaf = self._find_leaf(lo)
+            i = bisect.bisect_left(leaf.keys, lo)
+        while leaf is not None:
+            keys = leaf.keys
+            while i < len(keys):
+                if hi is not None and keys[i] > hi:
+                    return
+                yield keys[i]
+                i += 1
+            leaf, i = leaf.next, 0
+
+    def __iter__(self) -> Iterator[int]:
+        return self.range()
+
+    def __reversed__(self) -> Iterator[int]:
+        leaf = self._last_leaf()
+        while leaf is not None:
+            for i in range(len(leaf.keys) - 1, -1, -1):
+                yield leaf.keys[i]
+            leaf = leaf.prev
+
+    # ============================================================
+    # INVARIANTS
+    # ============================================================
+    def check_invariants(self) -> int:
+        """Vérifie l'arbre ; renvoie le nombre de clés, lève InvariantError au premier défaut.
+
+        Contrôles d'un arbre B (nombre de clés, ordre strict, feuilles à la même
+        profondeur, pointeurs parent), avec des séparateurs qui bornent leur
+        sous-arbre droit au sens large (bas <= clés < haut), et un chaînage
+        next/prev qui relie toutes les feuilles de gauche à droite.
+        """
+        leaves: List[BPlusNode] = []
+        leaf_depth = None
+        stack = [(self.root, 0, None, None, None)]
+        while stack:
+            node, depth, low, high, parent = stack.pop()
+            keys, n = node.keys, len(node.keys)
+            where = f"node {list(keys)[:8]} at depth {depth}"
+            if node is self.root:
+                if n > self.max_keys:
+                    raise InvariantError(f"root has {n} keys > {self.max_keys}")
+                if not node.leaf and n == 0:
+                    raise InvariantError("internal root without keys")
+            elif not self.min_keys <= n <= self.max_keys:
+                raise InvariantError(f"{where}: {n} keys outside [{self.min_keys}, {self.max_keys}]")
+            for i in range(1, n):
+                if not keys[i - 1] < keys[i]:
+                    raise InvariantError(f"{where}: keys not strictly increasing ({keys[i - 1]!r}, {keys[i]!r})")
+            if n and ((low is not None and keys[0] < low) or (high is not None and not keys[-1] < high)):
+                raise InvariantError(f"{where}: keys outside separator bounds [{low!r}, {high!r})")
+            if node.parent is not parent:
+                raise InvariantError(f"{where}: wrong parent pointer")
+            if node.leaf:
+                if node.children:
+                    raise InvariantError(f"{where}: leaf with children")
+                if leaf_depth is None:
+                    leaf_depth = depth
+                elif depth != leaf_depth:
+                    raise InvariantError(f"{where}: leaf depth {depth} != {leaf_depth}")
+                leaves.append(node)
+                continue
+            if len(node.children) != n + 1:
+                raise InvariantError(f"{where}: {len(node.children)} children for {n} keys")
+            # fils empilés de droite à gauche : les feuilles sortent dans l'ordre
+            for i in range(n, -1, -1):
+                stack.append((node.children[i], depth + 1, keys[i - 1] if i else low,
+                              keys[i] if i < n else high, node))
+
+        if leaves[0].prev is not None or leaves[-1].next is not None:
+            raise InvariantError("leaf chain does not start and end at the outer leaves")
+        for a, b in zip(leaves, leaves[1:]):
+            if a.next is not b or b.prev is not a:
+                raise InvariantError(f"leaf chain broken between {list(a.keys)[:8]} and {list(b.keys)[:8]}")
+        return sum(len(leaf.keys) for leaf in leaves)
+
+    # ============================================================
+    # MÉMOIRE / DEBUG
+    # ============================================================
+    def memory_report(self) -> Dict[str, float]:
+        return memory_report(self.root)
+
+    def print_tree(self, node: Optional[BPlusNode] = None, lvl: int = 0):
+        if node is None:
+            node = self.root
+        print("  " * lvl + str(list(node.keys)))
+        if not node.leaf:
+            for c in node.children:
+                self.print_tree(c, lvl + 1)
+
+
+if __name__ == "__main__":
+    b = BPlusTree(order=5)
+    for x in [10, 20, 5, 6, 12, 30, 7, 17]:
+        b.insert(x)
+    b.print_tree()
+    print(list(b.range(6, 17)))
@@ -0,0 +1,233 @@
+"""Banc d'essai des arbres de TP2 : variantes, ordres, distributions de clés.
+
+Exemple :
+    python -m TP2.bench_arbre --variants btree bstar bplus --orders 7 33 129 \\
+        --sizes 10000 100000 --out resultats.json
+
+Chaque cas (variante, ordre, taille, charge, distribution) s'exécute dans un
+processus neuf, ce qui isole la mémoire de pointe (ru_maxrss) d'un cas à
+l'autre. Les clés chargées sont les entiers pairs de [0, 2n) : les clés
+impaires sont des absences garanties.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Sequence
+import argparse
+import json
+import multiprocessing
+import platform
+import random
+import resource
+import sys
+import time
+
+from TP2.generateurs_cles import DISTRIBUTIONS, load_order, probes
+
+VARIANTS = ("btree", "bstar", "bplus")
+WORKLOADS = ("insert", "search", "delete", "range", "mixed")
+MAX_SAMPLES = 100_000       # latences individuelles conservées par cas
+RANGE_SPAN = 200            # largeur (en valeurs de clé) d'une requête range
+
+
+def _tree_class(variant: str):
+    # imports paresseux : un processus de mesure ne charge que sa variante
+    if variant == "btree":
+        from TP2.b_arbre import bTree
+        return bTree
+    if variant == "bstar":
+        from TP2.b_arbre_star import BStarTree
+        return BStarTree
+    if variant == "bplus":
+        from TP2.b_plus_arbre import BPlusTree
+        return BPlusTree
+    raise ValueError(f"unknown variant {variant!r}")
+
+
+def _capacity(tree) -> int:
+    return tree.kmax if hasattr(tree, "kmax") else tree.max_keys
+
+
+# ============================================================
+# MESURE D'UN CAS
+# ============================================================
+class _Timer:
+    """Chronomètre global + latences échantillonnées (une opération sur `stride`)."""
+
+    def __init__(self, ops: int):
+        self.stride = max(1, ops // MAX_SAMPLES)
+        self.samples: List[int] = []
+
+    def run(self, ops: Iterator, apply) -> float:
+        stride, samples, clock = self.stride, self.samples, time.perf_counter_ns
+        start = time.perf_counter()
+        for i, op in enumerate(ops):
+            if i % stride:
+                apply(op)
+            else:
+                t0 = clock()
+                apply(op)
+                samples.append(clock() - t0)
+        return time.perf_counter() - start
+
+    def percentile(self, p: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] / 1000.0
+
+
+def _height(tree) -> int:
+    node, h = tree.root, 0
+    while node is not None:
+        h += 1
+        node = None if node.leaf else node.children[0]
+    return h
+
+
+def run_case(variant: str, order: int, n: int, workload: str, dist: str,
+             ops: int = 100_000, seed: int = 0) -> Dict[str, object]:
+    """Exécute un cas dans le processus courant et renvoie ses mesures."""
+    cls = _tree_class(variant)
+    rnd = random.Random(seed)
+    keys = load_order(dist, n, rnd)
+    row: Dict[str, object] = {"variant": variant, "order": order, "n": n,
+                              "workload": workload, "distribution": dist}
+
+    if workload == "insert":
+        tree = cls(order)
+        stream: Sequence = keys
+        apply = tree.insert
+    elif workload == "delete":
+        # la moitié seulement : hauteur et remplissage décrivent l'arbre rééquilibré
+        tree = cls.bulk_load(keys, order)
+        stream = keys[:n // 2]
+        apply = tree.delete
+    else:
+        half = keys[:n // 2] if workload == "mixed" else keys
+        tree = cls.bulk_load(half, order)
+        count = min(ops, n)
+        if workload == "search":
+            stream = probes(dist, n, count, rnd)
+            apply = tree.search
+        elif workload == "range":
+            stream = probes(dist, n, count, rnd)
+            apply = lambda lo: sum(1 for _ in tree.range(lo, lo + RANGE_SPAN))
+        else:
+            # 50 % recherches, 25 % insertions de clés neuves, 25 % suppressions (FIFO)
+            fresh = iter(keys[n // 2:])
+            live = list(half)
+            dead = iter(live)
+            look = probes(dist, n, count, rnd)
+            kinds = [rnd.random() for _ in range(count)]
+
+            def mixed(i: int):
+                r = kinds[i]
+                if r < 0.5:
+                    tree.search(look[i])
+                elif r < 0.75:
+                    k = next(fresh, None)
+                    if k is not None:
+                        tree.insert(k)
+                else:
+                    k = next(dead, None)
+                    if k is not None:
+                        tree.delete(k)
+            stream = range(count)
+            apply = mixed
+
+    timer = _Timer(len(stream))
+    try:
+        elapsed = timer.run(iter(stream), apply)
+    except Exception as exc:        # variante défaillante : le cas est noté, la campagne continue
+        row["error"] = f"{type(exc).__name__}: {exc}"
+        return row
+
+    mem = tree.memory_report()
+    row.update({
+        "ops": len(stream),
+        "seconds": elapsed,
+        "ops_per_sec": len(stream) / elapsed if elapsed else 0.0,
+        "p50_us": timer.percentile(50),
+        "p99_us": timer.percentile(99),
+        "height": _height(tree),
+        "nodes": mem["nodes"],
+        # clés stockées ; mem["keys"] compte aussi les séparatrices internes du B+
+        "keys": sum(1 for _ in tree),
+        "fill_factor": mem["keys"] / (mem["nodes"] * _capacity(tree)) if mem["nodes"] else 0.0,
+        "tree_bytes": mem["total_bytes"],
+        # ru_maxrss est en Kio sous Linux, en octets sous macOS
+        "peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                          * (1 if sys.platform == "darwin" else 1024),
+    })
+    return row
+
+
+def _isolated(args: tuple) -> Dict[str, object]:
+    return run_case(*args)
+
+
+def run_suite(variants: Sequence[str] = VARIANTS, orders: Sequence[int] = (7, 33, 129),
+              sizes: Sequence[int] = (10_000, 100_000), workloads: Sequence[str] = WORKLOADS,
+              distributions: Sequence[str] = DISTRIBUTIONS, ops: int = 100_000, seed: int = 0,
+              isolate: bool = True, progress=None) -> List[Dict[str, object]]:
+    cases = [(v, o, n, w, d, ops, seed)
+             for n in sizes for v in variants for o in orders for w in workloads for d in distributions]
+    rows = []
+    ctx = multiprocessing.get_context("spawn")
+    for case in cases:
+        if isolate:
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                row = pool.submit(_isolated, case).result()
+        else:
+            row = run_case(*case)
+        rows.append(row)
+        if progress is not None:
+            progress(row)
+    return rows
+
+
+def _print_row(row: Dict[str, object]):
+    head = f"{row['variant']:>6} m={row['order']:<4} n={row['n']:<9} {row['workload']:<7} {row['distribution']:<12}"
+    if "error" in row:
+        print(f"{head} ERREUR {row['error']}")
+    else:
+        print(f"{head} {row['ops_per_sec']:>11.0f} ops/s  p50={row['p50_us']:.1f}us  "
+              f"p99={row['p99_us']:.1f}us  h={row['height']}  fill={row['fill_factor']:.2f}")
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Banc d'essai bTree / BStarTree / BPlusTree")
+    parser.add_argument("--variants", nargs="+", choices=VARIANTS, default=list(VARIANTS))
+    parser.add_argument("--orders", nargs="+", type=int, default=[7, 33, 129])
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10_000, 100_000],
+                        help="nombre de clés (jusqu'à 10^7)")
+    parser.add_argument("--workloads", nargs="+", choices=WORKLOADS, default=list(WORKLOADS))
+    parser.add_argument("--distributions", nargs="+", choices=DISTRIBUTIONS, default=list(DISTRIBUTIONS))
+    parser.add_argument("--ops", type=int, default=100_000,
+                        help="opérations pour search/range/mixed (insert : n, delete : n/2)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-isolate", action="store_true",
+                        help="tout exécuter dans ce processus (peak_rss devient cumulatif)")
+    parser.add_argument("--out", default="bench_arbre.json")
+    args = parser.parse_args(argv)
+
+    started = time.strftime("%Y-%m-%dT%H:%M:%S")
+    rows = run_suite(args.variants, args.orders, args.sizes, args.workloads, args.distributions,
+                     args.ops, args.seed, not args.no_isolate, _print_row)
+    report = {
+        "meta": {
+            "started": started,
+            "python": sys.version.split()[0],
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "args": vars(args),
+        },
+        "results": rows,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"{len(rows)} cas écrits dans {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+from typing import Any, Dict, Iterable, List, Optional
+import math
+
+
+# ============================================================
+# FILTRES DE BLOOM (recherches négatives en O(1))
+# ============================================================
+_MASK64 = (1 << 64) - 1
+_GOLDEN = 0x9E3779B97F4A7C15
+
+
+def _split_hash(key: Any):
+    # hash(int) vaut l'entier lui-même : deux tours multiplication / xorshift le
+    # dispersent ; h1 (poids fort) est la première sonde, h2 impair le pas
+    h = hash(key) * _GOLDEN & _MASK64
+    h ^= h >> 29
+    h = h * _GOLDEN & _MASK64
+    return h >> 32, (h & 0xFFFFFFFF) | 1
+
+
+class BloomFilter:
+    """Filtre de Bloom de capacité fixe : aucun faux négatif, faux positifs ~ error_rate.
+
+    m = -n·ln(p) / ln(2)² bits et k = (m/n)·ln(2) sondes, obtenues par double
+    hachage (h1 + i·h2) d'un seul hash 64 bits.
+    """
+
+    __slots__ = ("capacity", "error_rate", "nbits", "nhashes", "count", "_bits")
+
+    def __init__(self, capacity: int, error_rate: float):
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be in (0, 1)")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.nbits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.nhashes = max(1, round(self.nbits / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.nbits + 7) // 8)
+
+    def add(self, key: Any):
+        self.add_hash(*_split_hash(key))
+
+    def add_hash(self, h1: int, h2: int):
+        bits, m = self._bits, self.nbits
+        for _ in range(self.nhashes):
+            p = h1 % m
+            bits[p >> 3] |= 1 << (p & 7)
+            h1 += h2
+        self.count += 1
+
+    def __contains__(self, key: Any) -> bool:
+        return self.has_hash(*_split_hash(key))
+
+    def has_hash(self, h1: int, h2: int) -> bool:
+        # s'arrête au premier bit nul : un échec coûte en moyenne une ou deux sondes
+        bits, m = self._bits, self.nbits
+        for _ in range(self.nhashes):
+            p = h1 % m
+            if not bits[p >> 3] >> (p & 7) & 1:
+                return False
+            h1 += h2
+        return True
+
+    def memory_bytes(self) -> int:
+        return len(self._bits)
+
+
+class ScalableBloomFilter:
+    """Filtre de Bloom extensible (Almeida et al., 2007).
+
+    Quand l'étage courant atteint sa capacité, un nouvel étage `growth` fois
+    plus grand est ajouté, avec un taux d'erreur multiplié par `tightening` :
+    le taux global reste borné par error_rate quel que soit le nombre de clés.
+    La suppression n'existe pas : le propriétaire reconstruit le filtre.
+    """
+
+    def __init__(self, capacity: int = 1024, error_rate: float = 0.01, growth: int = 2,
+                 tightening: float = 0.5):
+        if growth < 2:
+            raise ValueError("growth must be >= 2")
+        if not 0 < tightening < 1:
+            raise ValueError("tightening must be in (0, 1)")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.growth = growth
+        self.tightening = tightening
+        # somme géométrique : p0 · (1 + r + r² + ...) = p0 / (1 - r) = error_rate
+        self.stages: List[BloomFilter] = [BloomFilter(capacity, error_rate * (1 - tightening))]
+        self.count = 0
+
+    @classmethod
+    def from_keys(cls, keys: Iterable[Any], count: int, capacity: int = 1024,
+                  error_rate: float = 0.01) -> 'ScalableBloomFilter':
+        # un seul étage dimensionné pour `count` clés (reconstruction)
+        bloom = cls(max(capacity, count), error_rate)
+        for k in keys:
+            bloom.add(k)
+        return bloom
+
+    def add(self, key: Any):
+        stage = self.stages[-1]
+        if stage.count >= stage.capacity:
+            stage = BloomFilter(stage.capacity * self.growth, stage.error_rate * self.tightening)
+            self.stages.append(stage)
+        stage.add_hash(*_split_hash(key))
+        self.count += 1
+
+    def __contains__(self, key: Any) -> bool:
+        # un seul hachage pour tous les étages
+        h1, h2 = _split_hash(key)
+        for stage in self.stages:
+            if stage.has_hash(h1, h2):
+                return True
+        return False
+
+    def __len__(self) -> int:
+        return self.count
+
+    def memory_bytes(self) -> int:
+        return sum(stage.memory_bytes() for stage in self.stages)
+
+    def false_positive_rate(self) -> float:
+        # estimation au remplissage courant : 1 - Π(1 - (1 - e^(-k·n/m))^k)
+        ok = 1.0
+        for stage in self.stages:
+            fill = 1 - math.exp(-stage.nhashes * stage.count / stage.nbits)
+            ok *= 1 - fill ** stage.nhashes
+        return 1 - ok
+
+
+def bloom_stats(bloom: Optional[ScalableBloomFilter], stale_deletes: int = 0) -> Dict[str, float]:
+    # coût mémoire et taux de faux positifs estimé d'un filtre attaché à un arbre
+    if bloom is None:
+        return {}
+    return {
+        "keys": len(bloom),
+        "stages": len(bloom.stages),
+        "memory_bytes": bloom.memory_bytes(),
+        "bits_per_key": 8 * bloom.memory_bytes() / max(1, len(bloom)),
+        "false_positive_rate": bloom.false_positive_rate(),
+        "stale_deletes": stale_deletes,
+    }
@@ -0,0 +1,118 @@
+from typing import Any, List, Sequence, Tuple
+import struct
+
+
+# ============================================================
+# ENCODAGE « MEMCOMPARABLE » DES CLÉS
+# ============================================================
+# L'ordre des octets (comparaison lexicographique de bytes) reproduit l'ordre
+# Python des valeurs : les pages d'un fichier peuvent être comparées et
+# parcourues sans décoder les objets.
+#   int   : 0x10 | valeur + 2**63 en big-endian sur 8 octets (int64)
+#   bytes : 0x20 | octets, 0x00 échappé en 0x00 0xFF | 0x00 0x00
+#   str   : 0x30 | UTF-8 échappé comme bytes (UTF-8 conserve l'ordre des points de code)
+#   tuple : 0x40 | éléments encodés | 0x00 (la fin précède tout élément : (a,) < (a, b))
+# Les types ne se mélangent pas plus qu'en Python : seul l'ordre à type égal compte.
+TAG_INT = 0x10
+TAG_BYTES = 0x20
+TAG_STR = 0x30
+TAG_TUPLE = 0x40
+END = 0x00
+_INT = struct.Struct(">Q")
+_BIAS = 1 << 63
+
+
+def _escape(out: bytearray, data: bytes):
+    out += data.replace(b"\x00", b"\x00\xff")
+    out += b"\x00\x00"
+
+
+def _encode(out: bytearray, value: Any):
+    if isinstance(value, int):
+        if not -_BIAS <= value < _BIAS:
+            raise OverflowError(f"integer key {value} does not fit in 64 bits")
+        out.append(TAG_INT)
+        out += _INT.pack(value + _BIAS)
+    elif isinstance(value, str):
+        out.append(TAG_STR)
+        _escape(out, value.encode("utf-8", "surrogatepass"))
+    elif isinstance(value, (bytes, bytearray)):
+        out.append(TAG_BYTES)
+        _escape(out, bytes(value))
+    elif isinstance(value, tuple):
+        out.append(TAG_TUPLE)
+        for item in value:
+            _encode(out, item)
+        out.append(END)
+    else:
+        raise TypeError(f"cannot encode key of type {type(value).__name__}")
+
+
+def encode_key(value: Any) -> bytes:
+    """Encode int, str, bytes ou tuple de ceux-ci : a < b  <=>  encode_key(a) < encode_key(b)."""
+    out = bytearray()
+    _encode(out, value)
+    return bytes(out)
+
+
+def _unescape(data: bytes, pos: int) -> Tuple[bytes, int]:
+    out = bytearray()
+    while True:
+        end = data.index(b"\x00", pos)
+        out += data[pos:end]
+        if data[end + 1] == 0xFF:
+            out.append(0)
+            pos = end + 2
+        else:
+            return bytes(out), end + 2
+
+
+def _decode(data: bytes, pos: int) -> Tuple[Any, int]:
+    tag = data[pos]
+    pos += 1
+    if tag == TAG_INT:
+        return _INT.unpack_from(data, pos)[0] - _BIAS, pos + _INT.size
+    if tag == TAG_STR:
+        raw, pos = _unescape(data, pos)
+        return raw.decode("utf-8", "surrogatepass"), pos
+    if tag == TAG_BYTES:
+        return _unescape(data, pos)
+    if tag == TAG_TUPLE:
+        items = []
+        while data[pos] != END:
+            item, pos = _decode(data, pos)
+            items.append(item)
+        return tuple(items), pos + 1
+    raise ValueError(f"unknown key tag 0x{tag:02x} at offset {pos - 1}")
+
+
+def decode_key(data: bytes) -> Any:
+    value, pos = _decode(data, 0)
+    if pos != len(data):
+        raise ValueError("trailing bytes after encoded key")
+    return value
+
+
+# ============================================================
+# COMPRESSION DE PRÉFIXE DANS UN NŒUD
+# ============================================================
+def common_prefix(keys: Sequence) -> int:
+    # longueur du plus long préfixe commun : clés triées, il suffit de comparer la première et la dernière
+    if not keys:
+        return 0
+    first, last = keys[0], keys[-1]
+    n = min(len(first), len(last))
+    i = 0
+    while i < n and first[i] == last[i]:
+        i += 1
+    return i
+
+
+def compress_prefix(keys: Sequence) -> Tuple[Any, List]:
+    """Factorise le préfixe commun de clés triées (str ou bytes) : (préfixe, suffixes)."""
+    n = common_prefix(keys)
+    return (keys[0][:n] if keys else b""), [k[n:] for k in keys]
+
+
+def expand_prefix(prefix, suffixes: Sequence) -> List:
+    return [prefix + s for s in suffixes]
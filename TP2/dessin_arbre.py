@@ -0,0 +1,260 @@
+from typing import Any, Dict, List, Optional, Tuple
+import bisect
+
+
+# ============================================================
+# DISPOSITION INCRÉMENTALE (cache par identité de nœud)
+# ============================================================
+class Box:
+    """Disposition relative d'un sous-arbre.
+
+    Les clés des feuilles occupent les colonnes 0 .. width - 1 ; une clé
+    interne est placée entre la dernière colonne de son fils gauche et la
+    première de son fils droit. Les positions absolues s'obtiennent en
+    ajoutant le décalage du sous-arbre : un ajout à gauche ne recalcule pas
+    les boîtes de droite, il les décale.
+    """
+
+    __slots__ = ("node", "sig", "children", "offsets", "width", "key_x", "center",
+                 "count", "nodes", "depth", "lo", "hi")
+
+    def __init__(self, node, sig, children: List['Box']):
+        self.node = node
+        self.sig = sig
+        self.children = children
+        if node.leaf or not children:
+            self.offsets: List[int] = []
+            self.width = len(sig)
+            self.key_x = [float(x) for x in range(len(sig))]
+            self.count = len(sig)
+            self.nodes = 1
+            self.depth = 1
+            self.lo = sig[0] if sig else None
+            self.hi = sig[-1] if sig else None
+        else:
+            self.offsets = []
+            pos = 0
+            for c in children:
+                self.offsets.append(pos)
+                pos += c.width
+            self.width = pos
+            # fils vides (feuille racine vidée) ignorés, comme dans le dessin d'origine
+            ranges = [(off + c.key_x[0], off + c.key_x[-1])
+                      for off, c in zip(self.offsets, children) if c.key_x]
+            self.key_x = [(ranges[i][1] + ranges[i + 1][0]) / 2.0
+                          for i in range(min(len(sig), len(ranges) - 1))]
+            if not self.key_x and ranges:
+                self.key_x = [sum(r for _, r in ranges) / len(ranges)]
+            self.count = len(sig) + sum(c.count for c in children)
+            self.nodes = 1 + sum(c.nodes for c in children)
+            self.depth = 1 + max(c.depth for c in children)
+            self.lo = children[0].lo if children[0].lo is not None else (sig[0] if sig else None)
+            self.hi = children[-1].hi if children[-1].hi is not None else (sig[-1] if sig else None)
+        self.center = sum(self.key_x) / len(self.key_x) if self.key_x else 0.0
+
+
+class TreeLayout:
+    """Cache de boîtes indexé par identité de nœud.
+
+    Si le compteur `version` de l'arbre (bTree, BStarTree, BPlusTree) n'a pas
+    bougé depuis le dernier calcul et que la racine est la même, la boîte
+    racine est rendue telle quelle, sans parcours. Sinon, les clés et les fils
+    de chaque nœud sont comparés à ceux de sa boîte (comparaison de listes,
+    sans allocation) : seules les boîtes du chemin modifié sont recalculées,
+    les sous-arbres intacts sont réutilisés. Le rendu ne modifie jamais
+    l'arbre (aucun instantané, donc aucune copie forcée à l'écriture suivante).
+    """
+
+    def __init__(self):
+        self._boxes: Dict[int, Box] = {}
+        self._tree = None
+        self._version = None        # version de l'arbre au dernier calcul
+        self._root: Optional[Box] = None
+        self.recomputed = 0         # boîtes recalculées par la dernière mise à jour
+
+    def update(self, tree) -> Optional[Box]:
+        if tree is not self._tree:
+            self._boxes.clear()
+            self._tree = tree
+            self._version = self._root = None
+        self.recomputed = 0
+        root = getattr(tree, "root", None)
+        version = getattr(tree, "version", None)
+        if version is not None and version == self._version and \
+                (self._root.node if self._root is not None else None) is root:
+            return self._root
+        self._version = version
+        if root is None or (not root.keys and not root.children):
+            self._root = None
+            return None
+        box = self._root = self._box(root)
+        if len(self._boxes) > 2 * box.nodes + 64:
+            self._prune(box)
+        return box
+
+    def _box(self, node) -> Box:
+        boxes = self._boxes
+        box = boxes.get(id(node))
+        if node.children:
+            children = [self._box(c) for c in node.children]
+            if box is not None and box.node is node and node.keys == box.sig and children == box.children:
+                return box
+        else:
+            # feuilles (la grande majorité) : une comparaison de listes
+            if box is not None and box.node is node and node.keys == box.sig and not box.children:
+                return box
+            children = []
+        box = Box(node, node.keys[:], children)
+        boxes[id(node)] = box
+        self.recomputed += 1
+        return box
+
+    def _prune(self, root: Box):
+        # ne garde que les boîtes encore atteignables (les nœuds morts sont libérés)
+        self._boxes = {}
+        stack = [root]
+        while stack:
+            box = stack.pop()
+            self._boxes[id(box.node)] = box
+            stack.extend(box.children)
+
+
+# ============================================================
+# SCÈNE (positions absolues, niveau de détail)
+# ============================================================
+LEAF, INTERNAL, COLLAPSED, FOCUS = "leaf", "internal", "collapsed", "focus"
+
+
+class Scene:
+    """Ce qu'il faut dessiner : boîtes (clé d'artiste, texte, x, y, style) et segments."""
+
+    __slots__ = ("items", "edges", "chain", "xlim", "ylim", "collapsed")
+
+    def __init__(self):
+        self.items: List[Tuple[tuple, str, float, float, str]] = []
+        self.edges: List[Tuple[Tuple[float, float], Tuple[float, float]]] = []
+        self.chain: List[Tuple[Tuple[float, float], Tuple[float, float]]] = []
+        self.xlim = (-1.0, 1.0)
+        self.ylim = (-1.0, 1.0)
+        self.collapsed: Dict[tuple, Box] = {}   # clé d'artiste -> sous-arbre replié
+
+
+def focus_path(root: Box, key: Any) -> List[Box]:
+    # boîtes de la racine jusqu'au nœud qui contient key (ou à la feuille où elle serait)
+    path, box = [], root
+    while box is not None:
+        path.append(box)
+        keys = box.sig
+        try:
+            i = bisect.bisect_left(keys, key)
+        except TypeError:
+            return []
+        if (i < len(keys) and keys[i] == key) or not box.children:
+            return path
+        box = box.children[i] if i < len(box.children) else None
+    return path
+
+
+def _scale(count: int) -> float:
+    if count < 10:
+        return 1.5
+    if count < 25:
+        return 1.2
+    if count < 50:
+        return 1.0
+    return 0.8
+
+
+def build_scene(root: Box, budget: int = 150, focus: Any = None) -> Scene:
+    """Scène complète si l'arbre tient dans `budget` nœuds, sinon niveau de détail.
+
+    En niveau de détail, les premiers niveaux sont dessinés tant qu'ils
+    tiennent dans la moitié du budget ; plus bas, un sous-arbre devient une
+    seule boîte « min…max (n) ». Le chemin vers `focus` (dernière clé
+    recherchée, insérée ou dépliée) reste ouvert jusqu'à sa feuille, ses
+    frères repliés.
+    """
+    path = focus_path(root, focus) if focus is not None else []
+    on_path = {id(b) for b in path}
+    found = path[-1] if path and focus in path[-1].sig else None
+    scene = Scene()
+    if root.nodes <= budget:
+        placed = _place_full(root)
+    else:
+        level, seen, frontier = 0, 0, [root]
+        while frontier and seen + len(frontier) <= budget // 2:
+            seen += len(frontier)
+            frontier = [c for b in frontier for c in b.children]
+            level += 1
+        # le dernier niveau complet est replié : ses nœuds restent des boîtes résumées
+        placed = _place_lod(root, max(level - 1, 1), on_path)
+
+    offset = -(max(p[1] for p in placed) + min(p[1] for p in placed)) / 2
+    scale = _scale(root.count)
+    where: Dict[int, Tuple[float, float]] = {}
+    for box, x, depth, collapsed in placed:
+        x, y = (x + offset) * scale, -depth * 3.0
+        where[id(box.node)] = (x, y)
+        key = (id(box.node), collapsed)
+        if collapsed:
+            scene.items.append((key, f"{box.lo}…{box.hi} ({box.count})", x, y, COLLAPSED))
+            scene.collapsed[key] = box
+        else:
+            style = FOCUS if box is found else (LEAF if not box.children else INTERNAL)
+            label = "|".join(str(k) for k in box.sig)
+            scene.items.append((key, f"[{label}]", x, y, style))
+    for box, x, depth, collapsed in placed:
+        if not collapsed:
+            for c in box.children:
+                if id(c.node) in where:
+                    scene.edges.append((where[id(box.node)], where[id(c.node)]))
+        # chaînage des feuilles (B+-Arbre)
+        nxt = getattr(box.node, "next", None)
+        if not box.children and nxt is not None and id(nxt) in where:
+            scene.chain.append((where[id(box.node)], where[id(nxt)]))
+
+    xs = [x for _, _, x, _, _ in scene.items]
+    scene.xlim = (min(xs) - 3, max(xs) + 3)
+    scene.ylim = (-3.0 * max(depth for _, _, depth, _ in placed) - 1.5, 2)
+    return scene
+
+
+def _place_full(root: Box) -> List[Tuple[Box, float, int, bool]]:
+    # positions absolues = décalages cumulés des boîtes en cache
+    out = []
+    stack = [(root, 0, 0)]
+    while stack:
+        box, off, depth = stack.pop()
+        if box.key_x:
+            out.append((box, off + box.center, depth, False))
+        for c, o in zip(box.children, box.offsets):
+            stack.append((c, off + o, depth + 1))
+    return out
+
+
+def _place_lod(root: Box, level: int, on_path: set) -> List[Tuple[Box, float, int, bool]]:
+    # même règle que Box, sur le squelette visible : un sous-arbre replié vaut une colonne
+    out = []
+    column = [0]
+
+    def place(box: Box, depth: int) -> Tuple[float, float]:
+        if not box.children:
+            xs = [column[0] + x for x in box.key_x]
+            column[0] += box.width
+            center = sum(xs) / len(xs) if xs else float(column[0])
+            out.append((box, center, depth, False))
+            return (xs[0], xs[-1]) if xs else (center, center)
+        if depth >= level and id(box) not in on_path:
+            x = float(column[0])
+            column[0] += 1
+            out.append((box, x, depth, True))
+            return x, x
+        ranges = [place(c, depth + 1) for c in box.children]
+        key_x = [(ranges[i][1] + ranges[i + 1][0]) / 2.0
+                 for i in range(min(len(box.sig), len(ranges) - 1))] or \
+                [sum(r for _, r in ranges) / len(ranges)]
+        out.append((box, sum(key_x) / len(key_x), depth, False))
+        return key_x[0], key_x[-1]
+
+    place(root, 0)
+    return out
@@ -0,0 +1,514 @@
+"""Fuzzer différentiel des arbres de TP2 contre un modèle « liste triée ».
+
+Exemple :
+    python -m TP2.fuzz_arbre --variants btree bstar bplus disk --orders 3 4 5 7 --seconds 60
+
+Chaque tour part d'un arbre neuf et d'une graine dérivée de --seed, applique
+une suite aléatoire d'opérations, compare chaque résultat au modèle et
+vérifie check_invariants() toutes les `check_every` opérations. Le mélange
+dépend de la variante :
+  - toutes : insert, delete, search (setitem, pop, get, setdefault, items
+    pour les dictionnaires BTreeMap / BStarMap) ;
+  - en mémoire : range, bulk_load ; insert_many, delete_many (bTree, B*) ;
+    rank/select/count_range en mode counted ;
+  - bTree et BTreeMap : split_at, join, delete_range ; bTree : instantanés,
+    relus à chaque vérification tant qu'ils sont gardés ;
+  - DiskBTree journalisé (clés int64, ou memcomparable de longueur variable) :
+    commit, checkpoint, réouverture et arrêt brutal, après lequel l'arbre
+    rouvert doit contenir exactement l'état du dernier lot synchronisé.
+Une suite fautive est réduite (ddmin) avant d'être affichée sous forme de
+script rejouable.
+"""
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import argparse
+import bisect
+import importlib
+import os
+import random
+import shutil
+import tempfile
+import time
+
+Op = Tuple
+
+# variante -> (module de TP2, classe)
+VARIANTS = {
+    "btree": ("b_arbre", "bTree"),
+    "bstar": ("b_arbre_star", "BStarTree"),
+    "bplus": ("b_plus_arbre", "BPlusTree"),
+    "btreemap": ("map_arbre", "BTreeMap"),
+    "bstarmap": ("map_arbre", "BStarMap"),
+    "disk": ("b_arbre_disque", "DiskBTree"),
+    "diskbytes": ("b_arbre_disque", "DiskBTree"),
+}
+MAPS = ("btreemap", "bstarmap")
+DISKS = ("disk", "diskbytes")
+COUNTED = ("btree", "bstar", "btreemap", "bstarmap")
+CUTS = ("btree", "btreemap")         # split_at / join / delete_range
+MAX_SNAPSHOTS = 4                    # instantanés gardés en même temps (bTree)
+DISK_CACHE = 8                       # pages en cache : évictions et relectures fréquentes
+DISK_GROUP = 8                       # opérations par lot du journal
+
+
+def _tree_class(variant: str):
+    if variant not in VARIANTS:
+        raise ValueError(f"unknown variant {variant!r}")
+    module, name = VARIANTS[variant]
+    return getattr(importlib.import_module(f"TP2.{module}"), name)
+
+
+def disk_key(k: int) -> str:
+    # entier -> chaîne de même ordre (rang sur 5 chiffres) suivie d'un bourrage de 0 à
+    # 47 caractères : longueurs variables, peu de préfixe commun, pages pleines en octets
+    return f"{k:05d}" + "x" * (k * 7919 % 48)
+
+
+def simulate_crash(tree):
+    """Arrêt brutal d'un DiskBTree journalisé : ni commit, ni checkpoint.
+
+    Le lot du journal pas encore synchronisé et les pages sales du cache sont
+    perdus ; il ne reste que le journal sur disque et le fichier de données.
+    """
+    tree.wal._buffer.clear()
+    tree.wal._file.close()
+    tree.pager.close()
+
+
+def _disk_options(variant: str, order: int) -> Dict[str, Any]:
+    from TP2.b_arbre_disque import max_order
+    byte_keys = variant == "diskbytes"
+    # petites pages (plusieurs niveaux dès quelques centaines de clés), agrandies si l'ordre l'exige
+    page_size = 256
+    while max_order(page_size, byte_keys) < order:
+        page_size *= 2
+    options = {"page_size": page_size, "cache_pages": DISK_CACHE, "wal": True, "group_size": DISK_GROUP}
+    if byte_keys:
+        options.update(key_format="memcomparable", key=disk_key)
+    return options
+
+
+def _new_tree(variant: str, order: int, counted: bool, path: Optional[str] = None):
+    # arbre vide, ou fichier (ré)ouvert pour les variantes sur disque
+    cls = _tree_class(variant)
+    if variant in DISKS:
+        return cls(path, order, **_disk_options(variant, order))
+    if variant == "bplus":
+        return cls(order)
+    return cls(order, counted=counted)
+
+
+def _bulk_load(variant: str, data: Sequence, order: int, fill: float, counted: bool):
+    cls = _tree_class(variant)
+    if variant == "bplus":
+        return cls.bulk_load(data, order, fill)
+    return cls.bulk_load(data, order, fill, counted=counted)
+
+
+class FuzzFailure(AssertionError):
+    def __init__(self, variant: str, order: int, counted: bool, ops: List[Op], message: str):
+        super().__init__(message)
+        self.variant = variant
+        self.order = order
+        self.counted = counted
+        self.ops = ops
+        self.message = message
+
+    def script(self) -> str:
+        # reproduction minimale, copiable dans un terminal Python
+        module, cls = VARIANTS[self.variant]
+        counted = "" if self.variant in DISKS or self.variant == "bplus" else f", counted={self.counted}"
+        lines = [f"from TP2.{module} import {cls}"]
+        if self.variant in DISKS:
+            options = _disk_options(self.variant, self.order)
+            options.pop("key", None)
+            args = ", ".join(f"{k}={v!r}" for k, v in options.items())
+            if self.variant == "diskbytes":
+                args += ", key=disk_key"
+            lines += ["import os, tempfile",
+                      "from TP2.fuzz_arbre import disk_key, simulate_crash",
+                      "path = os.path.join(tempfile.mkdtemp(), 'fuzz.db')",
+                      f"ouvrir = lambda: {cls}(path, {self.order}, {args})",
+                      "t = ouvrir()"]
+        else:
+            lines.append(f"t = {cls}({self.order}{counted})")
+        if any(op[0] == "snapshot" for op in self.ops):
+            lines.append("s = []")
+        for op in self.ops:
+            name, args = op[0], op[1:]
+            if name == "bulk_load":
+                lines.append(f"t = {cls}.bulk_load({args[0]!r}, {self.order}, {args[1]!r}{counted})")
+            elif name in ("range", "items"):
+                lines.append(f"list(t.{name}({args[0]!r}, {args[1]!r}))")
+            elif name == "setitem":
+                lines.append(f"t[{args[0]!r}] = {args[1]!r}")
+            elif name == "pop":
+                lines.append(f"t.pop({args[0]!r}, None)")
+            elif name == "split_at":
+                lines.append(f"t = t.split_at({args[0]!r})[{int(args[1])}]")
+            elif name == "join":
+                lines.append("b = max(t, default=-1) + 1")
+                data = f"[(b + o, -(b + o)) for o in {args[0]!r}]" if self.variant in MAPS else \
+                    f"[b + o for o in {args[0]!r}]"
+                lines.append(f"t.join({cls}.bulk_load({data}, {self.order}, {args[1]!r}{counted}))")
+            elif name == "snapshot":
+                lines.append("s.append(t.snapshot())")
+            elif name == "release":
+                lines.append("s and s.pop(0)")
+            elif name == "checkpoint":
+                lines.append("t.flush()")
+            elif name == "reopen":
+                lines.append("t.close(); t = ouvrir()")
+            elif name == "crash":
+                lines.append("simulate_crash(t); t = ouvrir()")
+            else:
+                lines.append(f"t.{name}({', '.join(repr(a) for a in args)})")
+        lines.append("t.check_invariants()")
+        lines.append(f"# {self.message}")
+        return "\n".join(lines)
+
+
+# ============================================================
+# GÉNÉRATION
+# ============================================================
+def _kinds(variant: str, counted: bool) -> List[str]:
+    # opérations tirées, pondérées par répétition
+    if variant in MAPS:
+        kinds = ["setitem"] * 35 + ["pop"] * 30 + ["get"] * 12 + ["setdefault"] * 4 + ["items"] * 4
+    else:
+        kinds = ["insert"] * 35 + ["delete"] * 30 + ["search"] * 12
+    if variant in ("btree", "bstar"):
+        kinds += ["insert_many"] * 4 + ["delete_many"] * 4
+    if variant in ("btree", "bstar", "bplus"):
+        kinds += ["range"] * 4
+    if variant not in DISKS:
+        kinds += ["bulk_load"]
+    if variant in CUTS:
+        kinds += ["split_at"] * 2 + ["join"] * 2 + ["delete_range"] * 2
+    if variant == "btree":
+        kinds += ["snapshot"] * 2 + ["release"]
+    if variant in DISKS:
+        kinds += ["commit"] * 2 + ["checkpoint", "reopen"] + ["crash"] * 2
+    if counted:
+        kinds += ["rank"] * 3 + ["select"] * 3 + ["count_range"] * 2
+    return kinds
+
+
+def generate(rnd: random.Random, count: int, key_space: int, counted: bool = False,
+             variant: str = "btree") -> List[Op]:
+    ops: List[Op] = []
+    kinds = _kinds(variant, counted)
+    for _ in range(count):
+        kind = rnd.choice(kinds)
+        if kind in ("insert", "delete", "search", "rank", "get", "pop", "select"):
+            ops.append((kind, rnd.randrange(key_space)))
+        elif kind in ("setitem", "setdefault"):
+            ops.append((kind, rnd.randrange(key_space), rnd.randrange(1000)))
+        elif kind in ("insert_many", "delete_many"):
+            ops.append((kind, [rnd.randrange(key_space) for _ in range(rnd.randint(0, min(48, key_space)))]))
+        elif kind in ("range", "count_range", "items", "delete_range"):
+            lo, hi = sorted((rnd.randrange(key_space), rnd.randrange(key_space)))
+            ops.append((kind, lo, hi))
+        elif kind == "bulk_load":
+            keys = rnd.sample(range(key_space), rnd.randint(0, key_space))
+            if variant in MAPS:
+                keys = [(k, rnd.randrange(1000)) for k in keys]
+            ops.append((kind, keys, rnd.choice((1.0, 0.75, 0.5))))
+        elif kind == "split_at":
+            ops.append((kind, rnd.randrange(key_space), rnd.random() < 0.5))
+        elif kind == "join":
+            # décalages au-delà de la plus grande clé au moment du rejeu
+            offsets = sorted(rnd.sample(range(key_space), rnd.randint(0, min(48, key_space))))
+            ops.append((kind, offsets, rnd.choice((1.0, 0.75, 0.5))))
+        else:
+            ops.append((kind,))
+    return ops
+
+
+# ============================================================
+# REJEU CONTRE LE MODÈLE
+# ============================================================
+def _found(result) -> bool:
+    # bTree.search -> (nœud, i) | None ; BStarTree.search -> (nœud | None, i)
+    return result is not None and result[0] is not None
+
+
+def _expected_batch(model: List[int], batch: Sequence[int], present: bool) -> List[int]:
+    # clés renvoyées par insert_many (present=True) / delete_many (present=False)
+    out, seen = [], set()
+    for k in sorted(batch):
+        i = bisect.bisect_left(model, k)
+        inside = i < len(model) and model[i] == k
+        if k in seen or inside == present:
+            out.append(k)
+        seen.add(k)
+    return out
+
+
+def _check(variant: str, tree, model: List[int], values: Dict[int, int],
+           snaps: List[Tuple[Any, List[int]]]) -> Optional[str]:
+    count = tree.check_invariants()
+    if count != len(model):
+        return f"tree holds {count} keys, model {len(model)}"
+    expected = [disk_key(k) for k in model] if variant == "diskbytes" else model
+    if list(tree) != expected:
+        return "in-order traversal differs from the model"
+    if variant in MAPS:
+        if len(tree) != len(model):
+            return f"len() = {len(tree)}, model {len(model)}"
+        if list(tree.items()) != [(k, values[k]) for k in model]:
+            return "items() differs from the model"
+    for i, (snap, frozen) in enumerate(snaps):
+        if list(snap) != frozen:
+            return f"snapshot {i} no longer matches the state it was taken from"
+    return None
+
+
+def replay(variant: str, order: int, ops: Sequence[Op], counted: bool = False,
+           check_every: int = 1) -> Optional[Tuple[int, str]]:
+    """Rejoue `ops` ; renvoie (indice, message) à la première divergence, None sinon."""
+    workdir = tempfile.mkdtemp(prefix="fuzz_arbre_") if variant in DISKS else None
+    path = os.path.join(workdir, "fuzz.db") if workdir else None
+    tree = None
+    try:
+        tree = _new_tree(variant, order, counted, path)
+        model: List[int] = []
+        values: Dict[int, int] = {}                   # dictionnaires : valeur de chaque clé
+        snaps: List[Tuple[Any, List[int]]] = []       # (instantané, contenu figé)
+        durable: List[int] = []                       # disque : état du dernier lot synchronisé
+        syncs = tree.wal.syncs if variant in DISKS else 0
+        for n, op in enumerate(ops):
+            name = op[0]
+            try:
+                if name in ("insert", "delete", "setitem", "pop", "setdefault"):
+                    k = op[1]
+                    i = bisect.bisect_left(model, k)
+                    inside = i < len(model) and model[i] == k
+                    if name == "insert":
+                        tree.insert(k)
+                    elif name == "delete":
+                        tree.delete(k)
+                    elif name == "setitem":
+                        tree[k] = op[2]
+                        values[k] = op[2]
+                    elif name == "pop":
+                        got = tree.pop(k, None)
+                        if got != values.pop(k, None):
+                            return n, f"pop({k}) returned {got!r}"
+                    else:
+                        got = tree.setdefault(k, op[2])
+                        if got != values.setdefault(k, op[2]):
+                            return n, f"setdefault({k}) returned {got!r}"
+                    if name in ("delete", "pop"):
+                        if inside:
+                            model.pop(i)
+                    elif not inside:
+                        model.insert(i, k)
+                elif name in ("search", "get"):
+                    k = op[1]
+                    i = bisect.bisect_left(model, k)
+                    if name == "get":
+                        if tree.get(k) != values.get(k):
+                            return n, f"get({k}) = {tree.get(k)!r}, expected {values.get(k)!r}"
+                    elif _found(tree.search(k)) != (i < len(model) and model[i] == k):
+                        return n, f"search({k}) disagrees with the model"
+                elif name == "insert_many":
+                    got = sorted(tree.insert_many(op[1]))
+                    want = _expected_batch(model, op[1], True)
+                    model = sorted(set(model).union(op[1]))
+                    if got != want:
+                        return n, f"insert_many returned {got}, expected {want}"
+                elif name == "delete_many":
+                    got = sorted(tree.delete_many(op[1]))
+                    want = _expected_batch(model, op[1], False)
+                    model = sorted(set(model).difference(op[1]))
+                    if got != want:
+                        return n, f"delete_many returned {got}, expected {want}"
+                elif name in ("range", "items"):
+                    lo, hi = op[1], op[2]
+                    got = list(getattr(tree, name)(lo, hi))
+                    want = model[bisect.bisect_left(model, lo):bisect.bisect_right(model, hi)]
+                    if name == "items":
+                        want = [(k, values[k]) for k in want]
+                    if got != want:
+                        return n, f"{name}({lo}, {hi}) returned {got}, expected {want}"
+                elif name == "bulk_load":
+                    tree = _bulk_load(variant, op[1], order, op[2], counted)
+                    if variant in MAPS:
+                        values = dict(op[1])
+                        model = sorted(values)
+                    else:
+                        model = sorted(set(op[1]))
+                elif name == "split_at":
+                    k, keep_right = op[1], op[2]
+                    i = bisect.bisect_left(model, k)
+                    sides = tree.split_at(k)
+                    parts = (model[:i], model[i:])
+                    other = sides[not keep_right]
+                    if other.check_invariants() != len(parts[not keep_right]) or \
+                            list(other) != parts[not keep_right]:
+                        return n, f"split_at({k}) {'left' if keep_right else 'right'} side differs"
+                    tree, model = sides[keep_right], parts[keep_right]
+                    if variant in MAPS:
+                        values = {k: values[k] for k in model}
+                elif name == "join":
+                    base = model[-1] + 1 if model else 0
+                    keys = [base + o for o in op[1]]
+                    data = [(k, -k) for k in keys] if variant in MAPS else keys
+                    tree.join(_bulk_load(variant, data, order, op[2], counted))
+                    model += keys
+                    values.update(data if variant in MAPS else ())
+                elif name == "delete_range":
+                    lo, hi = op[1], op[2]
+                    tree.delete_range(lo, hi)
+                    doomed = model[bisect.bisect_left(model, lo):bisect.bisect_right(model, hi)]
+                    model = [k for k in model if not lo <= k <= hi]
+                    for k in doomed:
+                        values.pop(k, None)
+                elif name == "snapshot":
+                    snaps.append((tree.snapshot(), list(model)))
+                    del snaps[:-MAX_SNAPSHOTS]
+                elif name == "release":
+                    del snaps[:1]
+                elif name in ("commit", "checkpoint"):
+                    tree.commit() if name == "commit" else tree.flush()
+                    durable = list(model)
+                elif name in ("reopen", "crash"):
+                    if name == "reopen":
+                        tree.close()
+                    else:
+                        simulate_crash(tree)
+                        model = durable
+                    tree = _new_tree(variant, order, counted, path)
+                    durable = list(model)
+                    syncs = tree.wal.syncs
+                elif name == "rank":
+                    if tree.rank(op[1]) != bisect.bisect_left(model, op[1]):
+                        return n, f"rank({op[1]}) = {tree.rank(op[1])}, expected {bisect.bisect_left(model, op[1])}"
+                elif name == "select":
+                    if op[1] < len(model) and tree.select(op[1]) != model[op[1]]:
+                        return n, f"select({op[1]}) = {tree.select(op[1])}, expected {model[op[1]]}"
+                elif name == "count_range":
+                    want = bisect.bisect_right(model, op[2]) - bisect.bisect_left(model, op[1])
+                    if tree.count_range(op[1], op[2]) != want:
+                        return n, f"count_range({op[1]}, {op[2]}) != {want}"
+                if (n + 1) % check_every == 0 or n == len(ops) - 1:
+                    message = _check(variant, tree, model, values, snaps)
+                    if message is not None:
+                        return n, message
+                if variant in DISKS and tree.wal.syncs != syncs:
+                    # lot synchronisé (commit automatique ou checkpoint forcé par le cache)
+                    syncs = tree.wal.syncs
+                    durable = list(model)
+            except AssertionError as exc:
+                return n, f"{type(exc).__name__}: {exc}"
+            except Exception as exc:
+                return n, f"{name} raised {type(exc).__name__}: {exc}"
+        return None
+    finally:
+        if workdir is not None:
+            try:
+                tree.close()
+            except Exception:
+                pass                    # fichier déjà fermé (arrêt simulé) ou arbre corrompu
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+# ============================================================
+# RÉDUCTION (delta debugging)
+# ============================================================
+def shrink(fails: Callable[[List[Op]], bool], ops: List[Op]) -> List[Op]:
+    """Réduit une suite fautive : retrait de blocs (ddmin), puis allègement des lots."""
+    ops = list(ops)
+    chunks = 2
+    while len(ops) >= 2:
+        size = -(-len(ops) // chunks)
+        for start in range(0, len(ops), size):
+            candidate = ops[:start] + ops[start + size:]
+            if fails(candidate):
+                ops = candidate
+                chunks = max(chunks - 1, 2)
+                break
+        else:
+            if size == 1:
+                break
+            chunks = min(len(ops), chunks * 2)
+
+    # lots : garder la plus petite moitié qui échoue encore
+    for n, op in enumerate(ops):
+        if op[0] not in ("insert_many", "delete_many", "bulk_load", "join"):
+            continue
+        keys = list(op[1])
+        while len(keys) > 1:
+            for half in (keys[:len(keys) // 2], keys[len(keys) // 2:]):
+                candidate = ops[:n] + [(op[0], half) + tuple(op[2:])] + ops[n + 1:]
+                if fails(candidate):
+                    keys = half
+                    ops = candidate
+                    break
+            else:
+                break
+    return ops
+
+
+def fuzz_round(variant: str, order: int, seed: int, count: int = 2000, counted: bool = False,
+               check_every: int = 64) -> int:
+    """Un tour de `count` opérations ; lève FuzzFailure (suite réduite) en cas d'écart."""
+    rnd = random.Random(seed)
+    key_space = rnd.choice((8, 32, 4 * order * order, 2048))
+    ops = generate(rnd, count, key_space, counted, variant)
+    failure = replay(variant, order, ops, counted, check_every)
+    if failure is None:
+        return len(ops)
+    # tronquer juste après l'écart (la vérification périodique peut le détecter tard)
+    ops = ops[:failure[0] + 1]
+    minimal = shrink(lambda cand: replay(variant, order, cand, counted) is not None, ops)
+    message = replay(variant, order, minimal, counted)[1]
+    raise FuzzFailure(variant, order, counted, minimal, f"seed {seed}: {message}")
+
+
+def fuzz(variants: Sequence[str] = tuple(VARIANTS), orders: Sequence[int] = (3, 4, 5, 6, 7, 9),
+         seconds: float = 10.0, seed: int = 0, count: int = 2000, counted: Sequence[bool] = (False, True),
+         check_every: int = 64) -> int:
+    """Enchaîne des tours jusqu'à `seconds` ; renvoie le nombre d'opérations exécutées.
+
+    Le mode counted n'est essayé que pour les variantes qui l'offrent (COUNTED).
+    """
+    deadline = time.perf_counter() + seconds
+    total = 0
+    for n in range(1 << 62):
+        for variant in variants:
+            for order in orders:
+                for c in counted:
+                    if c and variant not in COUNTED:
+                        continue
+                    total += fuzz_round(variant, order, seed * 1_000_003 + n, count, c, check_every)
+        if time.perf_counter() >= deadline:
+            return total
+    return total
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Fuzzer différentiel des arbres de TP2")
+    parser.add_argument("--variants", nargs="+", choices=list(VARIANTS), default=list(VARIANTS))
+    parser.add_argument("--orders", nargs="+", type=int, default=[3, 4, 5, 6, 7, 9])
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--ops", type=int, default=2000, help="opérations par tour")
+    parser.add_argument("--check-every", type=int, default=64)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        total = fuzz(args.variants, args.orders, args.seconds, args.seed, args.ops,
+                     check_every=args.check_every)
+    except FuzzFailure as failure:
+        print(f"ÉCHEC {failure.variant} ordre {failure.order} : {failure.message}")
+        print(f"suite réduite à {len(failure.ops)} opérations :\n")
+        print(failure.script())
+        raise SystemExit(1)
+    elapsed = time.perf_counter() - start
+    print(f"{total} opérations sans écart en {elapsed:.1f}s ({total / elapsed * 60:,.0f} ops/min)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Générateurs de clés partagés par les bancs d'essai de TP2.
+
+Les clés chargées sont les entiers pairs de [0, 2n) : les clés impaires sont
+des absences garanties.
+"""
+from typing import List, Optional, Sequence
+import itertools
+import random
+
+DISTRIBUTIONS = ("sequential", "random", "zipf", "adversarial")
+
+
+# ============================================================
+# DISTRIBUTIONS DE CLÉS
+# ============================================================
+class ZipfGenerator:
+    """Tirage zipfien en O(1) (Gray et al., « Quickly generating billion-record synthetic databases »).
+
+    Renvoie des rangs dans [0, n) : le rang 0 est le plus fréquent. theta dans
+    (0, 1) ; le calcul de zeta(n) est en O(n), une seule fois.
+    """
+
+    def __init__(self, n: int, theta: float = 0.99, rnd: Optional[random.Random] = None):
+        if not 0 < theta < 1:
+            raise ValueError("theta must be in (0, 1)")
+        self.n = n
+        self.theta = theta
+        self.rnd = rnd or random.Random()
+        self.zetan = sum(1.0 / i ** theta for i in range(1, n + 1))
+        self.half = 0.5 ** theta
+        self.alpha = 1.0 / (1.0 - theta)
+        zeta2 = 1.0 + self.half
+        self.eta = (1.0 - (2.0 / n) ** (1.0 - theta)) / (1.0 - zeta2 / self.zetan) if n > 2 else 0.0
+
+    def next(self) -> int:
+        u = self.rnd.random()
+        uz = u * self.zetan
+        if uz < 1.0:
+            return 0
+        if uz < 1.0 + self.half:
+            return 1
+        return min(self.n - 1, int(self.n * (self.eta * u - self.eta + 1.0) ** self.alpha))
+
+    def scrambled(self, count: int) -> List[int]:
+        # rangs dispersés sur [0, n) pour que les clés chaudes ne soient pas contiguës
+        n = self.n
+        return [(self.next() * 2654435761) % n for _ in range(count)]
+
+
+def zipf_keys(rnd: random.Random, space: int, skew: float, count: int) -> List[int]:
+    # skew = 0 : uniforme ; sinon tirage zipfien dispersé de paramètre skew
+    if skew <= 0:
+        return [rnd.randrange(space) for _ in range(count)]
+    return ZipfGenerator(space, skew, rnd).scrambled(count)
+
+
+def load_order(dist: str, n: int, rnd: random.Random) -> List[int]:
+    """Permutation des n clés chargées (2*i) dans l'ordre d'arrivée de la distribution."""
+    if dist == "sequential":
+        ranks: Sequence[int] = range(n)
+    elif dist == "random":
+        ranks = list(range(n))
+        rnd.shuffle(ranks)
+    elif dist == "zipf":
+        # première apparition dans un flux zipfien, puis les clés jamais tirées
+        seen = dict.fromkeys(zipf_keys(rnd, n, 0.99, n))
+        rest = [r for r in range(n) if r not in seen]
+        rnd.shuffle(rest)
+        ranks = list(seen) + rest
+    elif dist == "adversarial":
+        # zigzag extrémités -> centre : ni ajout en fin, ni localité entre deux opérations
+        ranks = [r for pair in itertools.zip_longest(range(n // 2), range(n - 1, n // 2 - 1, -1))
+                 for r in pair if r is not None]
+    else:
+        raise ValueError(f"unknown distribution {dist!r}")
+    return [2 * r for r in ranks]
+
+
+def probes(dist: str, n: int, count: int, rnd: random.Random) -> List[int]:
+    """Clés cherchées : présentes (paires) sauf en adversarial, où une sur deux manque."""
+    if dist == "sequential":
+        return [2 * (i % n) for i in range(count)]
+    if dist == "random":
+        return [2 * rnd.randrange(n) for _ in range(count)]
+    if dist == "zipf":
+        return [2 * r for r in zipf_keys(rnd, n, 0.99, count)]
+    if dist == "adversarial":
+        # absences aux extrémités opposées : descente complète, aucune localité
+        return [2 * (i // 2) + 1 if i % 2 == 0 else 2 * (n - 1 - i // 2) - 1
+                for i in range(count)]
+    raise ValueError(f"unknown distribution {dist!r}")
@@ -0,0 +1,111 @@
+from typing import Iterator, List, Tuple
+import os
+import struct
+import zlib
+
+
+# ============================================================
+# JOURNAL D'ÉCRITURE ANTICIPÉE (WAL)
+# ============================================================
+# enregistrement : crc32 (I) | longueur (I) | type (B) | données
+RECORD = struct.Struct("<IIB")
+KEY = struct.Struct("<q")
+PAGE_ID = struct.Struct("<I")
+
+INSERT = 1
+DELETE = 2
+PAGE = 3
+CHECKPOINT = 4
+
+
+class WriteAheadLog:
+    """Journal append-only : opérations logiques et images de pages.
+
+    Les enregistrements sont accumulés en mémoire et écrits avec un seul
+    fsync par lot (group commit) : commit() est appelé automatiquement toutes
+    les `group_size` opérations. Un enregistrement tronqué ou corrompu en fin
+    de fichier (arrêt brutal) est ignoré à la relecture. Avec byte_keys=True,
+    la clé d'une opération est journalisée telle quelle (octets memcomparable)
+    au lieu d'un int64.
+    """
+
+    def __init__(self, path: str, group_size: int = 256, byte_keys: bool = False):
+        if group_size < 1:
+            raise ValueError("group_size must be >= 1")
+        self.path = path
+        self.byte_keys = byte_keys
+        self.group_size = group_size
+        self._file = open(path, "a+b")
+        self._buffer = bytearray()
+        self._pending_ops = 0
+        self.size = os.path.getsize(path)
+        self.syncs = 0
+
+    def _append(self, typ: int, payload: bytes):
+        body = bytes((typ,)) + payload
+        self._buffer += RECORD.pack(zlib.crc32(body), len(payload), typ) + payload
+
+    # ---------------- opérations logiques ----------------
+    def log_op(self, typ: int, key):
+        self._append(typ, key if self.byte_keys else KEY.pack(key))
+        self._pending_ops += 1
+        if self._pending_ops >= self.group_size:
+            self.commit()
+
+    # ---------------- checkpoint ----------------
+    def log_page(self, page_id: int, image: bytes):
+        self._append(PAGE, PAGE_ID.pack(page_id) + image)
+
+    def log_checkpoint(self, header: bytes):
+        self._append(CHECKPOINT, header)
+        self.commit()
+
+    def commit(self):
+        # un seul write + fsync pour tout le lot en attente
+        if not self._buffer:
+            return
+        self._file.write(self._buffer)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.size += len(self._buffer)
+        self.syncs += 1
+        self._buffer.clear()
+        self._pending_ops = 0
+
+    def truncate(self):
+        self._file.truncate(0)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.size = 0
+
+    # ---------------- relecture ----------------
+    def records(self) -> Iterator[Tuple[int, bytes]]:
+        self._file.seek(0)
+        data = self._file.read()
+        self._file.seek(0, os.SEEK_END)
+        off = 0
+        while off + RECORD.size <= len(data):
+            crc, length, typ = RECORD.unpack_from(data, off)
+            payload = data[off + RECORD.size:off + RECORD.size + length]
+            if len(payload) < length or zlib.crc32(bytes((typ,)) + payload) != crc:
+                return
+            yield typ, payload
+            off += RECORD.size + length
+
+    def recovery_plan(self) -> Tuple[List[Tuple[int, bytes]], bytes, List[Tuple[int, object]]]:
+        """Découpe le journal en (images du dernier checkpoint, en-tête, opérations à rejouer)."""
+        records = list(self.records())
+        last = max((i for i, (typ, _) in enumerate(records) if typ == CHECKPOINT), default=-1)
+        pages, header = [], b""
+        if last >= 0:
+            header = records[last][1]
+            for typ, payload in records[:last]:
+                if typ == PAGE:
+                    pages.append((PAGE_ID.unpack_from(payload)[0], payload[PAGE_ID.size:]))
+        ops = [(typ, payload if self.byte_keys else KEY.unpack(payload)[0])
+               for typ, payload in records[last + 1:] if typ in (INSERT, DELETE)]
+        return pages, header, ops
+
+    def close(self):
+        self.commit()
+        self._file.close()
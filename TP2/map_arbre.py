@@ -0,0 +1,193 @@
+from collections.abc import Mapping
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+from TP2.b_arbre import bTree
+from TP2.b_arbre_star import BStarTree
+from TP2.outils_arbre import MISSING, Key, KeyFunc, iter_items
+
+
+# ============================================================
+# DICTIONNAIRES ORDONNÉS SUR ARBRES B / B*
+# ============================================================
+class _OrderedMap:
+    """API de dictionnaire ordonné, partagée par BTreeMap et BStarMap.
+
+    Chaque nœud porte `values`, liste parallèle à `keys` : la recherche
+    dichotomique ne lit que les clés et la valeur est prise au même indice.
+    L'arbre sous-jacent fournit _put (insère ou renvoie la position d'une clé
+    existante) et _delete_key (renvoie la valeur retirée ou MISSING) ; les
+    restructurations déplacent les valeurs avec leurs clés. Un compte à None
+    (après split_at ou delete_range) est recalculé par len(), à la demande.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._count: Optional[int] = 0
+
+    def _adjust(self, delta: int):
+        if self._count is not None:
+            self._count += delta
+
+    def _new_node(self, leaf: bool, keys: Iterable[Key] = ()):
+        node = super()._new_node(leaf, keys)
+        node.values = [None] * len(node.keys)
+        return node
+
+    @classmethod
+    def bulk_load(cls, items: Any, order: int = 7, fill_factor: float = 1.0,
+                  int_keys: bool = False, counted: bool = False, key: Optional[KeyFunc] = None):
+        # items : mapping ou paires (clé, valeur) ; pour une clé répétée, la dernière valeur l'emporte
+        pairs = items.items() if isinstance(items, Mapping) else items
+        data = {k if key is None else key(k): v for k, v in pairs}
+        tree = super().bulk_load(data, order, fill_factor, int_keys, counted)
+        tree.key = key
+        stack = [tree.root]
+        while stack:
+            node = stack.pop()
+            node.values = [data[k] for k in node.keys]
+            stack.extend(node.children)
+        tree._count = len(data)
+        return tree
+
+    def _find(self, key: Any) -> Optional[Tuple[Any, int]]:
+        hit = self.search(key)
+        return None if hit is None or hit[0] is None else hit
+
+    # ============================================================
+    # LECTURE
+    # ============================================================
+    def __len__(self) -> int:
+        if self._count is None:
+            self._count = sum(1 for _ in self)
+        return self._count
+
+    def __contains__(self, key: Any) -> bool:
+        return self._find(key) is not None
+
+    def __getitem__(self, key: Any) -> Any:
+        hit = self._find(key)
+        if hit is None:
+            raise KeyError(key)
+        node, i = hit
+        return node.values[i]
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        hit = self._find(key)
+        if hit is None:
+            return default
+        node, i = hit
+        return node.values[i]
+
+    def items(self, lo: Optional[Any] = None, hi: Optional[Any] = None) -> Iterator[Tuple[Key, Any]]:
+        # paires (clé, valeur) de [lo, hi] (bornes incluses, None = non bornée)
+        return iter_items(self.root, None if lo is None else self._key(lo),
+                          None if hi is None else self._key(hi))
+
+    def keys(self, lo: Optional[Any] = None, hi: Optional[Any] = None) -> Iterator[Key]:
+        return self.range(lo, hi)
+
+    def values(self, lo: Optional[Any] = None, hi: Optional[Any] = None) -> Iterator[Any]:
+        return (v for _, v in self.items(lo, hi))
+
+    # ============================================================
+    # ÉCRITURE (une seule descente par opération)
+    # ============================================================
+    def upsert(self, key: Any, value: Any) -> bool:
+        # insère ou remplace ; renvoie True si la clé était absente
+        found = self._put(self._key(key), value)
+        if found is None:
+            self._adjust(1)
+            return True
+        node, i = found
+        node.values[i] = value
+        return False
+
+    def __setitem__(self, key: Any, value: Any):
+        self.upsert(key, value)
+
+    def setdefault(self, key: Any, default: Any = None) -> Any:
+        found = self._put(self._key(key), default)
+        if found is None:
+            self._adjust(1)
+            return default
+        node, i = found
+        return node.values[i]
+
+    def pop(self, key: Any, default: Any = MISSING) -> Any:
+        value = self._delete_key(self._key(key))
+        if value is MISSING:
+            if default is MISSING:
+                raise KeyError(key)
+            return default
+        self._adjust(-1)
+        return value
+
+    def __delitem__(self, key: Any):
+        self.pop(key)
+
+    def update(self, items: Any):
+        pairs = items.items() if isinstance(items, Mapping) else items
+        for k, v in pairs:
+            self.upsert(k, v)
+
+    # les opérations d'ensemble héritées gardent le compteur à jour (valeur None)
+    def insert(self, key: Any):
+        self.setdefault(key)
+
+    def delete(self, key: Any):
+        self.pop(key, None)
+
+    def insert_many(self, keys: Iterable[Any]) -> List[Key]:
+        # clé par clé : les lots de l'arbre ne déplacent pas les valeurs
+        duplicates = []
+        for k in sorted(self._keys(keys)):
+            if self._put(k) is None:
+                self._adjust(1)
+            else:
+                duplicates.append(k)
+        return duplicates
+
+    def delete_many(self, keys: Iterable[Any]) -> List[Key]:
+        missing = []
+        for k in sorted(self._keys(keys)):
+            if self._delete_key(k) is MISSING:
+                missing.append(k)
+            else:
+                self._adjust(-1)
+        return missing
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self.items())!r})"
+
+
+class BTreeMap(_OrderedMap, bTree):
+    """Dictionnaire ordonné sur bTree (instantanés, mode counted et key= compris)."""
+
+    # coupe et recollage : les sous-arbres passent tels quels, valeurs comprises
+    def split_at(self, key: Any) -> Tuple['BTreeMap', 'BTreeMap']:
+        left, right = super().split_at(key)
+        left._count = right._count = None
+        self._count = 0
+        return left, right
+
+    def join(self, other: 'BTreeMap'):
+        count = None if self._count is None or other._count is None else self._count + other._count
+        super().join(other)
+        self._count = count
+        other._count = 0
+
+    def delete_range(self, lo: Any, hi: Any):
+        super().delete_range(lo, hi)
+        self._count = None
+
+
+class BStarMap(_OrderedMap, BStarTree):
+    """Dictionnaire ordonné sur BStarTree."""
+
+
+if __name__ == "__main__":
+    m = BTreeMap(order=5)
+    for tenant, ts, event in [("acme", 3, "login"), ("globex", 1, "boot"), ("acme", 1, "signup")]:
+        m[(tenant, ts)] = event
+    print(list(m.items(("acme", 0), ("acme", 99))))
+    print(m.setdefault(("acme", 3), "?"), m.pop(("globex", 1)), len(m))
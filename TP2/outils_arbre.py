@@ -0,0 +1,469 @@
+from array import array
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+import bisect
+import itertools
+import sys
+
+
+# ============================================================
+# OUTILS COMMUNS AUX ARBRES DE TP2
+# ============================================================
+# clé d'arbre : toute valeur totalement ordonnée (int, str, bytes, tuple
+# (locataire, horodatage)...) ; KeyFunc la dérive d'une valeur quelconque
+Key = Any
+KeyFunc = Callable[[Any], Key]
+
+
+class _Missing:
+    # valeur absente (distincte de None, qui est une valeur stockable)
+    __slots__ = ()
+
+    def __repr__(self):
+        return "MISSING"
+
+
+MISSING = _Missing()
+
+_NODE_IDS = itertools.count(1)
+
+
+def next_node_id() -> str:
+    # identifiant court, attribué seulement quand la visualisation le demande
+    return f"{next(_NODE_IDS):08x}"
+
+
+def new_keys(int_keys: bool, keys: Iterable[Key] = ()) -> Sequence[Key]:
+    # stockage compact array('q') pour les clés entières, liste sinon
+    return array('q', keys) if int_keys else list(keys)
+
+
+def sorted_unique(iterable: Iterable[Key]) -> List[Key]:
+    # tri unique (O(N) si l'entrée est déjà triée) puis dédoublonnage linéaire
+    data = sorted(iterable)
+    if not data:
+        return data
+    out = [data[0]]
+    for k in data:
+        if k != out[-1]:
+            out.append(k)
+    return out
+
+
+def _can_pack(slots: int, lo: int, hi: int, memo: dict, root_hi: int) -> bool:
+    # un niveau de `slots` sous-arbres peut-il être coiffé par des niveaux valides ?
+    if slots <= root_hi + 1:
+        return True
+    if slots not in memo:
+        memo[slots] = any(_can_pack(k, lo, hi, memo, root_hi)
+                          for k in range(-(-slots // (hi + 1)), slots // (lo + 1) + 1))
+    return memo[slots]
+
+
+def pack_sizes(count: int, target: int, lo: int, hi: int, root_hi: Optional[int] = None) -> List[int]:
+    """Répartit `count` clés en nœuds séparés par une clé montante.
+
+    Renvoie les tailles des nœuds : sum(tailles) + len(tailles) - 1 == count.
+    Chaque taille est dans [lo, hi] et le nombre de nœuds est choisi pour que
+    les niveaux supérieurs restent eux aussi dans [lo, hi] (la racine peut
+    aller jusqu'à root_hi, par défaut hi). Quand c'est arithmétiquement
+    impossible, on garde <= hi avec des nœuds équilibrés.
+    """
+    root_hi = hi if root_hi is None else root_hi
+    if count <= root_hi:
+        return [count]
+    slots = count + 1
+    k_min = -(-slots // (hi + 1))
+    k_max = slots // (lo + 1)
+    k = min(max(-(-slots // (target + 1)), k_min), max(k_max, k_min))
+    memo: dict = {}
+    for step in range(k_max - k_min + 1):
+        for cand in (k + step, k - step) if step else (k,):
+            if k_min <= cand <= k_max and _can_pack(cand, lo, hi, memo, root_hi):
+                k = cand
+                break
+        else:
+            continue
+        break
+    q, r = divmod(slots, k)
+    return [q - 1 + (1 if j < r else 0) for j in range(k)]
+
+
+def build_bottom_up(data: Sequence[Key], target: int, lo: int, hi: int,
+                    new_node: Callable[[bool, list, list], object],
+                    root_hi: Optional[int] = None) -> Optional[object]:
+    # construit les feuilles puis chaque niveau interne à partir des séparateurs
+    if not data:
+        return None
+    level, seps = [], []
+    pos = 0
+    sizes = pack_sizes(len(data), target, lo, hi, root_hi)
+    for j, size in enumerate(sizes):
+        level.append(new_node(True, list(data[pos:pos + size]), []))
+        pos += size
+        if j < len(sizes) - 1:
+            seps.append(data[pos])
+            pos += 1
+
+    while len(level) > 1:
+        parents, up = [], []
+        pos = child = 0
+        sizes = pack_sizes(len(seps), target, lo, hi, root_hi)
+        for j, size in enumerate(sizes):
+            parents.append(new_node(False, seps[pos:pos + size], level[child:child + size + 1]))
+            pos += size
+            child += size + 1
+            if j < len(sizes) - 1:
+                up.append(seps[pos])
+                pos += 1
+        level, seps = parents, up
+    return level[0]
+
+
+def fill_target(fill_factor: float, lo: int, hi: int) -> int:
+    if not 0 < fill_factor <= 1:
+        raise ValueError("fill_factor must be in (0, 1]")
+    return max(lo, min(hi, round(fill_factor * hi)))
+
+
+def memory_report(root) -> Dict[str, float]:
+    # parcours itératif : taille des nœuds, des conteneurs et des clés
+    nodes = keys = node_bytes = key_bytes = 0
+    stack = [root] if root is not None else []
+    while stack:
+        node = stack.pop()
+        nodes += 1
+        keys += len(node.keys)
+        node_bytes += sys.getsizeof(node) + sys.getsizeof(node.children)
+        key_bytes += sys.getsizeof(node.keys)
+        if not isinstance(node.keys, array):
+            key_bytes += sum(sys.getsizeof(k) for k in node.keys)
+        stack.extend(node.children)
+    total = node_bytes + key_bytes
+    return {
+        "nodes": nodes,
+        "keys": keys,
+        "node_bytes": node_bytes,
+        "key_bytes": key_bytes,
+        "total_bytes": total,
+        "bytes_per_key": total / keys if keys else 0.0,
+    }
+
+
+# ============================================================
+# PARCOURS ORDONNÉ : CURSEUR ET GÉNÉRATEURS
+# ============================================================
+class Cursor:
+    """Curseur positionné entre deux clés, parcours par pile (pas de récursion).
+
+    seek(k) place le curseur juste avant la première clé >= k ; next() et
+    prev() renvoient la clé franchie, ou None aux extrémités ; next_entry()
+    et prev_entry() renvoient sa position (nœud, indice). Le curseur
+    n'est plus valide après une modification de l'arbre : reprendre une
+    pagination par seek() sur la dernière clé lue.
+    """
+
+    __slots__ = ("_root", "_path")
+
+    def __init__(self, root):
+        self._root = root
+        self._path: List[list] = []
+        self.seek_first()
+
+    def _descend(self, node, last: bool):
+        # empile le chemin jusqu'à la feuille la plus à gauche (ou à droite)
+        while not node.leaf:
+            i = len(node.children) - 1 if last else 0
+            self._path.append([node, i])
+            node = node.children[i]
+        self._path.append([node, len(node.keys) if last else 0])
+
+    def seek_first(self) -> 'Cursor':
+        self._path = []
+        if self._root is not None:
+            self._descend(self._root, last=False)
+        return self
+
+    def seek_last(self) -> 'Cursor':
+        self._path = []
+        if self._root is not None:
+            self._descend(self._root, last=True)
+        return self
+
+    def seek(self, key) -> 'Cursor':
+        self._path = []
+        node = self._root
+        if node is None:
+            return self
+        while not node.leaf:
+            i = bisect.bisect_left(node.keys, key)
+            self._path.append([node, i])
+            if i < len(node.keys) and node.keys[i] == key:
+                # juste avant la clé interne = fin de la feuille la plus à droite du fils i
+                self._descend(node.children[i], last=True)
+                return self
+            node = node.children[i]
+        self._path.append([node, bisect.bisect_left(node.keys, key)])
+        return self
+
+    def next_entry(self) -> Optional[tuple]:
+        path = self._path
+        if not path:
+            return None
+        leaf, i = path[-1]
+        if i < len(leaf.keys):
+            path[-1][1] = i + 1
+            return leaf, i
+        # remonter jusqu'au premier ancêtre ayant une clé à droite
+        depth = len(path) - 2
+        while depth >= 0 and path[depth][1] >= len(path[depth][0].keys):
+            depth -= 1
+        if depth < 0:
+            return None
+        node, c = path[depth]
+        del path[depth + 1:]
+        path[depth][1] = c + 1
+        self._descend(node.children[c + 1], last=False)
+        return node, c
+
+    def prev_entry(self) -> Optional[tuple]:
+        path = self._path
+        if not path:
+            return None
+        leaf, i = path[-1]
+        if i > 0:
+            path[-1][1] = i - 1
+            return leaf, i - 1
+        depth = len(path) - 2
+        while depth >= 0 and path[depth][1] == 0:
+            depth -= 1
+        if depth < 0:
+            return None
+        node, c = path[depth]
+        del path[depth + 1:]
+        path[depth][1] = c - 1
+        self._descend(node.children[c - 1], last=True)
+        return node, c - 1
+
+    def next(self):
+        entry = self.next_entry()
+        return None if entry is None else entry[0].keys[entry[1]]
+
+    def prev(self):
+        entry = self.prev_entry()
+        return None if entry is None else entry[0].keys[entry[1]]
+
+    def __iter__(self) -> 'Cursor':
+        return self
+
+    def __next__(self):
+        key = self.next()
+        if key is None:
+            raise StopIteration
+        return key
+
+
+def iter_range(root, lo=None, hi=None) -> Iterator:
+    # O(log N + K) : une seule descente, puis avancée paresseuse
+    cur = Cursor(root)
+    if lo is not None:
+        cur.seek(lo)
+    while True:
+        key = cur.next()
+        if key is None or (hi is not None and key > hi):
+            return
+        yield key
+
+
+def iter_items(root, lo=None, hi=None) -> Iterator[tuple]:
+    # paires (clé, valeur) de [lo, hi] pour les nœuds à valeurs parallèles
+    cur = Cursor(root)
+    if lo is not None:
+        cur.seek(lo)
+    while True:
+        entry = cur.next_entry()
+        if entry is None:
+            return
+        node, i = entry
+        key = node.keys[i]
+        if hi is not None and key > hi:
+            return
+        yield key, node.values[i]
+
+
+def iter_reversed(root) -> Iterator:
+    cur = Cursor(root).seek_last()
+    while True:
+        key = cur.prev()
+        if key is None:
+            return
+        yield key
+
+
+# ============================================================
+# OPÉRATIONS PAR LOTS : UNE SEULE VISITE PAR NŒUD ET PAR LOT
+# ============================================================
+def partition_run(seps: Sequence, batch: Sequence, i: int, j: int) -> tuple:
+    """Répartit batch[i:j] (trié) entre les fils d'un nœud interne de séparateurs `seps`.
+
+    Renvoie ([(indice du fils, début, fin)], clés égales à un séparateur).
+    Coût O(groupes · (log order + log lot)) : chaque nœud n'est visité qu'une
+    fois par lot.
+    """
+    groups, found = [], []
+    while i < j:
+        c = bisect.bisect_left(seps, batch[i])
+        if c < len(seps) and seps[c] == batch[i]:
+            found.append(batch[i])
+            i += 1
+            continue
+        end = j if c == len(seps) else bisect.bisect_left(batch, seps[c], i, j)
+        groups.append((c, i, end))
+        i = end
+    return groups, found
+
+
+def merge_run(keys, run: Sequence) -> List:
+    """Insère une série triée dans les clés d'une feuille (en place) ; renvoie les doublons.
+
+    Série courte : insertions par dichotomie (décalages en C). Série plus
+    longue que la feuille : une seule fusion triée.
+    """
+    duplicates = []
+    if len(run) <= len(keys):
+        j = 0
+        for k in run:
+            j = bisect.bisect_left(keys, k, j)
+            if j < len(keys) and keys[j] == k:
+                duplicates.append(k)
+            else:
+                keys.insert(j, k)
+        return duplicates
+    merged = sorted(itertools.chain(keys, run))
+    out = merged[:1]
+    for k in itertools.islice(merged, 1, None):
+        if k == out[-1]:
+            duplicates.append(k)
+        else:
+            out.append(k)
+    del keys[:]
+    keys.extend(out)
+    return duplicates
+
+
+def split_run(keys: Sequence, run: Sequence) -> tuple:
+    # sépare une série triée en (clés présentes dans la feuille, clés absentes)
+    present, missing = [], []
+    for k in run:
+        i = bisect.bisect_left(keys, k)
+        if i < len(keys) and keys[i] == k and not (present and present[-1] == k):
+            present.append(k)
+        else:
+            missing.append(k)
+    return present, missing
+
+
+# ============================================================
+# STATISTIQUES D'ORDRE (compteur de taille des sous-arbres)
+# ============================================================
+def subtree_size(node) -> int:
+    # taille recalculée à partir des fils, supposés à jour
+    return len(node.keys) + sum(c.size for c in node.children)
+
+
+def rank(root, key, inclusive: bool = False) -> int:
+    # nombre de clés < key (<= key si inclusive) : O(log N · order)
+    r = 0
+    node = root
+    while node is not None:
+        i = (bisect.bisect_right if inclusive else bisect.bisect_left)(node.keys, key)
+        r += i
+        if node.leaf:
+            return r
+        for c in node.children[:i]:
+            r += c.size
+        node = node.children[i]
+    return r
+
+
+def select(root, k: int):
+    # k-ième plus petite clé (à partir de 0)
+    if root is None or not 0 <= k < root.size:
+        raise IndexError("select index out of range")
+    node = root
+    while not node.leaf:
+        for i, c in enumerate(node.children):
+            if k < c.size:
+                node = c
+                break
+            k -= c.size
+            if k == 0:
+                return node.keys[i]
+            k -= 1
+    return node.keys[k]
+
+
+# ============================================================
+# INVARIANTS STRUCTURELS
+# ============================================================
+class InvariantError(AssertionError):
+    pass
+
+
+def check_invariants(root, lo: int, hi: int, root_hi: Optional[int] = None,
+                     parents: bool = False, counted: bool = False) -> int:
+    """Vérifie un arbre B (ou B*) ; renvoie le nombre de clés, lève InvariantError sinon.
+
+    Contrôles : clés strictement croissantes et comprises entre les séparateurs
+    des ancêtres, lo <= clés <= hi hors racine (racine : <= root_hi, au moins
+    une clé si interne), len(children) == len(keys) + 1, autant de valeurs
+    que de clés (nœuds de map), feuilles à la même profondeur, pointeurs parent (parents=True) et tailles de sous-arbres
+    (counted=True). Parcours itératif : pas de limite de récursion.
+    """
+    if root is None:
+        return 0
+    root_hi = hi if root_hi is None else root_hi
+    leaf_depth = None
+    total = 0
+    order: List = []
+    stack = [(root, 0, None, None, None)]
+    while stack:
+        node, depth, low, high, parent = stack.pop()
+        order.append(node)
+        keys, n = node.keys, len(node.keys)
+        total += n
+        where = f"node {list(keys)[:8]} at depth {depth}"
+        if node is root:
+            if n > root_hi:
+                raise InvariantError(f"root has {n} keys > {root_hi}")
+            if not node.leaf and n == 0:
+                raise InvariantError("internal root without keys")
+        elif not lo <= n <= hi:
+            raise InvariantError(f"{where}: {n} keys outside [{lo}, {hi}]")
+        for a, b in zip(keys, itertools.islice(keys, 1, None)):
+            if not a < b:
+                raise InvariantError(f"{where}: keys not strictly increasing ({a!r}, {b!r})")
+        if n and ((low is not None and not keys[0] > low) or (high is not None and not keys[-1] < high)):
+            raise InvariantError(f"{where}: keys outside separator bounds ({low!r}, {high!r})")
+        if parents and getattr(node, "parent", None) is not parent:
+            raise InvariantError(f"{where}: wrong parent pointer")
+        values = getattr(node, "values", None)
+        if values is not None and len(values) != n:
+            raise InvariantError(f"{where}: {len(values)} values for {n} keys")
+        if node.leaf:
+            if node.children:
+                raise InvariantError(f"{where}: leaf with children")
+            if leaf_depth is None:
+                leaf_depth = depth
+            elif depth != leaf_depth:
+                raise InvariantError(f"{where}: leaf depth {depth} != {leaf_depth}")
+            continue
+        if len(node.children) != n + 1:
+            raise InvariantError(f"{where}: {len(node.children)} children for {n} keys")
+        for i, c in enumerate(node.children):
+            stack.append((c, depth + 1, keys[i - 1] if i else low, keys[i] if i < n else high, node))
+
+    if counted:
+        for node in reversed(order):
+            if node.size != subtree_size(node):
+                raise InvariantError(f"node {list(node.keys)[:8]}: size {node.size} != {subtree_size(node)}")
+    return total
@@ -0,0 +1,73 @@
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# ============================================================
+# TRAÇAGE STRUCTURÉ DES OPÉRATIONS D'ARBRE
+# ============================================================
+# Événements émis par BStarTree (champs entre parenthèses) :
+#   insert / delete / insert_many / delete_many : début d'opération (key | count)
+#   descend          : passage d'un nœud à son fils (node, keys, child)
+#   split            : éclatement binaire (node, keys, new, new_keys)
+#   three_way_split  : deux nœuds -> trois (parent, nodes, keys)
+#   redistribute     : rotation d'une clé entre frères (parent, left, right, left_keys, right_keys)
+#   merge            : fusion de deux frères (parent, node, keys)
+#   underflow_fix    : réparation d'un nœud sous kmin (parent, child, keys)
+OPERATIONS = ("insert", "delete", "insert_many", "delete_many")
+
+
+class TraceSink:
+    """Récepteur d'événements ; l'implémentation de base ignore tout."""
+
+    def event(self, kind: str, **fields: Any):
+        pass
+
+
+class RecordingSink(TraceSink):
+    # conserve les événements, pour les tests et la visualisation pas à pas
+    def __init__(self, limit: Optional[int] = None):
+        self.events: List[Tuple[str, Dict[str, Any]]] = []
+        self.limit = limit
+
+    def event(self, kind: str, **fields: Any):
+        if self.limit is None or len(self.events) < self.limit:
+            self.events.append((kind, fields))
+
+
+class PrintSink(TraceSink):
+    # équivalent des anciens print() de débogage
+    def event(self, kind: str, **fields: Any):
+        if kind in OPERATIONS:
+            print(f"\n=== {kind.upper()} {fields.get('key', fields.get('count'))} ===")
+        else:
+            print(f"  {kind}: " + ", ".join(f"{k}={v}" for k, v in fields.items()))
+
+
+class CounterSink(TraceSink):
+    """Agrège le coût par opération : nombre d'événements de chaque type par insert/delete."""
+
+    def __init__(self):
+        self.ops: Counter = Counter()
+        self.by_op: Dict[str, Counter] = {op: Counter() for op in OPERATIONS}
+        self._current: Optional[str] = None
+
+    def event(self, kind: str, **fields: Any):
+        if kind in OPERATIONS:
+            self.ops[kind] += 1
+            self._current = kind
+        elif self._current is not None:
+            self.by_op[self._current][kind] += 1
+
+    def totals(self) -> Counter:
+        out: Counter = Counter()
+        for counts in self.by_op.values():
+            out.update(counts)
+        return out
+
+    def per_op(self, op: str) -> Dict[str, float]:
+        # moyenne de chaque événement par opération du type donné
+        n = self.ops[op]
+        return {kind: c / n for kind, c in self.by_op[op].items()} if n else {}
+
+    def reset(self):
+        self.__init__()
@@ -2,6 +2,8 @@ import tkinter as tk
 from tkinter import messagebox
 from math import ceil
 
+from TP3.etapes_tri import MergeTrace, Timeline
+
 # Couleurs
 COLOR_BG = "white"
 COLOR_NODE = "#E8E8E8"
@@ -16,6 +18,7 @@ LEVEL_HEIGHT = 80
 NODE_W = 70
 NODE_H = 30
 MARGIN_X = 40
+AUTOPLAY_FPS = 60
 
 
 class MergeSortTreeSteps:
@@ -27,6 +30,7 @@ class MergeSortTreeSteps:
         # ===== Éléments de l’interface (anciennement master) =====
         self.array = []
         self.steps = []
+        self.timeline = None
         self.current_step = 0
 
         # UI Top : saisie
@@ -60,11 +64,28 @@ class MergeSortTreeSteps:
         self.reset_btn = tk.Button(bottom, text="Réinitialiser", bg="#9E9E9E", fg="white", command=self.reset_all)
         self.reset_btn.pack(side=tk.LEFT, padx=6)
 
+        self.play_btn = tk.Button(bottom, text="Lecture auto", bg="#673AB7", fg="white", command=self.toggle_play)
+        self.play_btn.pack(side=tk.LEFT, padx=6)
+        self.playing = False
+        self._play_job = None
+
+        # ligne de temps : accès direct à une étape
+        self.slider = tk.Scale(self.frame, from_=0, to=0, orient=tk.HORIZONTAL, length=600,
+                               label="Étape", bg="white", command=lambda v: self.seek(int(v)))
+        self.slider.pack(pady=4)
+
         # structures
         self.node_positions = {}
         self.max_level = 0
         self.node_state = {}
 
+        # dessin conservé : items du canvas créés une fois par nœud, puis modifiés sur place
+        self.node_items = {}
+        self.overlay_items = {}
+        self._drawn = {}
+        self._dirty = set()
+        self._highlighted = set()
+
     # ============================================
     #               LOGIQUE / FONCTIONS
     # ============================================
@@ -84,19 +105,22 @@ class MergeSortTreeSteps:
             return
 
         self.array = arr
+        self.stop_play()
         self.info_label.config(text=f"Tableau : {self.array}")
-        self.canvas.delete("all")
+        self._clear_canvas()
         self.node_positions.clear()
         self.node_state.clear()
-        self.steps.clear()
+        self.steps = []
+        self.timeline = None
         self.current_step = 0
+        self.slider.config(to=0)
         self.next_btn.config(state=tk.DISABLED)
         self.prev_btn.config(state=tk.DISABLED)
 
         self.draw_initial_array()
 
     def draw_initial_array(self):
-        self.canvas.delete("all")
+        self._clear_canvas()
 
         arr = self.array
         n = len(arr)
@@ -120,9 +144,10 @@ class MergeSortTreeSteps:
             messagebox.showinfo("Erreur", "Aucun tableau chargé.")
             return
 
+        self.stop_play()
         self.node_positions.clear()
         self.node_state.clear()
-        self.steps.clear()
+        self.steps = []
         self.current_step = 0
         n = len(self.array)
 
@@ -140,14 +165,15 @@ class MergeSortTreeSteps:
                 leaf_x[i] = MARGIN_X + idx * (span / (n - 1))
 
         for (l, r), level in list(self.node_positions.items()):
-            xs = [leaf_x[i] for i in range(l, r + 1)]
-            x = sum(xs) / len(xs)
+            # feuilles régulièrement espacées : la moyenne est le milieu des extrêmes
+            x = (leaf_x[l] + leaf_x[r]) / 2
             y = 40 + level * LEVEL_HEIGHT
             self.node_positions[(l, r)] = (x, y)
             self.node_state[(l, r)] = {"label": None, "color": COLOR_NODE, "visible": True}
 
-        self.generate_steps(self.array, 0, n - 1)
+        self.generate_steps(self.array)
 
+        self._create_items()
         self.draw_full_tree()
         self.info_label.config(text=f"Tableau : {self.array}  — étapes générées : {len(self.steps)}")
 
@@ -164,42 +190,14 @@ class MergeSortTreeSteps:
         self._collect_nodes(l, mid, level + 1)
         self._collect_nodes(mid + 1, r, level + 1)
 
-    def generate_steps(self, arr, left, right):
-        if left > right:
-            return []
-        if left == right:
-            self.steps.append(('leaf', (left, right), [arr[left]]))
-            return [arr[left]]
-
-        self.steps.append(('split', (left, right), arr[left:right + 1].copy()))
-        mid = (left + right) // 2
-        L = self.generate_steps(arr, left, mid)
-        R = self.generate_steps(arr, mid + 1, right)
-
-        i = j = 0
-        merged = []
-
-        while i < len(L) and j < len(R):
-            self.steps.append(('compare', (left, right), L[i], R[j], merged.copy()))
-            if L[i] <= R[j]:
-                merged.append(L[i])
-                i += 1
-            else:
-                merged.append(R[j])
-                j += 1
-
-        while i < len(L):
-            self.steps.append(('compare', (left, right), L[i], None, merged.copy()))
-            merged.append(L[i])
-            i += 1
-
-        while j < len(R):
-            self.steps.append(('compare', (left, right), None, R[j], merged.copy()))
-            merged.append(R[j])
-            j += 1
-
-        self.steps.append(('merge_complete', (left, right), merged.copy()))
-        return merged
+    def generate_steps(self, arr):
+        # journal compact : quelques octets par étape au lieu d'une copie du
+        # tableau fusionné ; self.steps[k] redonne le tuple de l'étape k.
+        # Rien n'est trié ici : les étapes sont produites au fil de la lecture
+        self.steps = MergeTrace(arr)
+        self.timeline = Timeline(self.steps)
+        self.slider.config(to=len(self.steps))
+        self.slider.set(0)
 
     def next_step(self):
         if self.current_step >= len(self.steps):
@@ -207,35 +205,75 @@ class MergeSortTreeSteps:
             return
 
         step = self.steps[self.current_step]
+        self.timeline.seek(self.current_step + 1)
         self.apply_step(step)
         self.current_step += 1
-        self.prev_btn.config(state=tk.NORMAL)
-
-        if self.current_step >= len(self.steps):
-            self.next_btn.config(state=tk.DISABLED)
+        self.slider.set(self.current_step)
+        self._update_buttons()
 
     def prev_step(self):
         if self.current_step == 0:
             return
+        # une étape se défait en O(1) (plus de rejeu depuis l'étape 0)
+        self.seek(self.current_step - 1)
 
-        self.current_step -= 1
-
-        for k in self.node_state:
-            self.node_state[k]["label"] = None
-            self.node_state[k]["color"] = COLOR_NODE
-
-        for i in range(self.current_step):
-            self.apply_step(self.steps[i], replay=True)
-
+    def seek(self, step):
+        # accès direct à l'étape `step` : au plus K étapes rejouées depuis un point de reprise
+        if self.timeline is None:
+            return
+        step = max(0, min(step, len(self.steps)))
+        if step == self.current_step:
+            return
+        for node in self.timeline.seek(step):
+            self._restore_node(node)
+        self.current_step = step
+        self.slider.set(step)
         self.draw_full_tree()
-
-        if self.current_step == 0:
-            self.prev_btn.config(state=tk.DISABLED)
-
-        self.next_btn.config(state=tk.NORMAL)
+        self._update_buttons()
+
+    def _restore_node(self, node):
+        # l'état d'un nœud est celui écrit par la dernière étape qui l'a touché
+        k = self.timeline.last_step(node)
+        if k is None:
+            rng = self.steps.bounds(node)
+            self.node_state[rng]["label"] = None
+            self.node_state[rng]["color"] = COLOR_NODE
+            self._dirty.add(rng)
+        else:
+            self.apply_step(self.steps[k], replay=True)
+
+    def _update_buttons(self):
+        self.prev_btn.config(state=tk.NORMAL if self.current_step > 0 else tk.DISABLED)
+        self.next_btn.config(state=tk.NORMAL if self.current_step < len(self.steps) else tk.DISABLED)
+
+    def toggle_play(self):
+        if self.playing:
+            self.stop_play()
+        elif self.timeline is not None and self.current_step < len(self.steps):
+            self.playing = True
+            self.play_btn.config(text="Pause")
+            self._play_tick()
+
+    def stop_play(self):
+        self.playing = False
+        if self._play_job is not None:
+            self.frame.after_cancel(self._play_job)
+            self._play_job = None
+        self.play_btn.config(text="Lecture auto")
+
+    def _play_tick(self):
+        self._play_job = None
+        if not self.playing:
+            return
+        if self.current_step >= len(self.steps):
+            self.stop_play()
+            return
+        self.next_step()
+        self._play_job = self.frame.after(1000 // AUTOPLAY_FPS, self._play_tick)
 
     def apply_step(self, step, replay=False):
         typ = step[0]
+        self._dirty.add(step[1])
 
         if typ == 'leaf':
             rng = step[1]
@@ -284,79 +322,123 @@ class MergeSortTreeSteps:
             if not replay:
                 self.draw_full_tree(highlight_nodes=[rng])
 
-    def draw_full_tree(self, highlight_nodes=None, compare_pair=None, parent_partial=None):
+    def _clear_canvas(self):
         self.canvas.delete("all")
-
+        self.node_items = {}
+        self.overlay_items = {}
+        self._drawn = {}
+        self._dirty = set()
+        self._highlighted = set()
+
+    def _create_items(self):
+        # un rectangle et un texte par nœud, les arêtes dessous ; créés une seule fois
+        self._clear_canvas()
         for (l, r), (x, y) in self.node_positions.items():
             if l < r:
                 mid = (l + r) // 2
-                left = (l, mid)
-                right = (mid + 1, r)
-                if left in self.node_positions:
-                    lx, ly = self.node_positions[left]
-                    self.canvas.create_line(x, y + 15, lx, ly - 15)
-                if right in self.node_positions:
-                    rx, ry = self.node_positions[right]
-                    self.canvas.create_line(x, y + 15, rx, ry - 15)
+                for child in ((l, mid), (mid + 1, r)):
+                    if child in self.node_positions:
+                        cx, cy = self.node_positions[child]
+                        self.canvas.create_line(x, y + 15, cx, cy - 15)
 
         for (l, r), (x, y) in self.node_positions.items():
-            state = self.node_state.get((l, r), {"label": None, "color": COLOR_NODE})
-            color = state["color"]
-            label = state["label"]
-
-            if highlight_nodes and (l, r) in highlight_nodes:
-                color = COLOR_COMPARE
-
-            leftx = x - NODE_W / 2
-            topy = y - NODE_H / 2
-            rightx = x + NODE_W / 2
-            boty = y + NODE_H / 2
-
-            self.canvas.create_rectangle(leftx, topy, rightx, boty, fill=color, outline="black")
+            rect = self.canvas.create_rectangle(x - NODE_W / 2, y - NODE_H / 2, x + NODE_W / 2, y + NODE_H / 2,
+                                                fill=COLOR_NODE, outline="black")
+            text = self.canvas.create_text(x, y, text=f"{l}-{r}", fill=COLOR_TEXT)
+            self.node_items[(l, r)] = (rect, text)
+            self._drawn[(l, r)] = (COLOR_NODE, f"{l}-{r}")
+
+        # textes de la comparaison en cours (cachés hors comparaison) et résultat courant
+        hidden = dict(text="", state=tk.HIDDEN)
+        self.overlay_items = {
+            "left": self.canvas.create_text(0, 0, fill="red", font=("Arial", 10, "bold"), **hidden),
+            "right": self.canvas.create_text(0, 0, fill="red", font=("Arial", 10, "bold"), **hidden),
+            "merged": self.canvas.create_text(0, 0, fill="darkgreen", font=("Arial", 10), **hidden),
+            "result": self.canvas.create_text(CANVAS_W / 2, CANVAS_H - 20, text="Résultat courant (racine) : -",
+                                              font=("Arial", 12), fill="gray"),
+        }
+        self._dirty = set(self.node_positions)
+
+    def _show_overlay(self, name, x, y, text):
+        item = self.overlay_items[name]
+        self.canvas.coords(item, x, y)
+        self.canvas.itemconfig(item, text=text, state=tk.NORMAL)
 
+    def draw_full_tree(self, highlight_nodes=None, compare_pair=None, parent_partial=None):
+        # mise à jour sur place : seuls les nœuds modifiés depuis le dernier dessin
+        # et ceux qui gagnent ou perdent la surbrillance sont touchés
+        if not self.node_items:
+            self._create_items()
+
+        highlight = set(highlight_nodes or ())
+        root = (0, len(self.array) - 1)
+        root_changed = root in self._dirty
+        for rng in self._dirty | self._highlighted | highlight:
+            if rng not in self.node_items:
+                continue
+            state = self.node_state.get(rng, {"label": None, "color": COLOR_NODE})
+            color = COLOR_COMPARE if rng in highlight else state["color"]
+            label = state["label"]
             if label is None:
-                txt = f"{l}-{r}"
+                txt = f"{rng[0]}-{rng[1]}"
             else:
                 txt = " ".join(str(v) for v in label) if isinstance(label, list) else str(label)
-
-            self.canvas.create_text(x, y, text=txt, fill=COLOR_TEXT)
-
-        if compare_pair:
+            if self._drawn.get(rng) != (color, txt):
+                rect, text = self.node_items[rng]
+                if self._drawn[rng][0] != color:
+                    self.canvas.itemconfig(rect, fill=color)
+                if self._drawn[rng][1] != txt:
+                    self.canvas.itemconfig(text, text=txt)
+                self._drawn[rng] = (color, txt)
+        self._dirty.clear()
+        self._highlighted = highlight
+
+        shown = set()
+        if compare_pair and parent_partial:
             lv, rv = compare_pair
-            if parent_partial:
-                (prange, merged) = parent_partial
-                l, r = prange
-                mid = (l + r) // 2
-                left = (l, mid)
-                right = (mid + 1, r)
-
-                if left in self.node_positions and lv is not None:
-                    lx, ly = self.node_positions[left]
-                    self.canvas.create_text(lx, ly - 30, text=str(lv), fill="red", font=("Arial", 10, "bold"))
-
-                if right in self.node_positions and rv is not None:
-                    rx, ry = self.node_positions[right]
-                    self.canvas.create_text(rx, ry - 30, text=str(rv), fill="red", font=("Arial", 10, "bold"))
-
-                px, py = self.node_positions[prange]
-                self.canvas.create_text(px, py + 30, text="merged: " + (" ".join(map(str, merged)) if merged else "[]"),
-                                        fill="darkgreen", font=("Arial", 10))
-
-        top_label = self.node_state.get((0, len(self.array) - 1), {}).get("label", None)
-        if top_label:
-            self.canvas.create_text(CANVAS_W / 2, CANVAS_H - 20, text="Résultat courant (racine) : " +
-                                   " ".join(map(str, top_label)), font=("Arial", 12, "bold"), fill="blue")
-        else:
-            self.canvas.create_text(CANVAS_W / 2, CANVAS_H - 20, text="Résultat courant (racine) : -",
-                                   font=("Arial", 12), fill="gray")
+            (prange, merged) = parent_partial
+            l, r = prange
+            mid = (l + r) // 2
+            left = (l, mid)
+            right = (mid + 1, r)
+
+            if left in self.node_positions and lv is not None:
+                lx, ly = self.node_positions[left]
+                self._show_overlay("left", lx, ly - 30, str(lv))
+                shown.add("left")
+
+            if right in self.node_positions and rv is not None:
+                rx, ry = self.node_positions[right]
+                self._show_overlay("right", rx, ry - 30, str(rv))
+                shown.add("right")
+
+            px, py = self.node_positions[prange]
+            self._show_overlay("merged", px, py + 30,
+                               "merged: " + (" ".join(map(str, merged)) if merged else "[]"))
+            shown.add("merged")
+        for name in ("left", "right", "merged"):
+            if name not in shown:
+                self.canvas.itemconfig(self.overlay_items[name], state=tk.HIDDEN)
+
+        if root_changed:
+            top_label = self.node_state.get(root, {}).get("label", None)
+            if top_label:
+                self.canvas.itemconfig(self.overlay_items["result"], text="Résultat courant (racine) : " +
+                                       " ".join(map(str, top_label)), font=("Arial", 12, "bold"), fill="blue")
+            else:
+                self.canvas.itemconfig(self.overlay_items["result"], text="Résultat courant (racine) : -",
+                                       font=("Arial", 12), fill="gray")
 
     def reset_all(self):
+        self.stop_play()
         self.array = []
         self.steps = []
+        self.timeline = None
         self.current_step = 0
+        self.slider.config(to=0)
         self.node_positions.clear()
         self.node_state.clear()
-        self.canvas.delete("all")
+        self._clear_canvas()
         self.info_label.config(text="Tableau : []")
         self.entry.delete(0, tk.END)
         self.next_btn.config(state=tk.DISABLED)
@@ -0,0 +1,231 @@
+from array import array
+from bisect import bisect_right
+from heapq import merge
+from itertools import islice
+
+from TP3.sorting import COMPARE, LEAF, MERGED, SPLIT, count_steps, merge_sort_steps
+
+
+def _code(limit):
+    # plus petit type entier non signé capable de contenir les valeurs < limit
+    for code in ("B", "H", "I", "L", "Q"):
+        if limit < 1 << (8 * array(code).itemsize):
+            return code
+    raise OverflowError(limit)
+
+
+LOOKAHEAD = 256
+
+
+class MergeTrace:
+    """Journal compact des étapes d'un tri fusion, produit à la demande.
+
+    Chaque étape tient en deux entiers typés : son type et un argument, le
+    nœud (l, r) de l'arbre de récursion pour 'leaf' / 'split' /
+    'merge_complete', ou pour une comparaison le nombre i d'éléments déjà
+    pris dans la moitié gauche. Les comparaisons d'une fusion sont contiguës :
+    leur nœud se retrouve par dichotomie sur le début des blocs, j = rang de
+    la comparaison dans le bloc - i, et le préfixe fusionné se recalcule à la
+    lecture à partir des deux moitiés triées. Aucune copie de tableau n'est
+    stockée. La lecture t[k] rend l'étape dans le format des
+    tuples d'origine ('leaf' | 'split' | 'compare' | 'merge_complete', ...).
+
+    Les étapes sont tirées de sorting.merge_sort_steps au fil des lectures : lire
+    l'étape k produit au plus `lookahead` étapes d'avance. len() est connu
+    dès le départ (count_steps) ; seules les étapes déjà atteintes occupent
+    de la mémoire.
+    """
+
+    def __init__(self, arr, lookahead=LOOKAHEAD):
+        self.arr = list(arr)
+        n = len(self.arr)
+        self.lookahead = lookahead
+        self.total = count_steps(n)
+        self.op = array("B")
+        self.arg = array(_code(2 * n))
+        # table des nœuds (bornes) et blocs de comparaisons (première étape, nœud)
+        self.lo = array(_code(n))
+        self.hi = array(_code(n))
+        self.block_start = array("Q")
+        self.block_node = array(_code(2 * n))
+        self._open = []                 # nœuds dont la fusion n'est pas terminée
+        self._source = merge_sort_steps(self.arr)
+        self._runs_cache = (None, None, None)
+
+    def _new_node(self, l, r):
+        self.lo.append(l)
+        self.hi.append(r)
+        return len(self.lo) - 1
+
+    def fill(self, k):
+        # garantit que l'étape k est produite, avec une avance bornée
+        if k < len(self.op):
+            return
+        stop = min(self.total, k + 1 + self.lookahead)
+        ops, args, opened = self.op, self.arg, self._open
+        for op, bounds, i in islice(self._source, stop - len(ops)):
+            if op == COMPARE:
+                if ops[-1] != COMPARE:
+                    # première comparaison de la fusion (précédée par la fin du fils droit)
+                    self.block_start.append(len(ops))
+                    self.block_node.append(opened[-1])
+                args.append(i)
+            elif op == MERGED:
+                args.append(opened.pop())
+            else:
+                node = self._new_node(*bounds)
+                if op == SPLIT:
+                    opened.append(node)
+                args.append(node)
+            ops.append(op)
+
+    def produced(self):
+        return len(self.op)
+
+    def _runs(self, node):
+        # les deux moitiés triées du nœud (mémorisées pour le dernier nœud lu)
+        cached, L, R = self._runs_cache
+        if cached != node:
+            l, r = self.lo[node], self.hi[node]
+            mid = (l + r) // 2
+            L, R = sorted(self.arr[l:mid + 1]), sorted(self.arr[mid + 1:r + 1])
+            self._runs_cache = (node, L, R)
+        return L, R
+
+    def __len__(self):
+        return self.total
+
+    def node_count(self):
+        # n feuilles et n - 1 nœuds internes, produits ou non
+        return max(0, 2 * len(self.arr) - 1)
+
+    def bounds(self, node):
+        return self.lo[node], self.hi[node]
+
+    def node_of(self, k):
+        # nœud modifié par l'étape k
+        self.fill(k)
+        if self.op[k] == COMPARE:
+            return self.block_node[bisect_right(self.block_start, k) - 1]
+        return self.arg[k]
+
+    def iter_nodes(self, start, stop):
+        # nœuds modifiés par les étapes start .. stop - 1 (parcours séquentiel, sans dichotomie)
+        if stop <= start:
+            return
+        self.fill(stop - 1)
+        op, arg, block_start, block_node = self.op, self.arg, self.block_start, self.block_node
+        b = bisect_right(block_start, start) - 1
+        nxt = block_start[b + 1] if b + 1 < len(block_start) else len(op)
+        for k in range(start, stop):
+            if op[k] != COMPARE:
+                yield arg[k]
+                continue
+            while k >= nxt:
+                b += 1
+                nxt = block_start[b + 1] if b + 1 < len(block_start) else len(op)
+            yield block_node[b]
+
+    def __getitem__(self, k):
+        if k < 0:
+            k += self.total
+        if not 0 <= k < self.total:
+            raise IndexError(k)
+        node = self.node_of(k)
+        op = self.op[k]
+        l, r = self.lo[node], self.hi[node]
+        if op == LEAF:
+            return ('leaf', (l, r), [self.arr[l]])
+        if op == SPLIT:
+            return ('split', (l, r), self.arr[l:r + 1])
+        L, R = self._runs(node)
+        if op == MERGED:
+            return ('merge_complete', (l, r), list(merge(L, R)))
+        i = self.arg[k]
+        j = k - self.block_start[bisect_right(self.block_start, k) - 1] - i
+        return ('compare', (l, r), L[i] if i < len(L) else None, R[j] if j < len(R) else None,
+                list(merge(L[:i], R[:j])))
+
+    def nbytes(self):
+        # mémoire du journal (hors copie du tableau d'entrée)
+        return sum(a.itemsize * len(a) for a in (self.op, self.arg, self.lo, self.hi,
+                                                   self.block_start, self.block_node))
+
+
+# ============================================================
+# REJEU (retour arrière et accès direct à une étape)
+# ============================================================
+CHECKPOINT_MIN = 256
+
+
+class Timeline:
+    """Position courante dans un journal d'étapes, réversible.
+
+    L'état du rejeu tient dans un tableau d'entiers : touched[nœud] vaut
+    1 + l'indice de la dernière étape appliquée au nœud (0 : état initial),
+    l'étiquette et la couleur se relisent dans le journal. Une étape se défait
+    en O(1) grâce à undo[k], la valeur de touched qu'elle a écrasée. Une copie
+    de touched (point de reprise) est prise toutes les K étapes, avec K au
+    moins égal au nombre de nœuds : restaurer une copie coûte déjà O(nœuds),
+    et l'ensemble des copies ne pèse pas plus que undo. seek(t) part du point
+    de reprise le plus proche et rejoue au plus K étapes.
+
+    Le journal doit fournir len(), node_count(), node_of(k) et
+    iter_nodes(start, stop).
+    """
+
+    def __init__(self, trace, every=None):
+        self.trace = trace
+        nodes = trace.node_count()
+        self.every = every or max(CHECKPOINT_MIN, nodes)
+        code = _code(len(trace) + 1)
+        self.touched = array(code, [0]) * nodes
+        self.undo = array(code)
+        self.checkpoints = [self.touched[:]]
+        self.position = 0
+
+    def _forward(self, t, changed):
+        touched, undo, every = self.touched, self.undo, self.every
+        k = self.position
+        for node in self.trace.iter_nodes(k, t):
+            if k == len(undo):
+                # première visite : mémoriser de quoi défaire l'étape
+                undo.append(touched[node])
+            k += 1
+            touched[node] = k
+            changed.add(node)
+            if k % every == 0 and k // every == len(self.checkpoints):
+                self.checkpoints.append(touched[:])
+        self.position = k
+
+    def _backward(self):
+        self.position -= 1
+        k = self.position
+        node = self.trace.node_of(k)
+        self.touched[node] = self.undo[k]
+        return node
+
+    def seek(self, t):
+        """Se place juste après l'étape t - 1 ; renvoie les nœuds dont l'état a changé."""
+        if not 0 <= t <= len(self.trace):
+            raise IndexError(t)
+        before = None
+        if abs(t - self.position) > self.every:
+            # les points de reprise ne couvrent que les étapes déjà visitées
+            before = self.touched
+            c = min(t // self.every, len(self.checkpoints) - 1)
+            self.touched = self.checkpoints[c][:]
+            self.position = c * self.every
+        changed = set()
+        if self.position < t:
+            self._forward(t, changed)
+        while self.position > t:
+            changed.add(self._backward())
+        if before is not None:
+            changed = {i for i, (a, b) in enumerate(zip(before, self.touched)) if a != b}
+        return changed
+
+    def last_step(self, node):
+        # indice de la dernière étape appliquée au nœud, ou None (état initial)
+        t = self.touched[node]
+        return t - 1 if t else None
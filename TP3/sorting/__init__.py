@@ -0,0 +1,31 @@
+"""Algorithmes de tri sans interface graphique.
+
+Chaque algorithme existe en deux versions qui prennent les mêmes décisions :
+un tri simple, qui renvoie une nouvelle liste, et un générateur d'étapes
+instrumenté (suffixe _steps), qui ne modifie pas son entrée. Toutes les
+traces partagent le format décrit dans sorting.etapes. Le visualiseur de TP3
+rejoue la trace de merge_sort_steps ; bench_tri compare les algorithmes.
+
+    >>> from TP3.sorting import quicksort, count_ops, heapsort_steps
+    >>> quicksort([3, 1, 2])
+    [1, 2, 3]
+    >>> count_ops(heapsort_steps([3, 1, 2]))["swap"]
+    2
+"""
+from TP3.sorting.etapes import COMPARE, LEAF, MERGED, MOVE, NAMES, SPLIT, SWAP, Step, count_ops
+from TP3.sorting.tri_fusion import (bottom_up_merge_sort, bottom_up_merge_sort_steps, count_steps,
+                                    merge_sort, merge_sort_steps, natural_merge_sort,
+                                    natural_merge_sort_steps)
+from TP3.sorting.tri_radix import radix_sort, radix_sort_steps
+from TP3.sorting.tri_rapide import quicksort, quicksort_steps
+from TP3.sorting.tri_tas import heapsort, heapsort_steps
+
+# nom -> (tri simple, générateur d'étapes)
+ALGORITHMS = {
+    "merge": (merge_sort, merge_sort_steps),
+    "merge_bottom_up": (bottom_up_merge_sort, bottom_up_merge_sort_steps),
+    "natural": (natural_merge_sort, natural_merge_sort_steps),
+    "quick": (quicksort, quicksort_steps),
+    "heap": (heapsort, heapsort_steps),
+    "radix": (radix_sort, radix_sort_steps),
+}
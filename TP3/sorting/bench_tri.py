@@ -0,0 +1,107 @@
+"""Banc d'essai des tris de TP3.sorting.
+
+Exemple :
+    python -m TP3.sorting.bench_tri --algorithms merge quick radix \\
+        --sizes 10000 100000 --distributions random sorted --steps --out tri.json
+
+Chaque cas (algorithme, taille, distribution) est chronométré sur `repeat`
+exécutions (meilleur temps retenu) et vérifié contre sorted(). Avec --steps,
+le générateur d'étapes est aussi parcouru : durée et nombre d'étapes par
+type (comparaisons, échanges, déplacements).
+"""
+from typing import Dict, List, Optional, Sequence
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+from TP3.sorting import ALGORITHMS, count_ops
+
+DISTRIBUTIONS = ("random", "sorted", "reversed", "few_unique", "nearly_sorted")
+
+
+def make_data(dist: str, n: int, rnd: random.Random) -> List[int]:
+    if dist == "random":
+        return [rnd.randrange(-n, n) for _ in range(n)]
+    if dist == "sorted":
+        return list(range(n))
+    if dist == "reversed":
+        return list(range(n, 0, -1))
+    if dist == "few_unique":
+        return [rnd.randrange(8) for _ in range(n)]
+    if dist == "nearly_sorted":
+        data = list(range(n))
+        for _ in range(max(1, n // 100)):
+            i, j = rnd.randrange(n), rnd.randrange(n)
+            data[i], data[j] = data[j], data[i]
+        return data
+    raise ValueError(f"unknown distribution {dist!r}")
+
+
+def run_case(name: str, n: int, dist: str, repeat: int = 3, steps: bool = False,
+             seed: int = 0) -> Dict[str, object]:
+    data = make_data(dist, n, random.Random(seed))
+    expected = sorted(data)
+    sort = sorted if name == "builtin" else ALGORITHMS[name][0]
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = sort(data)
+        best = min(best, time.perf_counter() - t0)
+        if out != expected:
+            raise AssertionError(f"{name} ne trie pas {dist} n={n}")
+    row: Dict[str, object] = {"algorithm": name, "n": n, "distribution": dist, "seconds": best}
+    if steps and name != "builtin":
+        t0 = time.perf_counter()
+        row["ops"] = count_ops(ALGORITHMS[name][1](data))
+        row["steps_seconds"] = time.perf_counter() - t0
+    return row
+
+
+def _print_row(row: Dict[str, object]):
+    line = f"{row['algorithm']:>16} n={row['n']:<9} {row['distribution']:<14} {row['seconds'] * 1e3:>10.1f} ms"
+    if "ops" in row:
+        ops = row["ops"]
+        line += (f"  étapes {sum(ops.values()):>10} (cmp {ops['compare']}, swap {ops['swap']}, "
+                 f"move {ops['move']}) en {row['steps_seconds']:.2f}s")
+    print(line)
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Banc d'essai des tris de TP3.sorting")
+    parser.add_argument("--algorithms", nargs="+", choices=list(ALGORITHMS) + ["builtin"],
+                        default=list(ALGORITHMS) + ["builtin"])
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1_000, 100_000])
+    parser.add_argument("--distributions", nargs="+", choices=DISTRIBUTIONS, default=list(DISTRIBUTIONS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--steps", action="store_true", help="parcourir aussi les générateurs d'étapes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help="fichier JSON des résultats")
+    args = parser.parse_args(argv)
+
+    rows = []
+    for n in args.sizes:
+        for dist in args.distributions:
+            for name in args.algorithms:
+                row = run_case(name, n, dist, args.repeat, args.steps, args.seed)
+                rows.append(row)
+                _print_row(row)
+    if args.out:
+        report = {
+            "meta": {
+                "python": sys.version.split()[0],
+                "implementation": platform.python_implementation(),
+                "machine": platform.machine(),
+                "args": vars(args),
+            },
+            "results": rows,
+        }
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"{len(rows)} cas écrits dans {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+from typing import Dict, Iterable, Tuple
+
+# ============================================================
+# FORMAT COMMUN DES TRACES
+# ============================================================
+# Une étape est un triplet (type, (l, r), i) :
+#   LEAF    (l, r), 0  : le segment a[l..r] est trié d'office (un élément, run naturel, bloc du pivot)
+#   SPLIT   (l, r), i  : ouverture du segment a[l..r] ; i = fin de la moitié gauche (fusions),
+#                        indice du pivot (tri rapide), décalage du chiffre (radix), 0 sinon
+#   COMPARE (l, r), i  : une comparaison dans le segment ouvert a[l..r] ; i = éléments déjà pris
+#                        à gauche (fusions), indice comparé (partition, tas, recherche de runs)
+#   MERGED  (l, r), 0  : fermeture du segment ouvert par SPLIT (l, r) ; a[l..r] est trié
+#                        (pour le radix : trié selon les chiffres déjà traités)
+#   SWAP    (i, j), 0  : échange de a[i] et a[j]
+#   MOVE    (i, j), 0  : l'élément en position i avant la passe va en position j (radix)
+# Les SPLIT / MERGED s'emboîtent comme des parenthèses.
+LEAF = 0
+SPLIT = 1
+COMPARE = 2
+MERGED = 3
+SWAP = 4
+MOVE = 5
+
+NAMES = {LEAF: "leaf", SPLIT: "split", COMPARE: "compare", MERGED: "merge_complete", SWAP: "swap",
+         MOVE: "move"}
+
+Step = Tuple[int, Tuple[int, int], int]
+
+
+def count_ops(steps: Iterable[Step]) -> Dict[str, int]:
+    # nombre d'étapes de chaque type (comparaisons, échanges...) d'une trace
+    counts = dict.fromkeys(NAMES.values(), 0)
+    for op, _, _ in steps:
+        counts[NAMES[op]] += 1
+    return counts
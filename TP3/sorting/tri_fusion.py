@@ -0,0 +1,300 @@
+from bisect import bisect_right
+from typing import Iterator, List
+
+from TP3.sorting.etapes import COMPARE, LEAF, MERGED, SPLIT, SWAP, Step
+
+
+# ============================================================
+# FUSION (commune aux trois variantes)
+# ============================================================
+def _merge(L: list, R: list) -> list:
+    # stable : à égalité, l'élément de gauche passe en premier
+    merged = []
+    i = j = 0
+    nl, nr = len(L), len(R)
+    while i < nl and j < nr:
+        if L[i] <= R[j]:
+            merged.append(L[i])
+            i += 1
+        else:
+            merged.append(R[j])
+            j += 1
+    merged.extend(L[i:])
+    merged.extend(R[j:])
+    return merged
+
+
+def _merge_steps(L: list, R: list, l: int, r: int, merged: list) -> Iterator[Step]:
+    # même fusion que _merge, une étape COMPARE par élément placé (queues comprises)
+    i = j = 0
+    while i < len(L) and j < len(R):
+        yield COMPARE, (l, r), i
+        if L[i] <= R[j]:
+            merged.append(L[i])
+            i += 1
+        else:
+            merged.append(R[j])
+            j += 1
+    while i < len(L):
+        yield COMPARE, (l, r), i
+        merged.append(L[i])
+        i += 1
+    while j < len(R):
+        yield COMPARE, (l, r), i
+        merged.append(R[j])
+        j += 1
+
+
+# ============================================================
+# DESCENDANT (récursif, moitiés égales)
+# ============================================================
+def merge_sort(arr) -> list:
+    """Tri fusion descendant : découpe en moitiés, renvoie une nouvelle liste (stable)."""
+    a = list(arr)
+
+    def sort(l: int, r: int) -> list:
+        if l == r:
+            return [a[l]]
+        mid = (l + r) // 2
+        return _merge(sort(l, mid), sort(mid + 1, r))
+
+    return sort(0, len(a) - 1) if a else []
+
+
+def count_steps(n: int) -> int:
+    # nombre d'étapes de merge_sort_steps, connu sans trier : une feuille par
+    # élément ; par nœud interne un 'split', une comparaison par élément
+    # fusionné et un 'merge_complete'
+    memo = {0: 0, 1: 1}
+
+    def steps(size: int) -> int:
+        if size not in memo:
+            memo[size] = 2 + size + steps((size + 1) // 2) + steps(size // 2)
+        return memo[size]
+
+    return steps(n)
+
+
+def merge_sort_steps(arr) -> Iterator[Step]:
+    """Tri fusion descendant itératif (pile explicite), produit ses étapes une à une.
+
+    Mêmes découpes et mêmes comparaisons que merge_sort, dans l'ordre de la
+    récursion. La pile `runs` garde les moitiés triées en attente de fusion :
+    l'état du tri tient dans les deux piles, on peut s'arrêter et reprendre
+    entre deux étapes.
+    """
+    a = list(arr)
+    if not a:
+        return
+    runs = []
+    stack = [(0, len(a) - 1, False)]
+    while stack:
+        l, r, merging = stack.pop()
+        if l == r:
+            yield LEAF, (l, r), 0
+            runs.append([a[l]])
+            continue
+        mid = (l + r) // 2
+        if not merging:
+            yield SPLIT, (l, r), mid
+            stack.append((l, r, True))
+            stack.append((mid + 1, r, False))
+            stack.append((l, mid, False))
+            continue
+
+        R = runs.pop()
+        L = runs.pop()
+        merged = []
+        yield from _merge_steps(L, R, l, r, merged)
+        yield MERGED, (l, r), 0
+        runs.append(merged)
+
+
+# ============================================================
+# ASCENDANT (fusion de segments de largeur 1, 2, 4, ...)
+# ============================================================
+def bottom_up_merge_sort(arr) -> list:
+    """Tri fusion ascendant, sans récursion (stable)."""
+    a = list(arr)
+    n = len(a)
+    width = 1
+    while width < n:
+        out = []
+        for l in range(0, n, 2 * width):
+            out.extend(_merge(a[l:l + width], a[l + width:l + 2 * width]))
+        a = out
+        width *= 2
+    return a
+
+
+def bottom_up_merge_sort_steps(arr) -> Iterator[Step]:
+    a = list(arr)
+    n = len(a)
+    for k in range(n):
+        yield LEAF, (k, k), 0
+    width = 1
+    while width < n:
+        for l in range(0, n, 2 * width):
+            m = min(l + width, n) - 1
+            r = min(l + 2 * width, n) - 1
+            if m >= r:
+                continue            # segment sans voisin : déjà trié
+            yield SPLIT, (l, r), m
+            merged = []
+            yield from _merge_steps(a[l:m + 1], a[m + 1:r + 1], l, r, merged)
+            a[l:r + 1] = merged
+            yield MERGED, (l, r), 0
+        width *= 2
+
+
+# ============================================================
+# RUNS NATURELS (à la Timsort)
+# ============================================================
+MIN_MERGE = 64
+
+
+def min_run(n: int) -> int:
+    # longueur minimale d'un run : n / min_run proche d'une puissance de 2 (listsort.txt de CPython)
+    bits = 0
+    while n >= MIN_MERGE:
+        bits |= n & 1
+        n >>= 1
+    return n + bits
+
+
+def _collapse(runs: List[List[int]], force: bool = False) -> Iterator[int]:
+    # indices k des fusions runs[k] + runs[k + 1] qui rétablissent les invariants
+    # de pile de Timsort : |Z| > |Y| + |X| et |Y| > |X| (version corrigée, de
+    # Gouw et al. 2015) ; l'appelant fusionne avant la reprise du générateur
+    while len(runs) > 1:
+        k = len(runs) - 2
+        if force:
+            if k > 0 and runs[k - 1][1] < runs[k + 1][1]:
+                k -= 1
+        elif (k > 0 and runs[k - 1][1] <= runs[k][1] + runs[k + 1][1]) or \
+                (k > 1 and runs[k - 2][1] <= runs[k - 1][1] + runs[k][1]):
+            if runs[k - 1][1] < runs[k + 1][1]:
+                k -= 1
+        elif runs[k][1] > runs[k + 1][1]:
+            break
+        yield k
+        runs[k][1] += runs[k + 1][1]
+        del runs[k + 1]
+
+
+def _run_end(a: list, lo: int, n: int) -> int:
+    # fin (exclue) du run naturel qui commence en lo ; un run strictement
+    # descendant est retourné sur place (strict : la stabilité est préservée)
+    hi = lo + 1
+    if hi == n:
+        return hi
+    if a[hi] < a[lo]:
+        hi += 1
+        while hi < n and a[hi] < a[hi - 1]:
+            hi += 1
+        a[lo:hi] = a[lo:hi][::-1]
+    else:
+        hi += 1
+        while hi < n and a[hi] >= a[hi - 1]:
+            hi += 1
+    return hi
+
+
+def natural_merge_sort(arr) -> list:
+    """Tri fusion par runs naturels, à la Timsort (stable, O(n) sur une entrée déjà triée).
+
+    Les runs montants (ou strictement descendants, retournés) sont détectés,
+    prolongés jusqu'à min_run par insertion dichotomique, puis fusionnés selon
+    les invariants de pile de Timsort. Pas de galop : les fusions restent
+    celles des autres variantes.
+    """
+    a = list(arr)
+    n = len(a)
+    minrun = min_run(n)
+    runs: List[List[int]] = []          # [début, longueur]
+    lo = 0
+    while lo < n:
+        hi = _run_end(a, lo, n)
+        end = min(n, max(hi, lo + minrun))
+        for k in range(hi, end):
+            x = a[k]
+            pos = bisect_right(a, x, lo, k)
+            a[pos + 1:k + 1] = a[pos:k]
+            a[pos] = x
+        runs.append([lo, end - lo])
+        for k in _collapse(runs):
+            _merge_at(a, runs, k)
+        lo = end
+    for k in _collapse(runs, force=True):
+        _merge_at(a, runs, k)
+    return a
+
+
+def _merge_at(a: list, runs: List[List[int]], k: int):
+    (l, _), (m, n2) = runs[k], runs[k + 1]
+    a[l:m + n2] = _merge(a[l:m], a[m:m + n2])
+
+
+def natural_merge_sort_steps(arr) -> Iterator[Step]:
+    # mêmes décisions que natural_merge_sort ; recherche de runs et insertions
+    # dans le segment global (0, n - 1), chaque fusion dans son propre segment
+    a = list(arr)
+    n = len(a)
+    if not n:
+        return
+    top = (0, n - 1)
+    yield SPLIT, top, 0
+    minrun = min_run(n)
+    runs: List[List[int]] = []
+    lo = 0
+    while lo < n:
+        # mêmes comparaisons que _run_end
+        hi = lo + 1
+        if hi < n:
+            yield COMPARE, top, hi
+            descending = a[hi] < a[lo]
+            hi += 1
+            while hi < n:
+                yield COMPARE, top, hi
+                if (a[hi] < a[hi - 1]) != descending:
+                    break
+                hi += 1
+            if descending:
+                i, j = lo, hi - 1
+                while i < j:
+                    yield SWAP, (i, j), 0
+                    a[i], a[j] = a[j], a[i]
+                    i += 1
+                    j -= 1
+        end = min(n, max(hi, lo + minrun))
+        for k in range(hi, end):
+            # insertion dichotomique : mêmes sondes que bisect_right
+            x, left, right = a[k], lo, k
+            while left < right:
+                probe = (left + right) // 2
+                yield COMPARE, top, probe
+                if x < a[probe]:
+                    right = probe
+                else:
+                    left = probe + 1
+            for p in range(k, left, -1):
+                yield SWAP, (p - 1, p), 0
+                a[p - 1], a[p] = a[p], a[p - 1]
+        yield LEAF, (lo, end - 1), 0
+        runs.append([lo, end - lo])
+        for k in _collapse(runs):
+            yield from _merge_at_steps(a, runs, k)
+        lo = end
+    for k in _collapse(runs, force=True):
+        yield from _merge_at_steps(a, runs, k)
+    yield MERGED, top, 0
+
+
+def _merge_at_steps(a: list, runs: List[List[int]], k: int) -> Iterator[Step]:
+    (l, _), (m, n2) = runs[k], runs[k + 1]
+    r = m + n2 - 1
+    yield SPLIT, (l, r), m - 1
+    merged = []
+    yield from _merge_steps(a[l:m], a[m:r + 1], l, r, merged)
+    a[l:r + 1] = merged
+    yield MERGED, (l, r), 0
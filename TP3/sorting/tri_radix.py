@@ -0,0 +1,66 @@
+from typing import Iterator, List
+
+from TP3.sorting.etapes import LEAF, MERGED, MOVE, SPLIT, Step
+
+RADIX_BITS = 8                  # chiffres de 8 bits : 256 seaux par passe
+
+
+# ============================================================
+# TRI PAR BASE (LSD, entiers)
+# ============================================================
+def _keys(a: list) -> List[int]:
+    # clés positives : les négatifs sont décalés par le minimum
+    if not all(isinstance(x, int) for x in a):
+        raise TypeError("radix sort expects integers")
+    low = min(a)
+    return [x - low for x in a]
+
+
+def radix_sort(arr) -> list:
+    """Tri par base, chiffre de poids faible d'abord (stable, entiers uniquement).
+
+    O(n·w / RADIX_BITS) pour des entiers de w bits, sans aucune comparaison
+    d'éléments. Les négatifs sont acceptés (décalage par le minimum).
+    """
+    a = list(arr)
+    if not a:
+        return a
+    pairs = list(zip(_keys(a), a))
+    top = max(k for k, _ in pairs)
+    mask = (1 << RADIX_BITS) - 1
+    shift = 0
+    while top >> shift:
+        buckets: List[list] = [[] for _ in range(mask + 1)]
+        for p in pairs:
+            buckets[p[0] >> shift & mask].append(p)
+        pairs = [p for b in buckets for p in b]
+        shift += RADIX_BITS
+    return [x for _, x in pairs]
+
+
+def radix_sort_steps(arr) -> Iterator[Step]:
+    # une passe par chiffre : SPLIT (décalage du chiffre), un MOVE par élément
+    # (position avant la passe -> position après), MERGED
+    a = list(arr)
+    n = len(a)
+    if not n:
+        return
+    keys = _keys(a)
+    top = max(keys)
+    if not top:
+        yield LEAF, (0, n - 1), 0       # tous égaux : déjà trié
+        return
+    mask = (1 << RADIX_BITS) - 1
+    shift = 0
+    order = list(range(n))              # indices d'origine, dans l'ordre courant
+    while top >> shift:
+        yield SPLIT, (0, n - 1), shift
+        buckets: List[List[int]] = [[] for _ in range(mask + 1)]
+        for pos, idx in enumerate(order):
+            buckets[keys[idx] >> shift & mask].append(pos)
+        moved = [pos for b in buckets for pos in b]
+        for dst, src in enumerate(moved):
+            yield MOVE, (src, dst), 0
+        order = [order[src] for src in moved]
+        yield MERGED, (0, n - 1), 0
+        shift += RADIX_BITS
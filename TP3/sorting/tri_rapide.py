@@ -0,0 +1,95 @@
+from typing import Iterator
+
+from TP3.sorting.etapes import COMPARE, LEAF, MERGED, SPLIT, SWAP, Step
+
+
+# ============================================================
+# TRI RAPIDE (partition en trois, pile explicite)
+# ============================================================
+def _median3(a: list, i: int, j: int, k: int) -> int:
+    # indice de la médiane de a[i], a[j], a[k]
+    if a[i] < a[j]:
+        if a[j] < a[k]:
+            return j
+        return k if a[i] < a[k] else i
+    if a[i] < a[k]:
+        return i
+    return k if a[j] < a[k] else j
+
+
+def quicksort(arr) -> list:
+    """Tri rapide, renvoie une nouvelle liste (non stable).
+
+    Pivot médian de trois, partition en trois (Dijkstra) : les doublons ne
+    dégradent pas le tri. Le plus petit côté est traité d'abord, la pile
+    reste en O(log n).
+    """
+    a = list(arr)
+    stack = [(0, len(a) - 1)]
+    while stack:
+        l, r = stack.pop()
+        if l >= r:
+            continue
+        pivot = a[_median3(a, l, (l + r) // 2, r)]
+        lt, i, gt = l, l, r
+        while i <= gt:
+            x = a[i]
+            if x < pivot:
+                a[lt], a[i] = x, a[lt]
+                lt += 1
+                i += 1
+            elif pivot < x:
+                a[i], a[gt] = a[gt], x
+                gt -= 1
+            else:
+                i += 1
+        if lt - l < r - gt:
+            stack.append((gt + 1, r))
+            stack.append((l, lt - 1))
+        else:
+            stack.append((l, lt - 1))
+            stack.append((gt + 1, r))
+    return a
+
+
+def quicksort_steps(arr) -> Iterator[Step]:
+    # mêmes partitions que quicksort ; le bloc des égaux au pivot est une feuille,
+    # chaque segment se ferme (MERGED) quand ses deux côtés sont triés
+    a = list(arr)
+    if not a:
+        return
+    stack = [(0, len(a) - 1, False)]
+    while stack:
+        l, r, closing = stack.pop()
+        if closing:
+            yield MERGED, (l, r), 0
+            continue
+        if l == r:
+            yield LEAF, (l, r), 0
+            continue
+        p = _median3(a, l, (l + r) // 2, r)
+        yield SPLIT, (l, r), p
+        pivot = a[p]
+        lt, i, gt = l, l, r
+        while i <= gt:
+            yield COMPARE, (l, r), i
+            x = a[i]
+            if x < pivot:
+                if lt != i:
+                    yield SWAP, (lt, i), 0
+                a[lt], a[i] = x, a[lt]
+                lt += 1
+                i += 1
+            elif pivot < x:
+                if i != gt:
+                    yield SWAP, (i, gt), 0
+                a[i], a[gt] = a[gt], x
+                gt -= 1
+            else:
+                i += 1
+        yield LEAF, (lt, gt), 0
+        stack.append((l, r, True))
+        sides = [(gt + 1, r), (l, lt - 1)] if lt - l < r - gt else [(l, lt - 1), (gt + 1, r)]
+        for lo, hi in sides:
+            if lo <= hi:
+                stack.append((lo, hi, False))
@@ -0,0 +1,67 @@
+from typing import Iterator
+
+from TP3.sorting.etapes import COMPARE, LEAF, MERGED, SPLIT, SWAP, Step
+
+
+# ============================================================
+# TRI PAR TAS (tas max sur place)
+# ============================================================
+def _sift_down(a: list, i: int, size: int):
+    while True:
+        child = 2 * i + 1
+        if child >= size:
+            return
+        if child + 1 < size and a[child] < a[child + 1]:
+            child += 1
+        if not a[i] < a[child]:
+            return
+        a[i], a[child] = a[child], a[i]
+        i = child
+
+
+def heapsort(arr) -> list:
+    """Tri par tas, renvoie une nouvelle liste (non stable, O(n log n) dans tous les cas)."""
+    a = list(arr)
+    n = len(a)
+    for start in range(n // 2 - 1, -1, -1):
+        _sift_down(a, start, n)
+    for end in range(n - 1, 0, -1):
+        a[0], a[end] = a[end], a[0]
+        _sift_down(a, 0, end)
+    return a
+
+
+def _sift_down_steps(a: list, i: int, size: int) -> Iterator[Step]:
+    # mêmes comparaisons que _sift_down ; COMPARE porte l'indice de l'enfant en jeu
+    heap = (0, size - 1)
+    while True:
+        child = 2 * i + 1
+        if child >= size:
+            return
+        if child + 1 < size:
+            yield COMPARE, heap, child + 1
+            if a[child] < a[child + 1]:
+                child += 1
+        yield COMPARE, heap, child
+        if not a[i] < a[child]:
+            return
+        yield SWAP, (i, child), 0
+        a[i], a[child] = a[child], a[i]
+        i = child
+
+
+def heapsort_steps(arr) -> Iterator[Step]:
+    a = list(arr)
+    n = len(a)
+    if not n:
+        return
+    yield SPLIT, (0, n - 1), 0
+    for start in range(n // 2 - 1, -1, -1):
+        yield from _sift_down_steps(a, start, n)
+    for end in range(n - 1, 0, -1):
+        yield SWAP, (0, end), 0
+        a[0], a[end] = a[end], a[0]
+        yield LEAF, (end, end), 0
+        yield from _sift_down_steps(a, 0, end)
+    yield LEAF, (0, 0), 0
+    yield MERGED, (0, n - 1), 0
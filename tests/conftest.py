@@ -0,0 +1,5 @@
+# racine du dépôt sur sys.path : les tests importent TP2.* et TP3.* comme les modules entre eux
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,20 @@
+"""Banc d'essai : les métriques de forme décrivent l'arbre mesuré."""
+import pytest
+
+from TP2.bench_arbre import VARIANTS, run_suite
+from TP2.generateurs_cles import DISTRIBUTIONS
+
+N = 3000
+
+
+@pytest.mark.parametrize("variant", VARIANTS)
+def test_delete_rows_describe_the_remaining_tree(variant):
+    rows = run_suite(variants=[variant], orders=[3, 7], sizes=[N], workloads=["delete"],
+                     ops=1000, isolate=False)
+    assert len(rows) == 2 * len(DISTRIBUTIONS)
+    for row in rows:
+        assert "error" not in row, row
+        deleted = row["ops"]
+        assert deleted == N // 2
+        assert row["keys"] == N - deleted
+        assert row["fill_factor"] > 0 and row["height"] > 1
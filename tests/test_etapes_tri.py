@@ -0,0 +1,99 @@
+"""Trace paresseuse du tri fusion et navigation dans la frise (Timeline.seek)."""
+import random
+
+import pytest
+
+from TP3.etapes_tri import MergeTrace, Timeline
+
+
+def reference(arr, left, right, steps):
+    # trace récursive d'origine, étape par étape, copies comprises
+    if left > right:
+        return []
+    if left == right:
+        steps.append(('leaf', (left, right), [arr[left]]))
+        return [arr[left]]
+    steps.append(('split', (left, right), arr[left:right + 1].copy()))
+    mid = (left + right) // 2
+    L = reference(arr, left, mid, steps)
+    R = reference(arr, mid + 1, right, steps)
+    i = j = 0
+    merged = []
+    while i < len(L) and j < len(R):
+        steps.append(('compare', (left, right), L[i], R[j], merged.copy()))
+        if L[i] <= R[j]:
+            merged.append(L[i])
+            i += 1
+        else:
+            merged.append(R[j])
+            j += 1
+    while i < len(L):
+        steps.append(('compare', (left, right), L[i], None, merged.copy()))
+        merged.append(L[i])
+        i += 1
+    while j < len(R):
+        steps.append(('compare', (left, right), None, R[j], merged.copy()))
+        merged.append(R[j])
+        j += 1
+    steps.append(('merge_complete', (left, right), merged.copy()))
+    return merged
+
+
+@pytest.mark.parametrize("n", list(range(0, 20)) + [64, 100, 257])
+def test_trace_matches_reference(n):
+    rnd = random.Random(n)
+    arr = [rnd.randrange(-5, 20) for _ in range(n)]
+    ref = []
+    reference(arr, 0, n - 1, ref)
+    trace = MergeTrace(arr)
+    assert len(trace) == len(ref) and list(trace) == ref
+    if ref:
+        assert trace[-1] == ref[-1]
+
+
+@pytest.mark.parametrize("lookahead", [0, 1, 3])
+def test_random_access_is_lazy(lookahead):
+    rnd = random.Random(lookahead)
+    arr = [rnd.randrange(9) for _ in range(64)]
+    ref = []
+    reference(arr, 0, len(arr) - 1, ref)
+    trace = MergeTrace(arr, lookahead=lookahead)
+    order = list(range(len(ref)))
+    rnd.shuffle(order)
+    furthest = -1
+    for k in order:
+        furthest = max(furthest, k)
+        assert trace[k] == ref[k]
+        assert trace.produced() <= furthest + 1 + lookahead
+
+
+@pytest.mark.parametrize("every", [None, 5, 1])
+@pytest.mark.parametrize("n", [1, 2, 3, 7, 50, 300])
+def test_seek_matches_replay(n, every):
+    rnd = random.Random(n)
+    trace = MergeTrace([rnd.randint(0, 20) for _ in range(n)])
+    timeline = Timeline(trace, every)
+
+    def expected(t):
+        # dernière étape (1-based) qui a touché chaque nœud avant t, 0 sinon
+        last = [0] * trace.node_count()
+        for k in range(t):
+            last[trace.node_of(k)] = k + 1
+        return last
+
+    for _ in range(60):
+        t = rnd.randint(0, len(trace))
+        before = list(timeline.touched)
+        changed = timeline.seek(t)
+        after = expected(t)
+        assert timeline.position == t and list(timeline.touched) == after
+        assert changed >= {v for v in range(len(after)) if before[v] != after[v]}
+
+
+def test_seek_out_of_range():
+    trace = MergeTrace([3, 1, 2])
+    timeline = Timeline(trace)
+    with pytest.raises(IndexError):
+        timeline.seek(len(trace) + 1)
+    with pytest.raises(IndexError):
+        timeline.seek(-1)
@@ -0,0 +1,19 @@
+"""Fuzzer différentiel (TP2.fuzz_arbre) rejoué à graine et longueur fixes sur chaque variante."""
+import pytest
+
+from TP2.fuzz_arbre import COUNTED, VARIANTS, FuzzFailure, fuzz_round
+
+SEEDS = (1, 2)          # deux tirages : petits et grands espaces de clés
+OPS = 1500
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("order", [3, 4, 5, 7])
+@pytest.mark.parametrize("variant", list(VARIANTS))
+def test_fuzz(variant, order, seed):
+    for counted in (False, True) if variant in COUNTED else (False,):
+        try:
+            assert fuzz_round(variant, order, seed * 1000 + order, OPS, counted, check_every=16) == OPS
+        except FuzzFailure as failure:
+            # suite réduite, rejouable telle quelle
+            pytest.fail(f"{failure.message}\n\n{failure.script()}", pytrace=False)
@@ -0,0 +1,74 @@
+"""Isolation des instantanés : la vue ne bouge plus quand l'arbre vivant change."""
+import random
+
+import pytest
+
+from TP2.b_arbre import bTree
+from TP2.map_arbre import BTreeMap
+
+
+def _mutate(tree, model, rnd):
+    r = rnd.random()
+    if r < 0.4:
+        k = rnd.randrange(4000)
+        tree.insert(k)
+        model.add(k)
+    elif r < 0.8:
+        k = rnd.randrange(4000)
+        tree.delete(k)
+        model.discard(k)
+    elif r < 0.9:
+        ks = rnd.sample(range(4000), 40)
+        tree.insert_many(ks)
+        model.update(ks)
+    else:
+        ks = rnd.sample(range(4000), 40)
+        tree.delete_many(ks)
+        model.difference_update(ks)
+
+
+@pytest.mark.parametrize("int_keys", [False, True])
+@pytest.mark.parametrize("order", [3, 5, 7])
+def test_snapshots_survive_updates(order, int_keys):
+    rnd = random.Random(order)
+    tree = bTree.bulk_load(range(0, 4000, 2), order, int_keys=int_keys, counted=True)
+    model = set(tree)
+    snaps = []
+    for step in range(3000):
+        if step % 300 == 0:
+            snaps.append((tree.snapshot(), sorted(model)))
+        _mutate(tree, model, rnd)
+    assert tree.check_invariants() == len(model)
+    assert list(tree) == sorted(model)
+    for snap, keys in snaps:
+        assert list(snap) == keys
+        assert list(reversed(snap)) == keys[::-1]
+        present = set(keys)
+        assert all((k in snap) == (k in present) for k in range(0, 4000, 37))
+        assert list(snap.range(100, 900)) == [k for k in keys if 100 <= k <= 900]
+        assert snap.count_range(100, 900) == sum(100 <= k <= 900 for k in keys)
+
+
+def test_snapshot_survives_whole_tree_operations():
+    tree = bTree.bulk_load(range(1000), 4)
+    before = tree.snapshot()
+    tree.delete_range(200, 799)
+    after_range = tree.snapshot()
+    left, right = tree.split_at(100)
+    left.join(right)
+    assert list(before) == list(range(1000))
+    assert list(after_range) == list(range(200)) + list(range(800, 1000))
+    assert left.check_invariants() == 400 and list(left) == list(after_range)
+    left.insert(500)
+    assert 500 not in after_range and 500 in left
+
+
+def test_map_snapshot_keeps_keys():
+    m = BTreeMap(5)
+    for k in range(300):
+        m[k] = str(k)
+    snap = m.snapshot()
+    for k in range(0, 300, 3):
+        del m[k]
+    assert list(snap) == list(range(300))
+    assert len(m) == 200 and m.check_invariants() == 200
@@ -0,0 +1,82 @@
+"""Journal d'écriture anticipée et reprise après arrêt brutal (TP2.journal, DiskBTree wal=True)."""
+import os
+
+import pytest
+
+from TP2.b_arbre_disque import DiskBTree, Pager
+from TP2.fuzz_arbre import simulate_crash
+
+
+def _open(path, **options):
+    return DiskBTree(path, 5, page_size=256, wal=True, **options)
+
+
+def test_crash_keeps_committed_ops_only(tmp_path):
+    path = str(tmp_path / "t.db")
+    t = _open(path, group_size=4)
+    for k in range(100):
+        t.insert(k)
+    for k in range(0, 100, 3):
+        t.delete(k)
+    t.commit()
+    for k in range(100, 103):
+        t.insert(k)             # lot incomplet : jamais synchronisé
+    simulate_crash(t)
+    with _open(path) as t:
+        assert list(t) == [k for k in range(100) if k % 3]
+        assert t.check_invariants() == 66
+
+
+def test_group_commit_syncs_once_per_batch(tmp_path):
+    path = str(tmp_path / "t.db")
+    t = _open(path, group_size=256)
+    before = t.wal.syncs            # checkpoint d'ouverture
+    for k in range(1000):
+        t.insert(k)
+    assert t.wal.syncs - before == 1000 // 256
+    simulate_crash(t)
+    with _open(path) as t:
+        # seuls les lots complets survivent
+        assert list(t) == list(range(1000 // 256 * 256))
+
+
+def test_crash_during_checkpoint(tmp_path, monkeypatch):
+    path = str(tmp_path / "t.db")
+    t = _open(path, cache_pages=64)
+    for k in range(300):
+        t.insert(k)
+    t.flush()
+    for k in range(0, 300, 2):
+        t.delete(k)
+    real = Pager.flush_node
+    written = []
+
+    def torn(pager, node):
+        # les images sont journalisées ; le fichier de données ne reçoit qu'une page
+        if written:
+            raise OSError("arrêt pendant la recopie des pages")
+        written.append(node.page_id)
+        real(pager, node)
+
+    monkeypatch.setattr(Pager, "flush_node", torn)
+    with pytest.raises(OSError):
+        t.flush()
+    monkeypatch.undo()
+    simulate_crash(t)
+    with _open(path) as t:
+        assert list(t) == list(range(1, 300, 2))
+        t.check_invariants()
+
+
+def test_checkpoint_truncates_log(tmp_path):
+    path = str(tmp_path / "t.db")
+    with _open(path, group_size=8) as t:
+        for k in range(50):
+            t.insert(k)
+        t.commit()
+        assert os.path.getsize(path + ".wal") > 0
+        t.flush()
+        # la reprise ne dépend que du journal écrit depuis le dernier checkpoint
+        assert t.wal.size == 0 and os.path.getsize(path + ".wal") == 0
+    with _open(path) as t:
+        assert list(t) == list(range(50))
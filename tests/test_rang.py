@@ -0,0 +1,67 @@
+"""Statistiques d'ordre en mode counted : rank, select, count_range."""
+import bisect
+import random
+
+import pytest
+
+from TP2.b_arbre import bTree
+from TP2.b_arbre_star import BStarTree
+from TP2.map_arbre import BStarMap, BTreeMap
+
+CLASSES = [bTree, BStarTree, BTreeMap, BStarMap]
+
+
+@pytest.mark.parametrize("order", [3, 4, 7])
+@pytest.mark.parametrize("cls", CLASSES, ids=lambda c: c.__name__)
+def test_rank_select_follow_updates(cls, order):
+    rnd = random.Random(order)
+    tree, model = cls(order, counted=True), set()
+    for _ in range(3000):
+        k = rnd.randrange(1500)
+        if rnd.random() < 0.6:
+            tree.insert(k)
+            model.add(k)
+        else:
+            tree.delete(k)
+            model.discard(k)
+    keys = sorted(model)
+    assert tree.check_invariants() == len(keys)
+    assert [tree.select(i) for i in range(len(keys))] == keys
+    for k in range(-1, 1502, 7):
+        assert tree.rank(k) == bisect.bisect_left(keys, k)
+    for _ in range(200):
+        lo, hi = sorted((rnd.randrange(1500), rnd.randrange(1500)))
+        assert tree.count_range(lo, hi) == bisect.bisect_right(keys, hi) - bisect.bisect_left(keys, lo)
+    assert tree.count_range(10, 5) == 0
+
+
+@pytest.mark.parametrize("cls", [bTree, BStarTree], ids=lambda c: c.__name__)
+def test_counted_bulk_load_and_batches(cls):
+    tree = cls.bulk_load(range(0, 4000, 2), 9, 0.75, counted=True)
+    tree.insert_many(range(1, 4000, 4))
+    tree.delete_many(range(0, 4000, 8))
+    keys = sorted(set(range(0, 4000, 2)) - set(range(0, 4000, 8)) | set(range(1, 4000, 4)))
+    assert tree.check_invariants() == len(keys)
+    assert tree.select(0) == keys[0] and tree.select(len(keys) - 1) == keys[-1]
+    assert tree.rank(2000) == bisect.bisect_left(keys, 2000)
+
+
+@pytest.mark.parametrize("cls", [bTree, BStarTree], ids=lambda c: c.__name__)
+def test_select_bounds_and_uncounted_trees(cls):
+    tree = cls(5, counted=True)
+    tree.insert(1)
+    with pytest.raises(IndexError):
+        tree.select(1)
+    with pytest.raises(IndexError):
+        tree.select(-1)
+    with pytest.raises(ValueError):
+        cls(5).rank(1)
+
+
+def test_snapshot_keeps_its_ranks():
+    tree = bTree(5, counted=True)
+    tree.insert_many(range(100))
+    snap = tree.snapshot()
+    tree.delete_many(range(0, 100, 2))
+    assert snap.rank(50) == 50 and snap.select(99) == 99 and snap.count_range(10, 19) == 10
+    assert tree.rank(50) == 25 and tree.select(49) == 99
@@ -0,0 +1,99 @@
+"""Algorithmes de TP3.sorting : résultat trié, stabilité, traces rejouables."""
+import random
+
+import pytest
+
+from TP3.sorting import (ALGORITHMS, COMPARE, MERGED, MOVE, SPLIT, SWAP, count_ops, count_steps,
+                         merge_sort_steps, radix_sort)
+
+MERGES = {"merge", "merge_bottom_up", "natural"}          # tris stables par comparaison
+
+
+class Item:
+    # clé comparable qui garde son rang d'origine (stabilité)
+    __slots__ = ("k", "id")
+
+    def __init__(self, k, i):
+        self.k, self.id = k, i
+
+    def __lt__(self, other):
+        return self.k < other.k
+
+    def __le__(self, other):
+        return self.k <= other.k
+
+
+def _inputs():
+    rnd = random.Random(5)
+    yield "empty", []
+    yield "single", [7]
+    for n in (2, 3, 17, 64, 65, 300):
+        yield f"random{n}", [rnd.randrange(-1000, 1000) for _ in range(n)]
+        yield f"dup{n}", [rnd.randrange(4) for _ in range(n)]
+        yield f"asc{n}", sorted(rnd.randrange(50) for _ in range(n))
+        yield f"desc{n}", sorted((rnd.randrange(50) for _ in range(n)), reverse=True)
+
+
+INPUTS = dict(_inputs())
+
+
+def replay(name, arr, steps):
+    # applique la trace à une copie : SWAP et MOVE directement, les fusions à chaque MERGED
+    a, opened, buf = list(arr), [], None
+    for op, (l, r), i in steps:
+        if op == SPLIT:
+            opened.append((l, r, i))
+            buf = [None] * len(a) if name == "radix" else buf
+        elif op == MERGED:
+            assert opened and opened[-1][:2] == (l, r), "SPLIT / MERGED mal emboîtés"
+            m = opened.pop()[2]
+            if name in MERGES:
+                left, right, out = a[l:m + 1], a[m + 1:r + 1], []
+                assert left == sorted(left) and right == sorted(right)
+                while left and right:
+                    out.append(right.pop(0) if right[0] < left[0] else left.pop(0))
+                a[l:r + 1] = out + left + right
+            elif name == "radix":
+                a = buf
+        elif op == SWAP:
+            a[l], a[r] = a[r], a[l]
+        elif op == MOVE:
+            buf[r] = a[l]
+        elif op == COMPARE:
+            assert opened, "comparaison hors d'un segment ouvert"
+    assert not opened
+    return a
+
+
+@pytest.mark.parametrize("case", sorted(INPUTS))
+@pytest.mark.parametrize("name", sorted(ALGORITHMS))
+def test_sorts_and_trace_replays(name, case):
+    sort, steps = ALGORITHMS[name]
+    keys = INPUTS[case]
+    data = keys if name == "radix" else [Item(k, i) for i, k in enumerate(keys)]
+    out = sort(data)
+    assert [getattr(x, "k", x) for x in out] == sorted(keys)
+    if name in MERGES:
+        assert [x.id for x in out] == [x.id for x in sorted(data, key=lambda x: x.k)]
+    before = list(data)
+    trace = list(steps(data))
+    assert data == before, "le générateur d'étapes ne doit pas modifier son entrée"
+    assert [getattr(x, "k", x) for x in replay(name, data, trace)] == sorted(keys)
+
+
+@pytest.mark.parametrize("n", [0, 1, 2, 7, 64, 100])
+def test_count_steps_matches_merge_trace(n):
+    assert count_steps(n) == len(list(merge_sort_steps(list(range(n, 0, -1)))))
+
+
+def test_radix_integers_only():
+    values = [3, -5, 0, 2 ** 70, -2 ** 70, 255, 256]
+    assert radix_sort(values) == sorted(values)
+    with pytest.raises(TypeError):
+        radix_sort([1.5, 2])
+
+
+def test_count_ops_counts_every_kind():
+    _, steps = ALGORITHMS["heap"]
+    counts = count_ops(steps([3, 1, 2]))
+    assert counts["swap"] == 2 and counts["move"] == 0